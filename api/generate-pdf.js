@@ -16,17 +16,36 @@ export default async function handler(req, res) {
   }
 
   try {
-    const { htmlContent, filename } = req.body;
+    const { pnr, options, data, template, htmlContent, filename } = req.body || {};
+
+    // Terminais com o serviço Python local (python -m pdf.http_service): mesmo PDF do app desktop
+    const serviceUrl = process.env.SETEMARES_PDF_SERVICE_URL;
+    if (serviceUrl && (pnr || data)) {
+      const upstream = await fetch(`${serviceUrl.replace(/\/$/, '')}/pdf`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(pnr ? { pnr, options } : { data, template }),
+      });
+      if (!upstream.ok) {
+        if (upstream.status === 429) {
+          res.setHeader('Retry-After', upstream.headers.get('Retry-After') || '1');
+        }
+        return res.status(upstream.status).json(await upstream.json());
+      }
+      res.setHeader('Content-Type', 'application/pdf');
+      res.setHeader('Content-Disposition', `inline; filename="${filename || 'cotacao.pdf'}"`);
+      return res.status(200).send(Buffer.from(await upstream.arrayBuffer()));
+    }
 
     if (!htmlContent || !filename) {
       return res.status(400).json({
         error: true,
-        message: "Missing htmlContent or filename"
+        message: "Missing pnr/data (PDF service) or htmlContent and filename"
       });
     }
 
-    // Por enquanto, retornar erro informando que PDF via servidor não está disponível
-    // O frontend deve usar o gerador de PDF local (@react-pdf/renderer)
+    // HTML pronto não é renderizado no servidor
+    // O frontend deve usar o gerador de PDF local (@react-pdf/renderer) ou enviar pnr/data
     res.status(501).json({
       error: true,
       message: "PDF generation via server is not available. Please use client-side PDF generation."
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from cli.main import parse
+from core import tracing
+from core.parser.date_resolver import DateResolver
+
+CSV_FIELDS = [
+	"file", "block", "currency", "tarifa", "taxas_base", "fee", "multa",
+	"fares", "trechos", "flights", "travel_minutes", "pagamento_hint", "bagagem_hint", "error",
+]
+
+
+def expand_inputs(inputs: Iterable[str], pattern: str = "*.txt") -> List[str]:
+	"""Expande diretórios (``pattern``) e globs em uma lista ordenada e sem repetições."""
+	files: List[str] = []
+	for item in inputs:
+		p = Path(item)
+		if p.is_dir():
+			files.extend(str(f) for f in sorted(p.glob(pattern)) if f.is_file())
+		elif any(ch in item for ch in "*?["):
+			files.extend(sorted(f for f in glob.glob(item, recursive=True) if os.path.isfile(f)))
+		elif p.is_file():
+			files.append(str(p))
+	return list(dict.fromkeys(files))
+
+
+# Um DateResolver por data de referência em cada worker: o calendário é reaproveitado entre arquivos
+_RESOLVERS: Dict[Optional[date], DateResolver] = {}
+
+
+def _resolver(ref: Optional[date]) -> DateResolver:
+	if ref not in _RESOLVERS:
+		_RESOLVERS[ref] = DateResolver(ref)
+	return _RESOLVERS[ref]
+
+
+def _decode(trechos: List[str], use_pnrsh: bool, ref: Optional[date] = None) -> Dict[str, Any]:
+	"""Voos (formato JSON do pnrsh) e tempo de viagem em minutos (None sem fusos conhecidos)."""
+	decoded = None
+	try:
+		from core.parser.itinerary_decoder import decode
+		decoded = decode(trechos, resolver=_resolver(ref))
+	except Exception:
+		decoded = None
+	if use_pnrsh and not decoded:
+		from core.parser.itinerary_model import Itinerary
+		from core.parser.pnrsh_adapter import decode_segments
+		decoded = Itinerary.from_dict(decode_segments(trechos))
+	if not decoded:
+		return {"flights": [], "travel_minutes": None}
+	travel = decoded.travel_time
+	return {
+		"flights": decoded.to_dict()["flightInfo"]["flights"],
+		"travel_minutes": int(travel.total_seconds() // 60) if travel is not None else None,
+	}
+
+
+def parse_file(path: str, use_pnrsh: bool = False, ref: Optional[date] = None) -> List[Dict[str, Any]]:
+	"""Parseia e decodifica um arquivo de PNR; um registro por cotação (roda no worker).
+
+	``ref`` é a data de emissão usada para completar o ano dos trechos (padrão: hoje).
+	"""
+	with tracing.quote(Path(path).name):
+		try:
+			text = Path(path).read_text(encoding="utf-8", errors="replace")
+			parsed = parse(text)
+			quotations = parsed["quotations"] if parsed.get("is_multi") else [parsed]
+			records = []
+			for i, q in enumerate(quotations, start=1):
+				q = {k: v for k, v in q.items() if k not in ("quotations", "is_multi")}
+				records.append({"file": path, "block": i, **q, **_decode(q.get("trechos", []), use_pnrsh, ref)})
+			return records
+		except Exception as e:
+			return [{"file": path, "block": 0, "error": str(e) or type(e).__name__}]
+
+
+def iter_records(
+	files: List[str],
+	workers: int | None = None,
+	chunksize: int = 16,
+	use_pnrsh: bool = False,
+	ref: Optional[date] = None,
+) -> Iterator[Dict[str, Any]]:
+	"""Distribui os arquivos num pool de processos em lotes de ``chunksize``.
+
+	Um único processo por worker parseia muitos arquivos, evitando pagar a
+	inicialização do interpretador por arquivo. Com ``workers=1`` roda no próprio processo.
+	"""
+	fn = partial(parse_file, use_pnrsh=use_pnrsh, ref=ref)
+	if workers == 1 or len(files) <= 1:
+		for f in files:
+			yield from fn(f)
+		return
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		for records in pool.map(fn, files, chunksize=max(1, chunksize)):
+			yield from records
+
+
+def _csv_row(rec: Dict[str, Any]) -> Dict[str, Any]:
+	row = {k: rec.get(k, "") for k in CSV_FIELDS}
+	row["fares"] = " | ".join(f"{f['category']}:{f['tarifa']}+{f['taxas']}" for f in rec.get("fares", []))
+	row["trechos"] = " | ".join(rec.get("trechos", []))
+	row["flights"] = " | ".join(
+		f"{f.get('company', {}).get('iataCode', '')}{f.get('flight', '')} "
+		f"{f.get('departureAirport', {}).get('iataCode', '')}-{f.get('landingAirport', {}).get('iataCode', '')} "
+		f"{f.get('departureTime', '')}"
+		for f in rec.get("flights", [])
+	)
+	return row
+
+
+def write_records(records: Iterable[Dict[str, Any]], out, fmt: str = "jsonl") -> int:
+	count = 0
+	if fmt == "csv":
+		writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+		writer.writeheader()
+		for rec in records:
+			writer.writerow(_csv_row(rec))
+			count += 1
+	else:
+		for rec in records:
+			out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+			count += 1
+	return count
+
+
+def main(argv: List[str] | None = None) -> int:
+	ap = argparse.ArgumentParser(prog="python -m cli.main bulk", description="Parse em lote de arquivos de PNR (pool de processos).")
+	ap.add_argument("inputs", nargs="+", help="diretórios, arquivos ou globs (ex.: data/ 'arquivo/**/*.txt')")
+	ap.add_argument("--pattern", default="*.txt", help="padrão usado dentro de diretórios")
+	ap.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+	ap.add_argument("--out", default="-", help="arquivo de saída ('-' = stdout)")
+	ap.add_argument("--workers", type=int, default=None, help="processos do pool (padrão: núcleos da máquina)")
+	ap.add_argument("--chunksize", type=int, default=16, help="arquivos enviados por vez a cada worker")
+	ap.add_argument("--pnrsh", action="store_true", help="usa o pnrsh quando o decoder interno não reconhece os trechos")
+	ap.add_argument("--ref-date", type=date.fromisoformat, default=None, help="data de emissão (AAAA-MM-DD) para completar o ano dos trechos; padrão: hoje")
+	args = ap.parse_args(argv)
+
+	files = expand_inputs(args.inputs, args.pattern)
+	if not files:
+		print("nenhum arquivo encontrado.", file=sys.stderr)
+		return 1
+	out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8", newline="")
+	try:
+		count = write_records(iter_records(files, args.workers, args.chunksize, args.pnrsh, args.ref_date), out, args.format)
+	finally:
+		if out is not sys.stdout:
+			out.close()
+	print(f"{len(files)} arquivo(s), {count} cotação(ões).", file=sys.stderr)
+	return 0
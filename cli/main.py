@@ -1,8 +1,11 @@
 from decimal import Decimal, ROUND_HALF_UP
+import argparse
 import json
 import sys
 import re
-from typing import Dict, Any, List
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from core import tracing
 
 
 def money(value: Decimal | str | float) -> Decimal:
@@ -32,64 +35,153 @@ GLOSSARY = {
 }
 
 
-def _extract_amount(pattern: str, text: str) -> Decimal:
-	match = re.search(pattern, text, flags=re.I)
-	if match:
-		return money(match.group(1))
-	return Decimal("0")
+# Padrões pré-compilados do tokenizer (aplicados linha a linha, uma única passada)
+_CCY_OPT = r"(?:usd|eur|brl|US\$|R\$|€)?"
+_FARE_RE = re.compile(
+	rf"tarifa\s*{_CCY_OPT}\s*([\d.,]+)\s*\+\s*(?:txs?|taxas?)\s*{_CCY_OPT}\s*([\d.,]+)\s*(\*.*)?$",
+	flags=re.I,
+)
+_FEE_RE = re.compile(rf"(?:fee|du|taxa de serviço)\s*{_CCY_OPT}\s*([\d.,]+)", flags=re.I)
+_TROCA_RE = re.compile(rf"troca\s*{_CCY_OPT}\s*([\d.,]+)", flags=re.I)
+_PAGTO_RE = re.compile(r"pagto\s*(.+)", flags=re.I)
+_SEGMENT_RE = re.compile(r"\s*[A-Z0-9]{2}\s*\d{2,4}", flags=re.I)
+_BAG_RE = re.compile(r"\s*\d+pc", flags=re.I)
+_SEPARATOR_RE = re.compile(r"\s*==+\s*$")
+_EUR_RE = re.compile(r"\bEUR\b|€", flags=re.I)
+_BRL_RE = re.compile(r"\bBRL\b|R\$", flags=re.I)
 
+# Tipos de linha produzidos por tokenize()
+SEGMENT = "segment"
+FARE = "fare"
+FEE = "fee"
+PENALTY = "penalty"
+PAYMENT = "payment"
+BAGGAGE = "baggage"
+SEPARATOR = "separator"
+CURRENCY = "currency"
 
-def _parse_single(text: str) -> Dict[str, Any]:
-	# Detectar moeda no texto
-	currency = "USD"
-	if re.search(r"\bEUR\b|€", text, flags=re.I):
-		currency = "EUR"
-	elif re.search(r"\bBRL\b|R\$", text, flags=re.I):
-		currency = "BRL"
-
-	ccy_opt = r"(?:usd|eur|brl|US\$|R\$|€)?"
-	ccy_req = r"(?:usd|eur|brl|US\$|R\$|€)"
-	
-	# v1.1: Capturar múltiplas tarifas (categorias diversas)
-	fares = []
-	fare_pattern = re.compile(
-		rf"tarifa\s*{ccy_opt}\s*([\d.,]+)\s*\+\s*(?:txs?|taxas?)\s*{ccy_opt}\s*([\d.,]+)\s*(\*.*)?$",
-		flags=re.I | re.M
-	)
-	for match in fare_pattern.finditer(text):
-		tarifa, taxas, suffix = match.groups()
-		suffix = (suffix or "").strip().lstrip("*")
-		category = suffix or "ADT"
-		# Normalizações simples
-		low = category.lower()
-		if "chd" in low or "child" in low:
-			category = "CHD"
-		elif "inf" in low:
-			category = "INF"
-		fares.append({
-			"category": category,
-			"tarifa": str(money(tarifa)),
-			"taxas": str(money(taxas)),
-		})
 
-	# Compat: usa primeira tarifa
-	tarifa = money(fares[0]["tarifa"] if fares else "0")
-	taxas_base = money(fares[0]["taxas"] if fares else "0")
+def tokenize(text: str) -> Iterator[Tuple[str, Any]]:
+	"""Classifica cada linha do PNR uma única vez.
+
+	Gera pares (tipo, valor): SEGMENT/BAGGAGE com a linha limpa, FARE com
+	(tarifa, taxas, sufixo), FEE/PENALTY com o valor bruto, PAYMENT com o texto,
+	CURRENCY com "EUR"/"BRL" e SEPARATOR para linhas '=='. Uma linha pode gerar
+	mais de um token (ex.: tarifa e moeda). Os regex só rodam nas linhas cujo
+	texto em minúsculas contém a palavra-chave correspondente.
+	"""
+	for line in text.splitlines():
+		yield from _tokenize_line(line)
 
-	fee = _extract_amount(rf"(?:fee|du|taxa de serviço)\s*{ccy_opt}\s*([\d.,]+)", text)
 
-	# Multa
-	multa_match = re.search(rf"troca\s*{ccy_opt}\s*([\d.,]+)", text, flags=re.I)
-	multa = money(multa_match.group(1)) if multa_match else Decimal("0")
+def _tokenize_line(line: str) -> Iterator[Tuple[str, Any]]:
+	low = line.lower()
+	stripped = low.lstrip()
+	if not stripped:
+		return
+	head = stripped[0]
+	if head == "=" and _SEPARATOR_RE.match(line):
+		yield SEPARATOR, line
+		return
+	if head.isalnum():
+		if _SEGMENT_RE.match(line):
+			yield SEGMENT, line.strip()
+		if head.isdigit() and "pc" in stripped and _BAG_RE.match(line):
+			yield BAGGAGE, line.strip()
+	if "eur" in low or "€" in low:
+		if _EUR_RE.search(line):
+			yield CURRENCY, "EUR"
+	if "brl" in low or "r$" in low:
+		if _BRL_RE.search(line):
+			yield CURRENCY, "BRL"
+	if "tarifa" in low:
+		m = _FARE_RE.search(line)
+		if m:
+			yield FARE, m.groups()
+	if "fee" in low or "du" in low or "taxa de serviço" in low:
+		m = _FEE_RE.search(line)
+		if m:
+			yield FEE, m.group(1)
+	if "troca" in low:
+		m = _TROCA_RE.search(line)
+		if m:
+			yield PENALTY, m.group(1)
+	if "pagto" in low:
+		m = _PAGTO_RE.search(line)
+		if m:
+			yield PAYMENT, m.group(1).strip()
 
-	# Trechos
-	trechos: List[str] = re.findall(r"^\s*[A-Z0-9]{2}\s*\d{2,4}.*$", text, flags=re.I | re.M)
 
-	# Hints adicionais
-	pagto_match = re.search(r"pagto\s*([^\n\r]+)", text, flags=re.I)
-	pagamento_hint = pagto_match.group(1).strip() if pagto_match else ""
-	bag_lines = re.findall(r"^\s*\d+pc\s*[^\r\n]*$", text, flags=re.I | re.M)
-	bagagem_hint = " / ".join([b.strip() for b in bag_lines]) if bag_lines else ""
+def _iter_blocks(lines: Iterable[str]) -> Iterator[List[Tuple[str, Any]]]:
+	"""Agrupa os tokens por bloco (separados por linhas '==').
+
+	Blocos sem nenhuma linha de conteúdo são descartados; cada bloco é emitido
+	assim que o separador seguinte (ou o fim da entrada) é lido.
+	"""
+	tokens: List[Tuple[str, Any]] = []
+	has_content = False
+	for line in lines:
+		if not line.strip():
+			continue
+		line_tokens = list(_tokenize_line(line.rstrip("\r\n")))
+		if line_tokens and line_tokens[0][0] == SEPARATOR:
+			if has_content:
+				yield tokens
+			tokens, has_content = [], False
+			continue
+		has_content = True
+		tokens.extend(line_tokens)
+	if has_content:
+		yield tokens
+
+
+def _fare_category(suffix: str | None) -> str:
+	suffix = (suffix or "").strip().lstrip("*")
+	category = suffix or "ADT"
+	# Normalizações simples
+	low = category.lower()
+	if "chd" in low or "child" in low:
+		return "CHD"
+	if "inf" in low:
+		return "INF"
+	return category
+
+
+def _parse_tokens(tokens: Iterable[Tuple[str, Any]]) -> Dict[str, Any]:
+	has_eur = has_brl = False
+	# v1.1: Capturar múltiplas tarifas (categorias diversas)
+	fares: List[Dict[str, str]] = []
+	trechos: List[str] = []
+	bag_lines: List[str] = []
+	fee_raw = multa_raw = None
+	pagamento_hint = None
+	for kind, value in tokens:
+		if kind == SEGMENT:
+			trechos.append(value)
+		elif kind == FARE:
+			tarifa, taxas, suffix = value
+			fares.append({
+				"category": _fare_category(suffix),
+				"tarifa": str(money(tarifa)),
+				"taxas": str(money(taxas)),
+			})
+		elif kind == FEE:
+			fee_raw = value if fee_raw is None else fee_raw
+		elif kind == PENALTY:
+			multa_raw = value if multa_raw is None else multa_raw
+		elif kind == PAYMENT:
+			pagamento_hint = value if pagamento_hint is None else pagamento_hint
+		elif kind == BAGGAGE:
+			bag_lines.append(value)
+		elif kind == CURRENCY:
+			has_eur = has_eur or value == "EUR"
+			has_brl = has_brl or value == "BRL"
+
+	# Compat: usa primeira tarifa
+	tarifa = money(fares[0]["tarifa"] if fares else "0")
+	taxas_base = money(fares[0]["taxas"] if fares else "0")
+	fee = money(fee_raw) if fee_raw is not None else Decimal("0")
+	multa = money(multa_raw) if multa_raw is not None else Decimal("0")
 
 	return {
 		"tarifa": str(tarifa),
@@ -98,22 +190,40 @@ def _parse_single(text: str) -> Dict[str, Any]:
 		"fee": str(money(fee)),
 		"trechos": trechos,
 		"multa": str(money(multa)),
-		"currency": currency,
-		"pagamento_hint": pagamento_hint,
-		"bagagem_hint": bagagem_hint,
+		"currency": "EUR" if has_eur else ("BRL" if has_brl else "USD"),
+		"pagamento_hint": pagamento_hint or "",
+		"bagagem_hint": " / ".join(bag_lines),
 	}
 
 
+def _parse_single(text: str) -> Dict[str, Any]:
+	return _parse_tokens(tokenize(text))
+
+
+def _is_quotation(q: Dict[str, Any]) -> bool:
+	# Ignorar blocos vazios (sem trechos e sem tarifas)
+	return bool(q.get("trechos") or q.get("fares"))
+
+
+def iter_quotations(stream: Iterable[str]) -> Iterator[Dict[str, Any]]:
+	"""Lê cotações de um arquivo/stdin (ou qualquer iterável de linhas) incrementalmente.
+
+	Cada bloco separado por '==' é parseado e emitido assim que o separador
+	seguinte é lido, sem carregar a entrada inteira na memória.
+	"""
+	for tokens in _iter_blocks(stream):
+		with tracing.span("parse"):
+			q = _parse_tokens(tokens)
+		if _is_quotation(q):
+			yield q
+
+
+@tracing.traced("parse")
 def parse(text: str) -> Dict[str, Any]:
 	# Detecta múltiplas cotações separadas por linhas '=='
-	blocks = [b.strip() for b in re.split(r"^\s*==+\s*$", text, flags=re.M) if b.strip()]
+	blocks = list(_iter_blocks(text.splitlines()))
 	if len(blocks) > 1:
-		quotations = []
-		for b in blocks:
-			q = _parse_single(b)
-			# Ignorar blocos vazios (sem trechos e sem tarifas)
-			if q.get("trechos") or q.get("fares"):
-				quotations.append(q)
+		quotations = [q for q in map(_parse_tokens, blocks) if _is_quotation(q)]
 		# Compat: expõe dados do primeiro bloco (se existir)
 		if quotations:
 			first = quotations[0]
@@ -122,9 +232,32 @@ def parse(text: str) -> Dict[str, Any]:
 			result["is_multi"] = True
 			return result
 		# Se por algum motivo não classificou, cai no parse simples
-	return _parse_single(text)
+	return _parse_tokens(t for block in blocks for t in block)
+
+
+def main(argv: List[str] | None = None) -> int:
+	argv = sys.argv[1:] if argv is None else argv
+	if argv[:1] == ["bulk"]:
+		# Subcomando: parse em lote de diretórios/globs (ver cli/bulk.py)
+		from cli.bulk import main as bulk_main
+		return bulk_main(argv[1:])
+	ap = argparse.ArgumentParser(description="Parser de PNR em texto (stdin -> JSON). Use 'bulk' para lotes de arquivos.")
+	ap.add_argument("input", nargs="?", default="-", help="arquivo de entrada ('-' = stdin)")
+	ap.add_argument("--ndjson", action="store_true", help="emite uma cotação por linha (JSON) à medida que os blocos são lidos")
+	args = ap.parse_args(argv)
+	stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+	try:
+		if args.ndjson:
+			for q in iter_quotations(stream):
+				sys.stdout.write(json.dumps(q, ensure_ascii=False) + "\n")
+				sys.stdout.flush()
+		else:
+			print(json.dumps(parse(stream.read()), ensure_ascii=False, indent=2))
+	finally:
+		if stream is not sys.stdin:
+			stream.close()
+	return 0
 
 
 if __name__ == "__main__":
-	source = sys.stdin.read()
-	print(json.dumps(parse(source), ensure_ascii=False, indent=2))
+	sys.exit(main())
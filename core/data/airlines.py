@@ -2,6 +2,10 @@ from __future__ import annotations
 
 from typing import Dict
 
+from core.data.iata import get_dataset
+
+# Nomes revisados à mão; têm prioridade sobre a base IATA (core/data/iata.bin),
+# inclusive para códigos reaproveitados por mais de uma companhia (ex.: G3)
 _AIRLINES: Dict[str, str] = {
 	"AF": "Air France",
 	"TP": "TAP Air Portugal",
@@ -13,9 +17,17 @@ _AIRLINES: Dict[str, str] = {
 	"KL": "KLM Royal Dutch Airlines",
 	"LH": "Lufthansa",
 	"TK": "Turkish Airlines",
+	"G3": "Gol Linhas Aéreas",
+	"AD": "Azul Linhas Aéreas",
+	"JJ": "LATAM Airlines Brasil",
 }
 
 
 def get_airline_name(iata_code: str) -> str:
 	code = (iata_code or "").upper().strip()
-	return _AIRLINES.get(code, code)
+	found = _AIRLINES.get(code)
+	if found is not None:
+		return found
+	dataset = get_dataset()
+	info = dataset.airline(code) if dataset else None
+	return info.name if info else code
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Optional
 
+from core.data.iata import AirportInfo, get_dataset
+
+# Descrições revisadas à mão; têm prioridade sobre a base IATA (core/data/iata.bin)
 _AIRPORTS: Dict[str, str] = {
 	"GRU": "Guarulhos International Airport (GRU), São Paulo, Brazil",
 	"CDG": "Charles de Gaulle Airport (CDG), Paris, France",
@@ -18,6 +21,24 @@ _AIRPORTS: Dict[str, str] = {
 }
 
 
+def get_airport(iata_code: str) -> Optional[AirportInfo]:
+	"""Registro completo da base IATA (cidade, país, fuso), ou None."""
+	dataset = get_dataset()
+	return dataset.airport((iata_code or "").upper().strip()) if dataset else None
+
+
 def get_airport_description(iata_code: str) -> str:
 	code = (iata_code or "").upper().strip()
-	return _AIRPORTS.get(code, f"{code}")
+	found = _AIRPORTS.get(code)
+	if found is not None:
+		return found
+	info = get_airport(code)
+	if info is None:
+		return code
+	return f"{info.name} ({code}), {info.city}, {info.country}"
+
+
+def get_timezone(iata_code: str) -> str:
+	"""Fuso IANA do aeroporto ("America/Sao_Paulo"); "" se desconhecido."""
+	info = get_airport(iata_code)
+	return info.tz if info else ""
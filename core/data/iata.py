@@ -0,0 +1,156 @@
+"""Base de referência IATA (aeroportos e companhias) em formato binário compacto.
+
+O arquivo ``core/data/iata.bin`` é gerado por ``scripts/build_iata_dataset.py``
+a partir dos CSVs do OpenFlights e versionado junto com o código. Layout
+(little-endian):
+
+- cabeçalho ``<4sHH16sII``: ``b"IATA"``, versão do formato, reservado,
+  versão dos dados (ASCII), nº de aeroportos, nº de companhias;
+- tabela de aeroportos endereçada diretamente pelo código (26³ posições u32);
+- tabela de companhias endereçada diretamente pelo código (36² posições u32);
+- blob de registros: u16 com o tamanho + campos UTF-8 separados por ``\\x1f``.
+
+As posições guardam o deslocamento do registro no blob (0 = ausente), então a
+busca é O(1) e nada é decodificado além do registro pedido. O arquivo é mapeado
+em memória (mmap) no primeiro uso.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import string
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+MAGIC = b"IATA"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHH16sII")
+SLOT = struct.Struct("<I")
+REC_LEN = struct.Struct("<H")
+SEP = "\x1f"
+
+_ALPHA = string.ascii_uppercase
+_ALNUM = string.digits + string.ascii_uppercase
+AIRPORT_SLOTS = len(_ALPHA) ** 3
+AIRLINE_SLOTS = len(_ALNUM) ** 2
+_ALPHA_IDX = {c: i for i, c in enumerate(_ALPHA)}
+_ALNUM_IDX = {c: i for i, c in enumerate(_ALNUM)}
+
+DEFAULT_PATH = Path(__file__).with_name("iata.bin")
+
+
+class AirportInfo(NamedTuple):
+	iata: str
+	name: str
+	city: str
+	country: str
+	tz: str          # nome IANA (ex.: "America/Sao_Paulo"); "" se desconhecido
+	utc_offset: str  # horas em relação a UTC (padrão, sem horário de verão); "" se desconhecido
+	icao: str
+
+
+class AirlineInfo(NamedTuple):
+	iata: str
+	name: str
+	country: str
+	icao: str
+
+
+def airport_slot(code: str) -> int:
+	"""Posição do código de aeroporto (3 letras) na tabela; -1 se inválido."""
+	if len(code) != 3:
+		return -1
+	a, b, c = (_ALPHA_IDX.get(ch, -1) for ch in code)
+	if a < 0 or b < 0 or c < 0:
+		return -1
+	return (a * 26 + b) * 26 + c
+
+
+def airline_slot(code: str) -> int:
+	"""Posição do código de companhia (2 caracteres alfanuméricos) na tabela; -1 se inválido."""
+	if len(code) != 2:
+		return -1
+	a, b = _ALNUM_IDX.get(code[0], -1), _ALNUM_IDX.get(code[1], -1)
+	if a < 0 or b < 0:
+		return -1
+	return a * 36 + b
+
+
+class IataDataset:
+	"""Leitura do ``iata.bin`` mapeado em memória; registros decodificados sob demanda."""
+
+	def __init__(self, path: str | Path = DEFAULT_PATH) -> None:
+		self.path = Path(path)
+		with open(self.path, "rb") as fh:
+			try:
+				self._buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+			except (ValueError, OSError):
+				# arquivo vazio ou sistema sem mmap: lê em memória
+				self._buf = fh.read()
+		if len(self._buf) < HEADER.size:
+			raise ValueError(f"{self.path}: arquivo IATA truncado.")
+		magic, fmt, _, version, self.airport_count, self.airline_count = HEADER.unpack_from(self._buf, 0)
+		if magic != MAGIC or fmt != FORMAT_VERSION:
+			raise ValueError(f"{self.path}: formato IATA desconhecido ({magic!r} v{fmt}).")
+		self.version = version.rstrip(b"\0").decode("ascii")
+		self._airports_at = HEADER.size
+		self._airlines_at = self._airports_at + AIRPORT_SLOTS * SLOT.size
+		self._blob_at = self._airlines_at + AIRLINE_SLOTS * SLOT.size
+		self._airport_cache: Dict[str, Optional[AirportInfo]] = {}
+		self._airline_cache: Dict[str, Optional[AirlineInfo]] = {}
+
+	def _record(self, table_at: int, slot: int) -> Optional[list]:
+		if slot < 0:
+			return None
+		(offset,) = SLOT.unpack_from(self._buf, table_at + slot * SLOT.size)
+		if not offset:
+			return None
+		start = self._blob_at + offset
+		(size,) = REC_LEN.unpack_from(self._buf, start)
+		start += REC_LEN.size
+		return bytes(self._buf[start:start + size]).decode("utf-8").split(SEP)
+
+	def airport(self, code: str) -> Optional[AirportInfo]:
+		try:
+			return self._airport_cache[code]
+		except KeyError:
+			pass
+		fields = self._record(self._airports_at, airport_slot(code.upper()))
+		info = AirportInfo(code.upper(), *fields) if fields else None
+		self._airport_cache[code] = info
+		return info
+
+	def airline(self, code: str) -> Optional[AirlineInfo]:
+		try:
+			return self._airline_cache[code]
+		except KeyError:
+			pass
+		fields = self._record(self._airlines_at, airline_slot(code.upper()))
+		info = AirlineInfo(code.upper(), *fields) if fields else None
+		self._airline_cache[code] = info
+		return info
+
+	def close(self) -> None:
+		if isinstance(self._buf, mmap.mmap):
+			self._buf.close()
+
+
+_DATASET: Optional[IataDataset] = None
+_DATASET_FAILED = False
+_DATASET_LOCK = threading.Lock()
+
+
+def get_dataset() -> Optional[IataDataset]:
+	"""Base carregada no primeiro uso (``SETEMARES_IATA_DATA`` troca o arquivo); None se indisponível."""
+	global _DATASET, _DATASET_FAILED
+	if _DATASET is not None or _DATASET_FAILED:
+		return _DATASET
+	with _DATASET_LOCK:
+		if _DATASET is None and not _DATASET_FAILED:
+			try:
+				_DATASET = IataDataset(os.environ.get("SETEMARES_IATA_DATA") or DEFAULT_PATH)
+			except (OSError, ValueError):
+				_DATASET_FAILED = True
+	return _DATASET
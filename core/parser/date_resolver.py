@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+# Dias por mês (índice 1..12) em ano comum; fevereiro ganha um dia em ano bissexto
+_MONTH_DAYS = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# 29FEB pode estar até 8 anos à frente (ex.: 2096 -> 2104)
+_MAX_YEARS_AHEAD = 8
+
+
+def _is_leap(year: int) -> bool:
+	return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def month_length(year: int, month: int) -> int:
+	return _MONTH_DAYS[month] + (month == 2 and _is_leap(year))
+
+
+class DateResolver:
+	"""Completa datas "DDMMM" (sem ano) de trechos a partir de uma data de referência.
+
+	A referência é a data de emissão da cotação: um trecho cai na primeira
+	ocorrência do dia/mês a partir dela (uma cotação de dezembro para um voo em
+	janeiro vai para o ano seguinte). ``resolve(..., after=)`` empurra o trecho
+	para o ano seguinte quando ele ficaria antes do trecho anterior.
+	Os resultados por (mês, dia) ficam em cache, então uma instância pode ser
+	reutilizada em todos os trechos de um lote.
+	"""
+
+	def __init__(self, reference: date | datetime | None = None) -> None:
+		ref = reference or date.today()
+		self.reference: date = ref.date() if isinstance(ref, datetime) else ref
+		self._cache: Dict[Tuple[int, int], Optional[date]] = {}
+
+	def resolve(self, month: int, day: int, after: Optional[date] = None) -> Optional[date]:
+		"""Data completa do dia/mês, ou None se o dia não existir no mês (ex.: 31APR)."""
+		key = (month, day)
+		try:
+			resolved = self._cache[key]
+		except KeyError:
+			resolved = self._cache[key] = self._first_on_or_after(month, day, self.reference)
+		if resolved is not None and after is not None and resolved < after:
+			resolved = self._first_on_or_after(month, day, after)
+		return resolved
+
+	@staticmethod
+	def _first_on_or_after(month: int, day: int, start: date) -> Optional[date]:
+		if not 1 <= month <= 12 or not 1 <= day <= (29 if month == 2 else _MONTH_DAYS[month]):
+			return None
+		for year in range(start.year, start.year + _MAX_YEARS_AHEAD + 1):
+			if day <= month_length(year, month):
+				resolved = date(year, month, day)
+				if resolved >= start:
+					return resolved
+		return None
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.parser.itinerary_model import Itinerary
+
+Key = Tuple[str, ...]
+
+
+def normalize_key(lines: List[str]) -> Key:
+	"""Chave estável para um conjunto de trechos: espaços colapsados, caixa alta, sem linhas vazias."""
+	return tuple(" ".join(line.split()).upper() for line in lines if line and line.strip())
+
+
+class DecodeCache:
+	"""LRU limitado de itinerários decodificados, com contadores e persistência opcional.
+
+	Os valores são ``Itinerary`` imutáveis (ou None quando nada foi reconhecido),
+	compartilhados entre chamadas. Só entra no cache o que o decoder retorna: se ele
+	levanta exceção (erro, timeout do pnrsh), nada é guardado e a próxima chamada
+	tenta de novo.
+	Com ``path`` o cache é carregado do disco e salvo por ``save()``. O ano de cada
+	trecho depende da data de hoje (ver ``DateResolver``), então as entradas valem
+	só para o dia em que foram decodificadas: o arquivo guarda essa data e o cache
+	em memória é esvaziado na virada do dia.
+	"""
+
+	def __init__(self, maxsize: int = 512, path: Optional[str] = None) -> None:
+		self.maxsize = max(1, int(maxsize))
+		self.path = Path(path) if path else None
+		self.hits = 0
+		self.misses = 0
+		self._data: "OrderedDict[Key, Optional[Itinerary]]" = OrderedDict()
+		self._lock = threading.Lock()
+		self._dirty = False
+		self._day = date.today()
+		if self.path is not None:
+			self.load()
+
+	def __len__(self) -> int:
+		return len(self._data)
+
+	def get_or_decode(self, lines: List[str], decoder: Callable[[List[str]], Optional[Itinerary]]) -> Optional[Itinerary]:
+		key = normalize_key(lines)
+		today = date.today()
+		with self._lock:
+			if today != self._day:
+				self._data.clear()
+				self._day = today
+			if key in self._data:
+				self._data.move_to_end(key)
+				self.hits += 1
+				return self._data[key]
+			self.misses += 1
+		# decodifica a forma normalizada: mesma chave, mesmo resultado
+		value = decoder(list(key))
+		self.put(key, value)
+		return value
+
+	def put(self, key: Key, value: Optional[Itinerary]) -> None:
+		with self._lock:
+			self._data[key] = value
+			self._data.move_to_end(key)
+			while len(self._data) > self.maxsize:
+				self._data.popitem(last=False)
+			self._dirty = True
+
+	def clear(self) -> None:
+		with self._lock:
+			self._data.clear()
+			self.hits = self.misses = 0
+			self._dirty = True
+
+	def stats(self) -> Dict[str, Any]:
+		total = self.hits + self.misses
+		return {
+			"size": len(self._data),
+			"maxsize": self.maxsize,
+			"hits": self.hits,
+			"misses": self.misses,
+			"hit_rate": (self.hits / total) if total else 0.0,
+		}
+
+	def load(self) -> None:
+		if self.path is None or not self.path.exists():
+			return
+		try:
+			raw = json.loads(self.path.read_text(encoding="utf-8"))
+		except Exception:
+			return
+		if raw.get("reference") != self._day.isoformat():
+			return
+		with self._lock:
+			for item in raw.get("entries", [])[-self.maxsize:]:
+				self._data[tuple(item["key"])] = Itinerary.from_dict(item.get("value"))
+			self._dirty = False
+
+	def save(self) -> None:
+		if self.path is None or not self._dirty:
+			return
+		with self._lock:
+			entries = [{"key": list(k), "value": v.to_dict() if v else None} for k, v in self._data.items()]
+			self._dirty = False
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+		tmp.write_text(json.dumps({"reference": self._day.isoformat(), "entries": entries}, ensure_ascii=False), encoding="utf-8")
+		os.replace(tmp, self.path)
+
+
+class DecodeFailed(Exception):
+	"""Nenhum decoder chegou a uma resposta (erro ou timeout); o resultado não vai para o cache."""
+
+
+def _decode_uncached(lines: List[str]) -> Optional[Itinerary]:
+	error: Optional[Exception] = None
+	decoded = None
+	try:
+		from core.parser.itinerary_decoder import decode
+		decoded = decode(lines)
+	except Exception as e:
+		error = e
+	if decoded:
+		return decoded
+	# fallback para pnrsh quando o parser interno não retornar voos
+	from core.parser.pnrsh_adapter import PnrshNotAvailable, get_pool
+	try:
+		data = get_pool().decode(lines)
+	except PnrshNotAvailable:
+		data = None  # sem binário: fica a resposta do decoder interno
+	except Exception as e:
+		raise DecodeFailed(f"pnrsh falhou: {e}") from e
+	if data:
+		return Itinerary.from_dict(data)
+	if error is not None:
+		raise DecodeFailed(f"decoder interno falhou: {error}") from error
+	return None
+
+
+_CACHE: Optional[DecodeCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache() -> DecodeCache:
+	"""Cache do processo; ``SETEMARES_DECODE_CACHE`` aponta o arquivo de persistência (opcional)."""
+	global _CACHE
+	with _CACHE_LOCK:
+		if _CACHE is None:
+			_CACHE = DecodeCache(path=os.environ.get("SETEMARES_DECODE_CACHE") or None)
+		return _CACHE
+
+
+def configure_cache(maxsize: int = 512, path: Optional[str] = None) -> DecodeCache:
+	global _CACHE
+	with _CACHE_LOCK:
+		_CACHE = DecodeCache(maxsize, path)
+		return _CACHE
+
+
+def decode_itinerary(lines: List[str]) -> Optional[Itinerary]:
+	"""Decodifica trechos (decoder interno, pnrsh como fallback) passando pelo cache LRU.
+
+	Falhas (``DecodeFailed``) viram None para quem chama, sem entrar no cache.
+	"""
+	if not lines:
+		return None
+	try:
+		return get_cache().get_or_decode(list(lines), _decode_uncached)
+	except DecodeFailed:
+		return None
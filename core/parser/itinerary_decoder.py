@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from typing import List, Dict, Any, Optional
 
+from core import tracing
+from core.parser.date_resolver import DateResolver
+from core.parser.itinerary_model import Itinerary, Segment, airport, carrier
+
 # Ex.: "AF 459 14APR GRUCDG HS2 1915 #1115"
 #      "AF 293 05MAY HNDCDG HS2 0005 0800"
 _SEGMENT_RE = re.compile(
@@ -20,81 +24,86 @@ _MONTHS = {
     "JUL": 7, "AUG": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DEC": 12,
 }
 
-
-def _fmt_time(day: str, mon: str, hm: str) -> str:
-    """Retorna representação textual estável: YYYY-MM-DD HH:MM sem ano real (usa ano corrente)."""
-    now = datetime.now()
-    hour = hm[-4:-2]
-    minute = hm[-2:]
-    month = _MONTHS.get(mon.upper(), now.month)
-    try:
-        dt = datetime(now.year, month, int(day), int(hour), int(minute))
-        return dt.strftime("%Y-%m-%d %H:%M")
-    except Exception:
-        return f"{day}{mon} {hour}:{minute}"
+_ONE_DAY = timedelta(days=1)
 
 
-def _make_dt(day: str, mon: str, hm: str) -> datetime:
-    """Cria um datetime no ano corrente com base em dia, mês (MMM) e hora/minuto (HHMM)."""                                                                    
-    now = datetime.now()
-    # Garantir que hm tem 4 dígitos (preencher com zeros à esquerda se necessário)                                                                           
-    hm_padded = hm.strip().rjust(4, "0")
-    # Para "2040": [0:2] = "20" (hora), [2:4] = "40" (minuto)
+def _make_dt(day: date, hm: str) -> datetime:
+    """Combina a data já resolvida com hora/minuto (HHMM, ou HMM)."""
     # Para "040": após rjust(4) = "0040": [0:2] = "00", [2:4] = "40"
-    hour = int(hm_padded[0:2]) if len(hm_padded) >= 2 else 0
-    minute = int(hm_padded[2:4]) if len(hm_padded) >= 4 else 0
-    month = _MONTHS.get(mon.upper(), now.month)
+    hm = hm.rjust(4, "0")
     try:
-        return datetime(now.year, month, int(day), hour, minute)
-    except Exception:
+        return datetime(day.year, day.month, day.day, int(hm[0:2]), int(hm[2:4]))
+    except ValueError:
         # fallback conservador
-        return datetime(now.year, month, 1, 0, 0)
+        return datetime(day.year, day.month, 1, 0, 0)
 
 
-def decode_lines(lines: List[str]) -> Optional[Dict[str, Any]]:
-    flights: List[Dict[str, Any]] = []
-    overnight_count = 0
+def parse_segments(
+    lines: List[str],
+    ref: Optional[date | datetime] = None,
+    resolver: Optional[DateResolver] = None,
+) -> List[Segment]:
+    """Decodifica as linhas de voo em ``Segment`` (datetimes reais, sem formatação).
+
+    ``ref`` é a data de emissão da cotação (padrão: hoje), usada para completar o
+    ano de cada trecho; em lotes, passe um ``DateResolver`` compartilhado.
+    """
+    resolver = resolver or DateResolver(ref)
+    match = _SEGMENT_RE.match
+    segments: List[Segment] = []
+    prev: Optional[date] = None
     for raw in lines:
-        m = _SEGMENT_RE.match(raw)
+        m = match(raw)
         if not m:
             continue
-        d = m.groupdict()
-        dep_time = d["dep_time"].rjust(4, "0")
-        arr_raw = d["arr_time"]
-        is_overnight = arr_raw.startswith("#")
+        code, flight, day, mon, orig, dest, cls, dep_time, arr_time = m.groups()
+        is_overnight = arr_time[0] == "#"
         if is_overnight:
-            overnight_count += 1
-            arr_time = arr_raw[1:]
+            arr_time = arr_time[1:]
+        month = _MONTHS.get(mon.upper(), resolver.reference.month)
+        dep_day = resolver.resolve(month, int(day), prev)
+        if dep_day is None:
+            # dia inexistente no mês (ex.: 31APR): fallback conservador, dia 1 às 00:00
+            dep_dt = arr_dt = datetime.combine(resolver.resolve(month, 1, prev), time())
         else:
-            arr_time = arr_raw
-        arr_time = arr_time.rjust(4, "0")
+            dep_dt = _make_dt(dep_day, dep_time)
+            arr_dt = _make_dt(dep_day, arr_time)
+        prev = dep_dt.date()
+        origin, destination = airport(orig), airport(dest)
 
-        from core.data.airports import get_airport_description
-        dep_dt = _make_dt(d["dep_day"], d["dep_mon"], dep_time)
-        arr_dt = _make_dt(d["dep_day"], d["dep_mon"], arr_time)
-        
-        # Se tem #, chegada é no dia seguinte
+        # Se tem #, chegada é no dia seguinte.
+        # Sem #, com os dois fusos conhecidos: dia seguinte se a chegada (em UTC) não for
+        # depois da partida (ex.: GRU 22:20 -> LIS 11:40; NRT 21:00 -> HNL 09:00 é no mesmo dia).
+        # Sem fusos: horário de chegada menor que o de partida indica o dia seguinte.
         if is_overnight:
-            arr_dt = arr_dt + timedelta(days=1)
-        # Se não tem #, mas horário de chegada é menor que o de partida e diferença > 12h, 
-        # provavelmente chegou no dia seguinte (ex: partida 22:20, chegada 06:25)
-        elif arr_dt < dep_dt or (arr_dt - dep_dt).total_seconds() < -12 * 3600:
-            arr_dt = arr_dt + timedelta(days=1)
-        flights.append({
-            "company": {"iataCode": d["carrier"], "description": d["carrier"]},
-            "flight": d["flight"],
-            "departureTime": dep_dt.strftime("%Y-%m-%d %H:%M"),
-            "landingTime": arr_dt.strftime("%Y-%m-%d %H:%M"),
-            "departureAirport": {"iataCode": d["orig"], "description": get_airport_description(d["orig"])},
-            "landingAirport": {"iataCode": d["dest"], "description": get_airport_description(d["dest"])},
-            "overnight": is_overnight,
-        })
+            arr_dt += _ONE_DAY
+        elif origin.tz is not None and destination.tz is not None:
+            if arr_dt.replace(tzinfo=destination.tz) <= dep_dt.replace(tzinfo=origin.tz):
+                arr_dt += _ONE_DAY
+        elif arr_dt < dep_dt:
+            arr_dt += _ONE_DAY
+        segments.append(Segment(carrier(code), flight, origin, destination, dep_dt, arr_dt, is_overnight, cls))
+    return segments
+
 
-    if not flights:
+@tracing.traced("decode")
+def decode(
+    lines: List[str],
+    ref: Optional[date | datetime] = None,
+    resolver: Optional[DateResolver] = None,
+) -> Optional[Itinerary]:
+    """Itinerário estruturado (aeroportos/companhias compartilhados), ou None sem voos."""
+    segments = parse_segments(lines, ref, resolver)
+    if not segments:
         return None
+    return Itinerary(tuple(segments))
+
 
-    return {
-        "source": "internal-parser",
-        "overnights": overnight_count,
-        "flightInfo": {"flights": flights},
-    }
+def decode_lines(
+    lines: List[str],
+    ref: Optional[date | datetime] = None,
+    resolver: Optional[DateResolver] = None,
+) -> Optional[Dict[str, Any]]:
+    """Compat: mesmo resultado de ``decode`` no formato JSON do pnrsh."""
+    itinerary = decode(lines, ref, resolver)
+    return itinerary.to_dict() if itinerary else None
@@ -1,42 +1,286 @@
 from __future__ import annotations
 
+import atexit
 import json
+import os
+import queue
 import subprocess
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+from core import tracing
+
+# Tempo máximo (s) por decodificação; evita travar a UI se o binário não responder
+DEFAULT_TIMEOUT = float(os.environ.get("PNRSH_TIMEOUT", "10") or 10)
+# Tempo máximo (s) do handshake que detecta o modo --serve (binário antigo ficaria esperando o stdin)
+PROBE_TIMEOUT = float(os.environ.get("PNRSH_PROBE_TIMEOUT", "2") or 2)
+
 
 class PnrshNotAvailable(Exception):
 	pass
 
 
+class PnrshError(Exception):
+	pass
+
+
+_BIN_PATH: Optional[Path] = None
+
+
 def _pnrsh_path() -> Path:
-	bin_path = Path("bin/pnrsh.exe").resolve()
+	global _BIN_PATH
+	if _BIN_PATH is not None and _BIN_PATH.exists():
+		return _BIN_PATH
+	bin_path = Path(os.environ.get("PNRSH_BIN") or "bin/pnrsh.exe").resolve()
 	if not bin_path.exists():
 		raise PnrshNotAvailable("binário pnrsh.exe não encontrado em bin/.")
+	_BIN_PATH = bin_path
 	return bin_path
 
 
+def _default_cmd() -> List[str]:
+	return [str(_pnrsh_path())]
+
+
+class PnrshWorker:
+	"""Processo pnrsh persistente (modo ``--serve``).
+
+	Protocolo enquadrado por linha: cada requisição é uma linha JSON
+	``{"id": n, "lines": [...]}`` no stdin; a resposta é uma linha JSON
+	``{"id": n, "result": {...}}`` (ou ``"error"``) no stdout. O handshake
+	``{"id": 0, "hello": true}`` é respondido com ``{"id": 0, "serve": ...}``.
+	"""
+
+	def __init__(self, cmd: List[str]) -> None:
+		self.cmd = list(cmd)
+		self._seq = 0
+		self._responses: "queue.Queue[Optional[str]]" = queue.Queue()
+		with tracing.span("pnrsh.spawn"):
+			self.proc = subprocess.Popen(
+				self.cmd + ["--serve"],
+				stdin=subprocess.PIPE,
+				stdout=subprocess.PIPE,
+				stderr=subprocess.DEVNULL,
+				text=True,
+				encoding="utf-8",
+				bufsize=1,
+			)
+		self._reader = threading.Thread(target=self._read_loop, name="pnrsh-reader", daemon=True)
+		self._reader.start()
+
+	def _read_loop(self) -> None:
+		assert self.proc.stdout is not None
+		for line in self.proc.stdout:
+			self._responses.put(line)
+		self._responses.put(None)  # EOF: processo terminou
+
+	def alive(self) -> bool:
+		return self.proc.poll() is None
+
+	def _exchange(self, msg: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+		if not self.alive():
+			raise PnrshError("processo pnrsh encerrado.")
+		assert self.proc.stdin is not None
+		try:
+			self.proc.stdin.write(json.dumps(msg, ensure_ascii=False) + "\n")
+			self.proc.stdin.flush()
+		except (OSError, ValueError) as e:
+			self.kill()
+			raise PnrshError(f"falha ao enviar ao pnrsh: {e}")
+		while True:
+			try:
+				raw = self._responses.get(timeout=timeout)
+			except queue.Empty:
+				self.kill()
+				raise PnrshError(f"pnrsh não respondeu em {timeout:.1f}s.")
+			if raw is None:
+				self.kill()
+				raise PnrshError("processo pnrsh encerrado durante a requisição.")
+			try:
+				reply = json.loads(raw)
+			except ValueError:
+				self.kill()
+				raise PnrshError("resposta inválida do pnrsh (modo --serve não suportado?).")
+			if isinstance(reply, dict) and reply.get("id") == msg["id"]:
+				return reply
+			# resposta atrasada de uma requisição anterior (já expirada): descarta
+
+	def handshake(self, timeout: float) -> None:
+		"""Confirma que o processo fala o protocolo --serve; PnrshError se não falar."""
+		if "serve" not in self._exchange({"id": 0, "hello": True}, timeout):
+			self.kill()
+			raise PnrshError("pnrsh não confirmou o modo --serve.")
+
+	def request(self, lines: List[str], timeout: float) -> Optional[Dict[str, Any]]:
+		self._seq += 1
+		reply = self._exchange({"id": self._seq, "lines": lines}, timeout)
+		if reply.get("error"):
+			return None
+		return reply.get("result") or None
+
+	def kill(self) -> None:
+		try:
+			if self.proc.stdin:
+				self.proc.stdin.close()
+		except Exception:
+			pass
+		if self.alive():
+			try:
+				self.proc.kill()
+			except Exception:
+				pass
+		try:
+			self.proc.wait(timeout=2)
+		except Exception:
+			pass
+
+
+class PnrshPool:
+	"""Pool de workers pnrsh persistentes, criados sob demanda e reiniciados após falha.
+
+	Antes do primeiro uso um handshake curto (``probe_timeout``) verifica se o
+	binário suporta ``--serve``; sem suporte, o pool passa a usar uma chamada por
+	decodificação, com timeout. Falhas de decodificação depois disso só reiniciam
+	o worker.
+	"""
+
+	def __init__(
+		self,
+		cmd: Optional[List[str]] = None,
+		size: int = 2,
+		timeout: float = DEFAULT_TIMEOUT,
+		probe_timeout: float = PROBE_TIMEOUT,
+	) -> None:
+		self._cmd = cmd
+		self.size = max(1, int(size))
+		self.timeout = timeout
+		self.probe_timeout = probe_timeout
+		self.serve_supported: Optional[bool] = None
+		self.restarts = 0
+		self._idle: "queue.LifoQueue[PnrshWorker]" = queue.LifoQueue()
+		self._created = 0
+		self._lock = threading.Lock()
+		self._slots = threading.Semaphore(self.size)
+		self._closed = False
+
+	@property
+	def cmd(self) -> List[str]:
+		if self._cmd is None:
+			self._cmd = _default_cmd()
+		return self._cmd
+
+	def _acquire(self) -> PnrshWorker:
+		try:
+			worker = self._idle.get_nowait()
+			if worker.alive():
+				return worker
+			worker.kill()
+			with self._lock:
+				self.restarts += 1
+		except queue.Empty:
+			pass
+		return PnrshWorker(self.cmd)
+
+	def _probe(self) -> bool:
+		"""Detecta (uma vez, sob o lock) o modo --serve; o worker do handshake fica no pool."""
+		with self._lock:
+			if self.serve_supported is None:
+				worker = PnrshWorker(self.cmd)  # binário ausente/sem permissão: propaga, sem decidir
+				try:
+					worker.handshake(self.probe_timeout)
+				except PnrshError:
+					worker.kill()
+					self.serve_supported = False
+				else:
+					self.serve_supported = True
+					self._idle.put(worker)
+			return self.serve_supported
+
+	@tracing.traced("pnrsh.decode")
+	def decode(self, lines: List[str], timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+		timeout = self.timeout if timeout is None else timeout
+		if self._closed:
+			raise PnrshError("pool pnrsh encerrado.")
+		if not self._probe():
+			return _run_once(self.cmd, lines, timeout)
+		with self._slots:
+			worker = self._acquire()
+			try:
+				result = worker.request(lines, timeout)
+			except PnrshError:
+				worker.kill()
+				with self._lock:
+					self.restarts += 1
+				raise
+			self._idle.put(worker)
+			return result
+
+	def close(self) -> None:
+		self._closed = True
+		while True:
+			try:
+				self._idle.get_nowait().kill()
+			except queue.Empty:
+				break
+
+
+@tracing.traced("pnrsh.run_once")
+def _run_once(cmd: List[str], lines: List[str], timeout: float) -> Optional[Dict[str, Any]]:
+	payload = "\n".join(lines)
+	try:
+		proc = subprocess.run(cmd, input=payload.encode("utf-8"), stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False, timeout=timeout)
+	except subprocess.TimeoutExpired:
+		raise PnrshError(f"pnrsh não respondeu em {timeout:.0f}s.")
+	if proc.returncode != 0:
+		return None
+	try:
+		return json.loads(proc.stdout.decode("utf-8", errors="ignore") or "{}") or None
+	except ValueError:
+		return None
+
+
+_POOL: Optional[PnrshPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool() -> PnrshPool:
+	global _POOL
+	with _POOL_LOCK:
+		if _POOL is None:
+			_POOL = PnrshPool(size=int(os.environ.get("PNRSH_WORKERS", "2") or 2))
+			atexit.register(_POOL.close)
+		return _POOL
+
+
+def configure_pool(
+	cmd: Optional[List[str]] = None,
+	size: int = 2,
+	timeout: float = DEFAULT_TIMEOUT,
+	probe_timeout: float = PROBE_TIMEOUT,
+) -> PnrshPool:
+	"""Substitui o pool do processo (ex.: testes com binário falso, ou outro caminho)."""
+	global _POOL
+	with _POOL_LOCK:
+		old, _POOL = _POOL, PnrshPool(cmd, size, timeout, probe_timeout)
+		atexit.register(_POOL.close)
+	if old is not None:
+		old.close()
+	return _POOL
+
+
 def decode_segments(lines: List[str]) -> Optional[Dict[str, Any]]:
-	"""Chama o binário pnrsh para decodificar linhas de voo.
+	"""Decodifica linhas de voo via pnrsh (worker persistente do pool).
 	Retorna dict (JSON) ou None em caso de falha.
 	Cai para o decoder interno se pnrsh não estiver disponível.
 	"""
-	# 1) Tenta via pnrsh.exe se disponível
+	# 1) Tenta via pnrsh se disponível
 	try:
-		cmd = [str(_pnrsh_path())]
-		payload = "\n".join(lines)
-		proc = subprocess.run(cmd, input=payload.encode("utf-8"), stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
-		if proc.returncode == 0:
-			try:
-				data = json.loads(proc.stdout.decode("utf-8", errors="ignore") or "{}")
-				if data:
-					return data
-			except Exception:
-				# continua para fallback
-				pass
+		data = get_pool().decode(lines)
+		if data:
+			return data
 	except Exception:
-		# Se qualquer erro ocorrer (inclui ausência do binário), tenta fallback interno
+		# Se qualquer erro ocorrer (inclui ausência do binário e timeout), tenta fallback interno
 		pass
 
 	# 2) Fallback: decoder interno puro (sem GitHub)
@@ -1,12 +1,40 @@
+from dataclasses import dataclass
 from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
 from typing import Dict
 
+from core import tracing
+
 
 def q2(value: Decimal | str | float) -> Decimal:
-	return Decimal(str(value)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+	if not isinstance(value, Decimal):
+		value = Decimal(str(value))
+	return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
 
-def compute_totals(tarifa: str | float | Decimal, taxas_base: str | float | Decimal, rav_percent: int | float, fee: str | float | Decimal) -> Dict[str, str]:
+@dataclass(frozen=True, slots=True)
+class Totals:
+	"""Resultado numérico por bilhete (Decimal com 2 casas); formatação fica no template."""
+	rav: Decimal
+	comissao: Decimal
+	taxas_exibidas: Decimal
+	total: Decimal
+
+	def as_strings(self) -> Dict[str, str]:
+		return {
+			"rav": str(self.rav),
+			"comissao": str(self.comissao),
+			"taxas_exibidas": str(self.taxas_exibidas),
+			"total": str(self.total),
+		}
+
+	@classmethod
+	def from_cents(cls, rav: int, comissao: int, taxas_exibidas: int, total: int) -> "Totals":
+		return cls(*(Decimal(int(v)).scaleb(-2) for v in (rav, comissao, taxas_exibidas, total)))
+
+
+@tracing.traced("pricing")
+def price(tarifa: str | float | Decimal, taxas_base: str | float | Decimal, rav_percent: int | float, fee: str | float | Decimal) -> Totals:
 	"""Calcula RAV, taxas exibidas, comissão (lucro) e total por bilhete.
 
 	Regras:
@@ -16,18 +44,87 @@ def compute_totals(tarifa: str | float | Decimal, taxas_base: str | float | Deci
 	- Total = tarifa_base + taxas_exibidas
 	- Arredondamento: 2 casas, ROUND_HALF_UP
 	"""
-	tarifa_d = Decimal(str(tarifa))
-	taxas_base_d = Decimal(str(taxas_base))
-	fee_d = Decimal(str(fee))
+	tarifa_d = tarifa if isinstance(tarifa, Decimal) else Decimal(str(tarifa))
+	taxas_base_d = taxas_base if isinstance(taxas_base, Decimal) else Decimal(str(taxas_base))
+	fee_d = fee if isinstance(fee, Decimal) else Decimal(str(fee))
 
 	rav = q2(tarifa_d * Decimal(rav_percent) / Decimal(100))
 	comissao = q2(rav + fee_d)
 	taxas_exibidas = q2(taxas_base_d + comissao)
 	total = q2(tarifa_d + taxas_exibidas)
+	return Totals(rav, comissao, taxas_exibidas, total)
+
+
+def compute_totals(tarifa: str | float | Decimal, taxas_base: str | float | Decimal, rav_percent: int | float, fee: str | float | Decimal) -> Dict[str, str]:
+	"""Compat: mesmo cálculo de ``price`` com os valores como string."""
+	return price(tarifa, taxas_base, rav_percent, fee).as_strings()
+
+
+def to_cents(value: str | float | Decimal | int) -> int:
+	"""Converte um valor monetário para centavos inteiros (ROUND_HALF_UP)."""
+	return int(q2(value) * 100)
+
+
+def _div_half_up(num: int, den: int) -> int:
+	# divisão inteira com arredondamento ROUND_HALF_UP (meio se afasta do zero), den > 0
+	q, r = divmod(abs(num), den)
+	if 2 * r >= den:
+		q += 1
+	return q if num >= 0 else -q
+
+
+def _is_ndarray(value) -> bool:
+	return type(value).__module__ == "numpy" and hasattr(value, "dtype")
+
+
+def _column(value, n: int) -> list:
+	if isinstance(value, (list, tuple)) or _is_ndarray(value):
+		if len(value) != n:
+			raise ValueError("colunas com tamanhos diferentes.")
+		return [int(v) for v in value] if _is_ndarray(value) else list(value)
+	return [value] * n
+
+
+@tracing.traced("pricing.batch")
+def compute_totals_batch(tarifa_cents, taxas_base_cents, rav_percent, fee_cents) -> Dict[str, list]:
+	"""Versão em lote de ``compute_totals`` sobre colunas de centavos inteiros.
+
+	``tarifa_cents``/``taxas_base_cents`` são sequências (listas ou arrays NumPy) de
+	inteiros em centavos; ``rav_percent`` e ``fee_cents`` podem ser escalares ou colunas.
+	Retorna as colunas "rav", "comissao", "taxas_exibidas" e "total" em centavos,
+	com os mesmos resultados (ROUND_HALF_UP) de ``compute_totals`` linha a linha.
+	Com arrays NumPy e RAV único a conta é vetorizada (resultado em arrays int64).
+	"""
+	n = len(tarifa_cents)
+	if _is_ndarray(tarifa_cents) and not isinstance(rav_percent, (list, tuple)) and not _is_ndarray(rav_percent):
+		out = _compute_totals_numpy(tarifa_cents, taxas_base_cents, rav_percent, fee_cents)
+		if out is not None:
+			return out
+	tarifas = _column(tarifa_cents, n)
+	taxas = _column(taxas_base_cents, n)
+	fees = _column(fee_cents, n)
+	# Decimal(float) é exato: mesma semântica de compute_totals para percentuais float
+	pcts = [Fraction(Decimal(p)) for p in _column(rav_percent, n)]
+	rav = [_div_half_up(int(t) * p.numerator, p.denominator * 100) for t, p in zip(tarifas, pcts)]
+	comissao = [r + int(f) for r, f in zip(rav, fees)]
+	taxas_exibidas = [int(tx) + c for tx, c in zip(taxas, comissao)]
+	total = [int(t) + te for t, te in zip(tarifas, taxas_exibidas)]
+	return {"rav": rav, "comissao": comissao, "taxas_exibidas": taxas_exibidas, "total": total}
+
+
+def _compute_totals_numpy(tarifa_cents, taxas_base_cents, rav_percent, fee_cents) -> Dict[str, list] | None:
+	import numpy as np
 
-	return {
-		"rav": str(rav),
-		"comissao": str(comissao),
-		"taxas_exibidas": str(taxas_exibidas),
-		"total": str(total),
-	}
+	pct = Fraction(Decimal(rav_percent))
+	num, den = pct.numerator, pct.denominator * 100
+	tarifas = np.asarray(tarifa_cents, dtype=np.int64)
+	# 2*|tarifa*num| + den precisa caber em int64; senão cai no caminho com inteiros Python
+	limit = int(np.abs(tarifas).max()) if tarifas.size else 0
+	if limit * abs(num) * 2 + den >= 2 ** 63 or den >= 2 ** 62:
+		return None
+	prod = tarifas * num
+	rav = np.sign(prod) * ((2 * np.abs(prod) + den) // (2 * den))
+	comissao = rav + np.asarray(fee_cents, dtype=np.int64)
+	taxas_exibidas = np.asarray(taxas_base_cents, dtype=np.int64) + comissao
+	total = tarifas + taxas_exibidas
+	return {"rav": rav, "comissao": comissao, "taxas_exibidas": taxas_exibidas, "total": total}
@@ -0,0 +1,262 @@
+"""Medição de tempo por etapa do pipeline de cotação (parse, decode, pnrsh, preço, PDF).
+
+Desligado por padrão. ``SETEMARES_TRACE`` liga:
+
+- ``1``: registra em memória (``records()``, ``dump_jsonl()``, ``dump_chrome()``);
+- um caminho (ex.: ``logs/trace.jsonl``): além disso, acrescenta os registros ao
+  arquivo como JSON lines ao fim de cada cotação e na saída do processo. Vários
+  processos (ex.: ``cli bulk``) podem escrever no mesmo arquivo.
+
+Cada registro é um intervalo (span) com nome da etapa, cotação, início (µs desde
+a época), duração (µs), pid/tid e atributos. ``python -m core.tracing trace.jsonl``
+resume os tempos por cotação e ``--chrome trace.json`` converte para o formato
+do chrome://tracing / Perfetto.
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import contextvars
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Deque, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Registros guardados em memória (os mais antigos são descartados)
+MAX_RECORDS = 100_000
+
+_enabled = False
+_path: Optional[Path] = None
+_records: Deque[Dict[str, Any]] = deque(maxlen=MAX_RECORDS)
+_unflushed: List[Dict[str, Any]] = []
+_lock = threading.Lock()
+_quote: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("setemares_trace_quote", default=None)
+_quote_seq = itertools.count(1)
+_NULL = nullcontext()
+# perf_counter para durações, ancorado no relógio de parede para alinhar processos
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+
+def configure(enabled: Optional[bool] = None, path: str | Path | None = None) -> None:
+	"""Liga/desliga a medição; ``path`` é o arquivo JSONL de saída (None = só memória)."""
+	global _enabled, _path
+	_path = Path(path) if path else None
+	_enabled = bool(path) if enabled is None else enabled
+
+
+def _configure_from_env() -> None:
+	value = (os.environ.get("SETEMARES_TRACE") or "").strip()
+	if value.lower() in ("", "0", "false", "off"):
+		configure(False)
+	elif value.lower() in ("1", "true", "on"):
+		configure(True)
+	else:
+		configure(True, value)
+
+
+def enabled() -> bool:
+	return _enabled
+
+
+def current_quote() -> Optional[str]:
+	return _quote.get()
+
+
+def _record(name: str, start_ns: int, end_ns: int, attrs: Dict[str, Any]) -> None:
+	rec = {
+		"name": name,
+		"quote": _quote.get(),
+		"ts": (start_ns + _EPOCH_OFFSET_NS) // 1000,
+		"dur": (end_ns - start_ns) // 1000,
+		"pid": os.getpid(),
+		"tid": threading.get_ident(),
+	}
+	if attrs:
+		rec["args"] = attrs
+	with _lock:
+		_records.append(rec)
+		if _path is not None:
+			_unflushed.append(rec)
+
+
+@contextmanager
+def _span(name: str, attrs: Dict[str, Any]) -> Iterator[None]:
+	start = time.perf_counter_ns()
+	error = None
+	try:
+		yield
+	except BaseException as e:
+		error = type(e).__name__
+		raise
+	finally:
+		if error is not None:
+			attrs = {**attrs, "error": error}
+		_record(name, start, time.perf_counter_ns(), attrs)
+
+
+def span(name: str, **attrs: Any):
+	"""Context manager que mede a etapa ``name``; sem custo relevante quando desligado."""
+	if not _enabled:
+		return _NULL
+	return _span(name, attrs)
+
+
+def traced(name: str) -> Callable[[F], F]:
+	"""Decorador: mede cada chamada da função como a etapa ``name``."""
+	def decorator(fn: F) -> F:
+		@functools.wraps(fn)
+		def wrapper(*args: Any, **kwargs: Any) -> Any:
+			if not _enabled:
+				return fn(*args, **kwargs)
+			with _span(name, {}):
+				return fn(*args, **kwargs)
+		return wrapper  # type: ignore[return-value]
+	return decorator
+
+
+@contextmanager
+def quote(label: Optional[str] = None) -> Iterator[Optional[str]]:
+	"""Agrupa as etapas seguintes sob uma cotação.
+
+	Sem ``label`` reaproveita a cotação corrente ou gera ``Q0001``, ``Q0002``...
+	Ao fim da cotação mais externa os registros pendentes vão para o arquivo.
+	"""
+	if not _enabled:
+		yield None
+		return
+	outer = _quote.get()
+	if label is None and outer is not None:
+		yield outer
+		return
+	token = _quote.set(label or f"Q{next(_quote_seq):04d}")
+	try:
+		yield _quote.get()
+	finally:
+		_quote.reset(token)
+		if outer is None:
+			flush()
+
+
+def bind(coro: Coroutine[Any, Any, Any]) -> Coroutine[Any, Any, Any]:
+	"""Leva a cotação corrente para ``coro`` quando ela roda em outro loop/thread."""
+	label = _quote.get()
+	if not _enabled or label is None:
+		return coro
+
+	async def _bound() -> Any:
+		_quote.set(label)  # a task tem cópia própria do contexto
+		return await coro
+
+	return _bound()
+
+
+def records() -> List[Dict[str, Any]]:
+	with _lock:
+		return list(_records)
+
+
+def clear() -> None:
+	with _lock:
+		_records.clear()
+		_unflushed.clear()
+
+
+def flush() -> None:
+	"""Acrescenta ao arquivo configurado os registros ainda não gravados."""
+	if _path is None:
+		return
+	with _lock:
+		pending = _unflushed[:]
+		_unflushed.clear()
+	if not pending:
+		return
+	try:
+		_path.parent.mkdir(parents=True, exist_ok=True)
+		# uma única escrita em modo append: linhas de processos diferentes não se misturam
+		with open(_path, "a", encoding="utf-8") as fh:
+			fh.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in pending))
+	except OSError:
+		pass
+
+
+def dump_jsonl(path: str | Path, recs: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+	with open(path, "w", encoding="utf-8") as fh:
+		for r in records() if recs is None else recs:
+			fh.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+
+def load_jsonl(path: str | Path) -> List[Dict[str, Any]]:
+	with open(path, encoding="utf-8") as fh:
+		return [json.loads(line) for line in fh if line.strip()]
+
+
+def to_chrome(recs: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+	"""Registros no formato Trace Event (eventos completos "X"), aberto pelo chrome://tracing."""
+	events = []
+	for r in recs:
+		args = dict(r.get("args") or {})
+		if r.get("quote"):
+			args["quote"] = r["quote"]
+		events.append({"name": r["name"], "cat": r["name"].split(".", 1)[0], "ph": "X", "ts": r["ts"], "dur": r["dur"], "pid": r["pid"], "tid": r["tid"], "args": args})
+	return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def dump_chrome(path: str | Path, recs: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+	with open(path, "w", encoding="utf-8") as fh:
+		json.dump(to_chrome(records() if recs is None else recs), fh, ensure_ascii=False)
+
+
+def summary(recs: Optional[Iterable[Dict[str, Any]]] = None) -> Dict[str, Dict[str, float]]:
+	"""Tempo total (ms) por etapa, por cotação ("-" = fora de cotação)."""
+	out: Dict[str, Dict[str, float]] = {}
+	for r in records() if recs is None else recs:
+		stages = out.setdefault(r.get("quote") or "-", {})
+		stages[r["name"]] = stages.get(r["name"], 0.0) + r["dur"] / 1000
+	return out
+
+
+def format_summary(per_quote: Dict[str, Dict[str, float]]) -> str:
+	lines = []
+	for label, stages in per_quote.items():
+		lines.append(f"{label}:")
+		lines += [f"  {ms:9.1f} ms  {name}" for name, ms in sorted(stages.items(), key=lambda kv: -kv[1])]
+	return "\n".join(lines)
+
+
+def _clear_after_fork() -> None:
+	# processo filho não herda (nem regrava) os registros do pai
+	global _lock
+	_lock = threading.Lock()
+	_records.clear()
+	_unflushed.clear()
+
+
+_configure_from_env()
+atexit.register(flush)
+if hasattr(os, "register_at_fork"):
+	os.register_at_fork(after_in_child=_clear_after_fork)
+
+
+def main(argv: List[str] | None = None) -> int:
+	ap = argparse.ArgumentParser(description="Resumo por cotação de um trace JSONL (SETEMARES_TRACE).")
+	ap.add_argument("trace", help="arquivo JSONL gravado com SETEMARES_TRACE=<arquivo>")
+	ap.add_argument("--chrome", help="também grava no formato do chrome://tracing / Perfetto")
+	args = ap.parse_args(argv)
+	recs = load_jsonl(args.trace)
+	print(format_summary(summary(recs)))
+	if args.chrome:
+		dump_chrome(args.chrome, recs)
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
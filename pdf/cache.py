@@ -0,0 +1,239 @@
+"""Cache em disco de PDFs já gerados, endereçado pelo conteúdo.
+
+A chave é o SHA-256 da versão do template (fonte + estilos, ver
+``TemplateRegistry.version``) com o payload em forma canônica: chaves ordenadas,
+``Decimal``/datas como texto e ``Itinerary`` como dict. Campos do primeiro nível
+que o template não lê (``ignore``, ver ``TemplateRegistry.variables``) ficam de
+fora. Referências ``file://`` entram com mtime/tamanho do arquivo, então trocar
+o logo invalida a entrada.
+
+Os PDFs ficam em ``<dir>/<chave>.pdf``; o mtime do arquivo marca o último uso e,
+acima de ``max_bytes``, os menos usados recentemente são apagados.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+# Mudou algo que altera o PDF fora do template (filtros, opções de impressão)? Incremente.
+CACHE_FORMAT = 1
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def _file_ref(uri: str) -> str:
+	try:
+		st = Path(url2pathname(urlparse(uri).path)).stat()
+		return f"{uri}#{st.st_mtime_ns}:{st.st_size}"
+	except OSError:
+		return uri
+
+
+def canonical(value: Any) -> Any:
+	"""Forma estável e serializável em JSON do payload do template."""
+	if isinstance(value, dict):
+		return {str(k): canonical(v) for k, v in value.items()}
+	if isinstance(value, (list, tuple)):
+		return [canonical(v) for v in value]
+	if isinstance(value, (set, frozenset)):
+		return sorted(canonical(v) for v in value)
+	if isinstance(value, str):
+		return _file_ref(value) if value.startswith("file:") else value
+	if value is None or isinstance(value, (bool, int, float)):
+		return value
+	if isinstance(value, Decimal):
+		return {"$decimal": str(value)}
+	if isinstance(value, (datetime, date, time)):
+		return value.isoformat()
+	if isinstance(value, timedelta):
+		return {"$seconds": value.total_seconds()}
+	if hasattr(value, "to_dict"):
+		return canonical(value.to_dict())
+	return str(value)
+
+
+def cache_key(
+	template: str,
+	template_version: str,
+	payload: Dict[str, Any],
+	options: Optional[Dict[str, Any]] = None,
+	ignore: Iterable[str] = (),
+) -> str:
+	"""Chave do PDF; ``ignore`` lista campos do primeiro nível do payload que não entram."""
+	ignore = frozenset(ignore)
+	payload = {k: v for k, v in payload.items() if k not in ignore}
+	doc = {
+		"format": CACHE_FORMAT,
+		"template": template,
+		"template_version": template_version,
+		"options": canonical(options or {}),
+		"payload": canonical(payload),
+	}
+	raw = json.dumps(doc, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+	return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+	"""PDFs por chave em ``directory``, com LRU limitado por tamanho total e contadores."""
+
+	def __init__(self, directory: str | Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+		self.directory = Path(directory)
+		self.max_bytes = max(0, int(max_bytes))
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self._lock = threading.Lock()
+		self._sizes: Optional[Dict[str, int]] = None  # chave -> bytes (carregado no primeiro uso)
+
+	def _path(self, key: str) -> Path:
+		return self.directory / f"{key}.pdf"
+
+	def _index(self) -> Dict[str, int]:
+		if self._sizes is None:
+			self._sizes = {}
+			try:
+				for p in self.directory.glob("*.pdf"):
+					self._sizes[p.stem] = p.stat().st_size
+			except OSError:
+				pass
+		return self._sizes
+
+	def _lookup(self, key: str) -> Optional[Path]:
+		path = self._path(key)
+		with self._lock:
+			sizes = self._index()
+			if key in sizes:
+				try:
+					os.utime(path)  # marca uso recente (LRU)
+					self.hits += 1
+					return path
+				except OSError:
+					sizes.pop(key, None)  # apagado por fora
+			self.misses += 1
+		return None
+
+	def get_bytes(self, key: str) -> Optional[bytes]:
+		path = self._lookup(key)
+		if path is None:
+			return None
+		try:
+			return path.read_bytes()
+		except OSError:
+			return None
+
+	def copy_to(self, key: str, out_pdf: str | Path) -> bool:
+		"""Copia o PDF em cache para ``out_pdf``; False se não houver entrada."""
+		path = self._lookup(key)
+		if path is None:
+			return False
+		try:
+			shutil.copyfile(path, out_pdf)
+			return True
+		except OSError:
+			return False
+
+	def put_bytes(self, key: str, data: bytes) -> None:
+		self._store(key, lambda tmp: tmp.write_bytes(data))
+
+	def put_file(self, key: str, pdf_path: str | Path) -> None:
+		self._store(key, lambda tmp: shutil.copyfile(pdf_path, tmp))
+
+	def _store(self, key: str, write) -> None:
+		path = self._path(key)
+		tmp = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+		try:
+			self.directory.mkdir(parents=True, exist_ok=True)
+			write(tmp)
+			os.replace(tmp, path)
+			size = path.stat().st_size
+		except OSError:
+			try:
+				tmp.unlink()
+			except OSError:
+				pass
+			return
+		with self._lock:
+			self._index()[key] = size
+			self._evict()
+
+	def _evict(self) -> None:
+		sizes = self._index()
+		total = sum(sizes.values())
+		if total <= self.max_bytes:
+			return
+		by_age = []
+		for key in sizes:
+			try:
+				by_age.append((self._path(key).stat().st_mtime_ns, key))
+			except OSError:
+				by_age.append((0, key))
+		for _, key in sorted(by_age):
+			if total <= self.max_bytes:
+				break
+			try:
+				self._path(key).unlink()
+			except OSError:
+				pass
+			total -= sizes.pop(key)
+			self.evictions += 1
+
+	def clear(self) -> None:
+		with self._lock:
+			for key in list(self._index()):
+				try:
+					self._path(key).unlink()
+				except OSError:
+					pass
+			self._sizes = {}
+			self.hits = self.misses = self.evictions = 0
+
+	def stats(self) -> Dict[str, Any]:
+		with self._lock:
+			sizes = self._index()
+			total = self.hits + self.misses
+			return {
+				"entries": len(sizes),
+				"bytes": sum(sizes.values()),
+				"max_bytes": self.max_bytes,
+				"hits": self.hits,
+				"misses": self.misses,
+				"evictions": self.evictions,
+				"hit_rate": (self.hits / total) if total else 0.0,
+			}
+
+
+_CACHE: Optional[PdfCache] = None
+_CACHE_CONFIGURED = False
+_CACHE_LOCK = threading.Lock()
+
+
+def get_pdf_cache() -> Optional[PdfCache]:
+	"""Cache do processo; desligado (None) a menos que ``configure_pdf_cache`` ou
+	``SETEMARES_PDF_CACHE=<pasta>`` o habilitem (``SETEMARES_PDF_CACHE_MB`` limita o tamanho)."""
+	global _CACHE, _CACHE_CONFIGURED
+	with _CACHE_LOCK:
+		if not _CACHE_CONFIGURED:
+			_CACHE_CONFIGURED = True
+			directory = os.environ.get("SETEMARES_PDF_CACHE")
+			if directory and directory != "0":
+				mb = float(os.environ.get("SETEMARES_PDF_CACHE_MB") or DEFAULT_MAX_BYTES / (1024 * 1024))
+				_CACHE = PdfCache(directory, int(mb * 1024 * 1024))
+		return _CACHE
+
+
+def configure_pdf_cache(directory: str | Path | None, max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[PdfCache]:
+	"""Troca o cache do processo (``directory=None`` desliga)."""
+	global _CACHE, _CACHE_CONFIGURED
+	with _CACHE_LOCK:
+		_CACHE = PdfCache(directory, max_bytes) if directory else None
+		_CACHE_CONFIGURED = True
+		return _CACHE
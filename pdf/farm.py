@@ -0,0 +1,253 @@
+"""Fazenda de renderização: vários processos, cada um com o próprio Chromium.
+
+Um navegador dirigido por um único loop Python satura com poucas impressões
+simultâneas; em máquinas com muitos núcleos ``render_farm`` distribui os jobs
+entre ``workers`` processos (``spawn``), cada um com ``concurrency`` páginas.
+
+Distribuição por demanda: o supervisor mantém a fila (o iterador de jobs, lido
+sob demanda) e cada página ociosa de qualquer worker pede o próximo job, então
+um worker lento nunca acumula trabalho que outro livre poderia fazer. Depois de
+``max_jobs_per_worker`` jobs o worker fecha o navegador e sai; o supervisor sobe
+outro no lugar (limita vazamento de memória do Chromium). Jobs de um worker que
+morre sem avisar voltam como falha (``ok=False``), sem derrubar o lote.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import pickle
+import queue
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from pdf.cache import configure_pdf_cache, get_pdf_cache
+from pdf.generator import RenderJob, RenderResult, _render_result, render_mode, set_render_mode
+from pdf.renderer import get_renderer, shutdown_renderer
+
+DEFAULT_MAX_JOBS_PER_WORKER = 200
+
+# Workers que morrem seguidos sem concluir nenhum job (por worker) antes de desistir
+_MAX_STARTUP_FAILURES = 3
+
+
+@dataclass
+class WorkerStats:
+	pid: int = 0
+	generation: int = 0  # quantas vezes o slot foi (re)iniciado
+	jobs: int = 0
+	failed: int = 0
+	busy: float = 0.0  # soma dos tempos de render concluídos
+
+
+@dataclass
+class FarmStats:
+	"""Contadores agregados de uma execução de ``render_farm`` (preenchidos conforme os resultados saem)."""
+	workers: int = 0
+	jobs: int = 0
+	failed: int = 0
+	recycled: int = 0
+	crashed: int = 0
+	started: float = 0.0
+	finished: float = 0.0
+	per_worker: Dict[int, WorkerStats] = field(default_factory=dict)
+
+	@property
+	def elapsed(self) -> float:
+		if not self.started:
+			return 0.0
+		return (self.finished or time.perf_counter()) - self.started
+
+	@property
+	def throughput(self) -> float:
+		"""PDFs concluídos por segundo (sucesso ou falha)."""
+		elapsed = self.elapsed
+		return self.jobs / elapsed if elapsed > 0 else 0.0
+
+	def as_dict(self) -> Dict[str, Any]:
+		data = asdict(self)
+		data.pop("started")
+		data.pop("finished")
+		data["elapsed"] = round(self.elapsed, 3)
+		data["throughput"] = round(self.throughput, 3)
+		return data
+
+
+# ---------------------------------------------------------------------- processo worker
+async def _worker_loop(wid: int, inbox, events, template_dir: str, concurrency: int, max_jobs: int) -> None:
+	renderer = get_renderer()
+	loop = asyncio.get_running_loop()
+	taken = 0
+
+	async def _page_slot() -> None:
+		nonlocal taken
+		while not max_jobs or taken < max_jobs:
+			taken += 1
+			# cada pedido recebe exatamente uma resposta: um job ou None (fim)
+			events.put(("want", wid, None))
+			blob = await loop.run_in_executor(None, inbox.get)
+			if blob is None:
+				return
+			index, job = pickle.loads(blob)
+			events.put(("done", wid, await _render_result(index, job, template_dir)))
+
+	async with renderer.capacity(concurrency):
+		await asyncio.gather(*(_page_slot() for _ in range(concurrency)))
+
+
+def _worker_main(
+	wid: int,
+	inbox,
+	events,
+	template_dir: str,
+	concurrency: int,
+	max_jobs: int,
+	mode: str,
+	cache: Optional[Tuple[str, int]],
+) -> None:
+	# spawn: configuração feita em memória no processo pai não é herdada
+	set_render_mode(mode)
+	if cache is not None:
+		configure_pdf_cache(*cache)
+	try:
+		asyncio.run(_worker_loop(wid, inbox, events, template_dir, concurrency, max_jobs))
+	finally:
+		shutdown_renderer()
+		events.put(("exit", wid, None))
+
+
+# ---------------------------------------------------------------------- supervisor
+@dataclass
+class _Worker:
+	slot: int
+	process: Any
+	inbox: Any
+	inflight: Dict[int, str] = field(default_factory=dict)  # índice -> out_pdf
+	dead_polls: int = 0
+
+
+def render_farm(
+	jobs: Iterable[RenderJob],
+	template_dir: str = "templates",
+	workers: int | None = None,
+	concurrency: int = 2,
+	max_jobs_per_worker: int = DEFAULT_MAX_JOBS_PER_WORKER,
+	stats: FarmStats | None = None,
+) -> Iterator[RenderResult]:
+	"""Renderiza ``jobs`` em processos worker, entregando os resultados na ordem de conclusão.
+
+	``workers`` padrão: número de CPUs. Cada worker imprime ``concurrency`` páginas por
+	vez no próprio navegador e é substituído após ``max_jobs_per_worker`` jobs
+	(0 = nunca). Passe um ``FarmStats`` para ler a vazão e os contadores por worker.
+	"""
+	workers = max(1, int(workers or os.cpu_count() or 1))
+	concurrency = max(1, int(concurrency))
+	max_jobs = max(0, int(max_jobs_per_worker))
+	stats = stats if stats is not None else FarmStats()
+	stats.workers = workers
+	stats.started = time.perf_counter()
+	ctx = multiprocessing.get_context("spawn")
+	events = ctx.Queue()
+	cache = get_pdf_cache()
+	cache_config = (str(cache.directory), cache.max_bytes) if cache is not None else None
+	mode = render_mode()
+	pending = enumerate(jobs)
+	exhausted = False
+	procs: Dict[int, _Worker] = {}
+	next_wid = 0
+	startup_failures = 0
+
+	def spawn(slot: int) -> None:
+		nonlocal next_wid
+		wid, next_wid = next_wid, next_wid + 1
+		inbox = ctx.Queue()
+		inbox.cancel_join_thread()  # worker morto não deixa o supervisor preso ao sair
+		process = ctx.Process(
+			target=_worker_main,
+			args=(wid, inbox, events, template_dir, concurrency, max_jobs, mode, cache_config),
+			name=f"pdf-farm-{slot}",
+			daemon=True,
+		)
+		process.start()
+		procs[wid] = _Worker(slot, process, inbox)
+		ws = stats.per_worker.setdefault(slot, WorkerStats())
+		ws.pid = process.pid or 0
+		ws.generation += 1
+
+	def record(slot: Optional[int], result: RenderResult) -> RenderResult:
+		nonlocal startup_failures
+		stats.jobs += 1
+		stats.failed += 0 if result.ok else 1
+		ws = stats.per_worker.get(slot) if slot is not None else None
+		if ws is not None:
+			ws.jobs += 1
+			ws.failed += 0 if result.ok else 1
+			ws.busy += result.elapsed
+			startup_failures = 0
+		return result
+
+	def lost(w: _Worker, reason: str) -> Iterator[RenderResult]:
+		for index, out_pdf in w.inflight.items():
+			yield record(None, RenderResult(index, out_pdf, False, error=reason))
+		w.inflight.clear()
+
+	for slot in range(workers):
+		spawn(slot)
+	try:
+		while procs:
+			try:
+				kind, wid, payload = events.get(timeout=0.2)
+			except queue.Empty:
+				# morto e sem mensagem em duas esperas seguidas: o "exit" não vem mais (crash)
+				for wid, w in list(procs.items()):
+					if w.process.is_alive():
+						continue
+					w.dead_polls += 1
+					if w.dead_polls < 2:
+						continue
+					del procs[wid]
+					stats.crashed += 1
+					yield from lost(w, f"worker {w.slot} encerrou inesperadamente (código {w.process.exitcode}).")
+					startup_failures += 1
+					if startup_failures > _MAX_STARTUP_FAILURES * workers:
+						raise RuntimeError("workers da fazenda de PDF encerram sem concluir jobs.")
+					if not exhausted:
+						spawn(w.slot)
+				continue
+			w = procs.get(wid)
+			if w is None:
+				continue
+			if kind == "want":
+				while True:
+					item = None if exhausted else next(pending, None)
+					if item is None:
+						exhausted = True
+						w.inbox.put(None)
+						break
+					index, job = item
+					try:
+						blob = pickle.dumps(item)
+					except Exception as e:
+						yield record(None, RenderResult(index, job.out_pdf, False, error=f"job não serializável: {e}"))
+						continue
+					w.inflight[index] = job.out_pdf
+					w.inbox.put(blob)
+					break
+			elif kind == "done":
+				w.inflight.pop(payload.index, None)
+				yield record(w.slot, payload)
+			elif kind == "exit":
+				w.process.join(10)
+				del procs[wid]
+				yield from lost(w, f"worker {w.slot} encerrou antes de concluir o job.")
+				if not exhausted:
+					stats.recycled += 1
+					spawn(w.slot)
+	finally:
+		stats.finished = time.perf_counter()
+		for w in procs.values():
+			if w.process.is_alive():
+				w.process.terminate()
+			w.process.join(5)
+		events.cancel_join_thread()
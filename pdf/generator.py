@@ -1,8 +1,31 @@
+import argparse
 import asyncio
+import base64
+import hashlib
+import json
+import mimetypes
+import re
+import shutil
+import tempfile
+import time
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from decimal import Decimal
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+from jinja2 import BaseLoader, ChoiceLoader, Environment, FileSystemLoader, ModuleLoader, Template, meta
 import sys
 import os
+import threading
+from typing import AsyncIterator, Iterable, Iterator
+
+from core import tracing
+from core.parser.itinerary_model import Itinerary
+from pdf.cache import PdfCache, cache_key, get_pdf_cache
+from pdf.merge import UnsupportedPdf, merge_pdfs
+from pdf.renderer import PDF_OPTIONS, get_renderer
 
 
 def _ensure_pw_env() -> None:
@@ -74,71 +97,516 @@ def _find_template_root(template_dir: str) -> Path:
 	return p.resolve()
 
 
-async def render_pdf(data: dict, template_dir: str, out_pdf: str) -> None:
-	# Ensure Playwright sees the browsers path before import
-	_ensure_pw_env()
-	# Import here to ensure PLAYWRIGHT_BROWSERS_PATH is already configured by the app bootstrap
-	from playwright.async_api import async_playwright
-	template_root = _find_template_root(template_dir)
-	env = Environment(loader=FileSystemLoader(str(template_root)), autoescape=True)
-	# filtro para resolver nome completo do aeroporto (sempre registra; fallback identidade)
-	def _airport_name(value: str) -> str:
+_CSS_LINK_RE = re.compile(r"<link\s+rel=[\"']stylesheet[\"']\s+href=[\"']([^\"']+)[\"']\s*/?>", re.I)
+_FILE_URI_RE = re.compile(r"file:///?[^'\"()\s<>]+")
+# (caminho, mtime) -> conteúdo já pronto para embutir no HTML
+_ASSET_CACHE: dict[tuple[str, int, bool], str] = {}
+
+
+def _read_asset(path: Path, as_data_uri: bool) -> str | None:
+	try:
+		stat = path.stat()
+	except OSError:
+		return None
+	key = (str(path), stat.st_mtime_ns, as_data_uri)
+	cached = _ASSET_CACHE.get(key)
+	if cached is None:
+		raw = path.read_bytes()
+		if as_data_uri:
+			mime = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+			cached = f"data:{mime};base64,{base64.b64encode(raw).decode('ascii')}"
+		else:
+			cached = raw.decode("utf-8", errors="ignore")
+		_ASSET_CACHE[key] = cached
+	return cached
+
+
+def _inline_assets(html: str, template_root: Path) -> str:
+	"""Embed local assets so the HTML renders from memory (page.set_content).
+
+	Stylesheet links are resolved relative to the template root and turned into
+	<style> blocks; file:// URIs (logo) become data: URIs. Unresolvable references
+	are left untouched.
+	"""
+	def _css(m: re.Match) -> str:
+		href = m.group(1)
+		path = Path(url2pathname(urlparse(href).path)) if href.startswith("file:") else (template_root / href)
+		css = _read_asset(path.resolve(), as_data_uri=False)
+		return m.group(0) if css is None else f"<style>{css}</style>"
+
+	def _file_uri(m: re.Match) -> str:
+		data_uri = _read_asset(Path(url2pathname(urlparse(m.group(0)).path)), as_data_uri=True)
+		return data_uri or m.group(0)
+
+	html = _CSS_LINK_RE.sub(_css, html)
+	return _FILE_URI_RE.sub(_file_uri, html)
+
+
+# Como a página recebe cada documento: "navigate" carrega o HTML inteiro a cada PDF;
+# "inject" mantém a casca (CSS, logo) carregada e troca só o <body> renderizado pelo Jinja
+RENDER_MODES = ("navigate", "inject")
+_RENDER_MODE: str | None = None
+
+
+def render_mode() -> str:
+	"""Modo do processo: ``set_render_mode`` ou ``SETEMARES_PDF_MODE`` (padrão "navigate")."""
+	global _RENDER_MODE
+	if _RENDER_MODE is None:
+		mode = (os.environ.get("SETEMARES_PDF_MODE") or "").strip().lower()
+		_RENDER_MODE = mode if mode in RENDER_MODES else "navigate"
+	return _RENDER_MODE
+
+
+def set_render_mode(mode: str | None) -> str:
+	"""Troca o modo de carga das páginas (None volta a ler ``SETEMARES_PDF_MODE``)."""
+	global _RENDER_MODE
+	if mode is not None and mode not in RENDER_MODES:
+		raise ValueError(f"modo de renderização desconhecido: {mode!r} (use {', '.join(RENDER_MODES)}).")
+	_RENDER_MODE = mode
+	return render_mode()
+
+
+async def _print_html(html: str, template_root: Path, out_pdf: str) -> None:
+	# HTML vai direto para a página do navegador persistente: sem escrita em disco,
+	# renders concorrentes não disputam o mesmo arquivo temporário
+	renderer = get_renderer()
+	with tracing.span("render.inline_assets"):
+		html = _inline_assets(html, template_root)
+	await renderer.run(renderer.print_html(html, str(Path(out_pdf).resolve()), inject=render_mode() == "inject"))
+
+
+def _airport_name(value: str) -> str:
+	"""Filtro Jinja: nome completo do aeroporto (fallback identidade)."""
+	try:
+		from core.data.airports import get_airport_description
+		return get_airport_description(value)
+	except Exception:
+		return value
+
+
+def _duration(value) -> str:
+	"""Filtro Jinja: timedelta como "13h05" (horas podem passar de 24); vazio se ausente."""
+	if not isinstance(value, timedelta):
+		return ""
+	minutes = int(value.total_seconds() // 60)
+	return f"{minutes // 60}h{minutes % 60:02d}"
+
+
+def _money(value) -> str:
+	"""Filtro Jinja: valores numéricos (Decimal/int/float) com 2 casas; strings passam intactas."""
+	if isinstance(value, (Decimal, int, float)) and not isinstance(value, bool):
+		from core.rules.pricing import q2
+		return f"{q2(value):.2f}"
+	return "" if value is None else str(value)
+
+
+# Diretório (dentro da raiz de templates) com os módulos gerados por precompile_templates()
+COMPILED_DIRNAME = "_compiled"
+
+
+class TemplateRegistry:
+	"""Process-wide cache of template roots and Jinja environments.
+
+	The template root is resolved once per ``template_dir`` and each root gets a single
+	Environment, so templates are compiled once and reused across renders. In dev
+	(not frozen) Jinja's auto_reload re-checks mtimes and recompiles edited templates;
+	in PyInstaller builds that check is off and, when ``<root>/_compiled`` exists,
+	templates are loaded from the precompiled Python modules.
+	"""
+
+	def __init__(self, auto_reload: bool | None = None) -> None:
+		self.auto_reload = (not getattr(sys, "frozen", False)) if auto_reload is None else auto_reload
+		self._roots: dict[str, Path] = {}
+		self._envs: dict[Path, Environment] = {}
+		# (raiz, template) -> (arquivos, (mtime, tamanho) de cada um, digest, variáveis lidas)
+		self._versions: dict[tuple[Path, str], tuple[list[Path], tuple, str, frozenset[str] | None]] = {}
+		self._lock = threading.Lock()
+
+	def root(self, template_dir: str) -> Path:
+		root = self._roots.get(template_dir)
+		if root is None:
+			root = _find_template_root(template_dir)
+			self._roots[template_dir] = root
+		return root
+
+	def environment(self, template_root: Path) -> Environment:
+		env = self._envs.get(template_root)
+		if env is not None:
+			return env
+		with self._lock:
+			env = self._envs.get(template_root)
+			if env is None:
+				env = self._build_environment(template_root)
+				self._envs[template_root] = env
+		return env
+
+	def _build_environment(self, template_root: Path) -> Environment:
+		loader: BaseLoader = FileSystemLoader(str(template_root))
+		compiled = template_root / COMPILED_DIRNAME
+		if compiled.is_dir() and not self.auto_reload:
+			loader = ChoiceLoader([ModuleLoader(str(compiled)), loader])
+		env = Environment(loader=loader, autoescape=True, auto_reload=self.auto_reload)
+		env.filters["airport_name"] = _airport_name
+		env.filters["money"] = _money
+		env.filters["duration"] = _duration
+		return env
+
+	def get_template(self, template_dir: str, name: str) -> tuple[Template, Path]:
+		root = self.root(template_dir)
+		return self.environment(root).get_template(name), root
+
+	def version(self, template_dir: str, name: str) -> str:
+		"""Digest do template, dos templates que ele inclui/estende e das folhas de estilo ligadas.
+
+		Recalculado só quando algum desses arquivos muda (mtime/tamanho).
+		"""
+		return self._inspect(template_dir, name)[2]
+
+	def variables(self, template_dir: str, name: str) -> frozenset[str] | None:
+		"""Variáveis de contexto que o template (e o que ele inclui) pode ler; None se não der para saber."""
+		return self._inspect(template_dir, name)[3]
+
+	def _inspect(self, template_dir: str, name: str) -> tuple:
+		root = self.root(template_dir)
+		cached = self._versions.get((root, name))
+		if cached is not None and _stat_stamp(cached[0]) == cached[1]:
+			return cached
+		files, names = self._dependencies(root, name)
+		digest = hashlib.sha256()
+		for path in files:
+			digest.update(str(path.relative_to(root) if path.is_relative_to(root) else path).encode("utf-8") + b"\0")
+			try:
+				digest.update(path.read_bytes())
+			except OSError:
+				pass
+			digest.update(b"\0")
+		entry = (files, _stat_stamp(files), digest.hexdigest(), names)
+		self._versions[(root, name)] = entry
+		return entry
+
+	def _dependencies(self, root: Path, name: str) -> tuple[list[Path], frozenset[str] | None]:
+		env = self.environment(root)
+		files: list[Path] = []
+		names: set[str] | None = set()
+		pending = [name]
+		seen: set[str] = set()
+		while pending:
+			current = pending.pop()
+			if current in seen:
+				continue
+			seen.add(current)
+			path = root / current
+			files.append(path)
+			try:
+				source = path.read_text(encoding="utf-8")
+			except OSError:
+				names = None  # fonte ausente: não dá para saber o que o template lê
+				continue
+			ast = env.parse(source)
+			pending += [t for t in meta.find_referenced_templates(ast) if t]
+			if names is not None:
+				# includes enxergam o contexto de quem inclui: a união cobre o documento todo
+				names |= meta.find_undeclared_variables(ast)
+			for href in _CSS_LINK_RE.findall(source):
+				files.append((Path(url2pathname(urlparse(href).path)) if href.startswith("file:") else root / href).resolve())
+		return files, (frozenset(names) if names is not None else None)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._roots.clear()
+			self._envs.clear()
+			self._versions.clear()
+
+
+def _stat_stamp(files: list[Path]) -> tuple:
+	stamp = []
+	for path in files:
 		try:
-			from core.data.airports import get_airport_description
-			return get_airport_description(value)
-		except Exception:
-			return value
-	env.filters["airport_name"] = _airport_name
-
-	html = env.get_template("quote.html").render(**data)
-	html_path = template_root / "_tmp_quote.html"
-	html_path.write_text(html, encoding="utf-8")
-	async with async_playwright() as p:
-		browser = await p.chromium.launch(headless=True)
-		page = await browser.new_page()
-		# permitir acesso a file:// para carregar logo local
-		await page.goto(html_path.as_uri(), wait_until="load")
-		await page.wait_for_load_state("load")
-		await page.pdf(
-			path=str(Path(out_pdf).resolve()),
-			format="A4",
-			margin={"top": "18mm", "right": "18mm", "bottom": "18mm", "left": "18mm"},
-			print_background=True,
-		)
-		await browser.close()
+			st = path.stat()
+			stamp.append((st.st_mtime_ns, st.st_size))
+		except OSError:
+			stamp.append(None)
+	return tuple(stamp)
+
+
+_REGISTRY = TemplateRegistry()
+
+
+def precompile_templates(template_dir: str = "templates", target: str | None = None) -> Path:
+	"""Compile the HTML templates into Python modules (used by the PyInstaller build)."""
+	root = _REGISTRY.root(template_dir)
+	out = Path(target) if target else root / COMPILED_DIRNAME
+	env = TemplateRegistry(auto_reload=True)._build_environment(root)
+	env.compile_templates(
+		str(out),
+		zip=None,
+		filter_func=lambda name: name.endswith(".html") and not name.startswith("_"),
+		ignore_errors=False,
+	)
+	return out
+
+
+@dataclass
+class RenderJob:
+	"""One PDF to render: template context, output path and template name.
+
+	Multi-quote documents use ``template="multi_quote.html"`` with
+	``data={"quotes": [...], "summary": {...}}``.
+	"""
+	data: dict
+	out_pdf: str
+	template: str = "quote.html"
+
+
+def _with_itineraries(data: dict) -> dict:
+	"""Templates iterate ``decoded.segments``; payloads read from JSON carry the legacy dict form."""
+	def coerce(payload: dict) -> dict:
+		if isinstance(payload.get("decoded"), dict):
+			return {**payload, "decoded": Itinerary.from_dict(payload["decoded"])}
+		return payload
+
+	data = coerce(data)
+	if isinstance(data.get("quotes"), list):
+		data = {**data, "quotes": [coerce(q) if isinstance(q, dict) else q for q in data["quotes"]]}
+	return data
+
+
+def _render_html(job: RenderJob, template_dir: str) -> tuple[str, Path]:
+	with tracing.span("render.template", template=job.template):
+		template, template_root = _REGISTRY.get_template(template_dir, job.template)
+		return template.render(**_with_itineraries(job.data)), template_root
+
+
+def _cache_entry(job: RenderJob, template_dir: str) -> tuple[PdfCache | None, str]:
+	"""PDF cache (if enabled) and the content-addressed key for ``job``."""
+	cache = get_pdf_cache()
+	if cache is None:
+		return None, ""
+	# campos do payload que o template nunca lê (ex.: metadados do chamador) não mudam o PDF
+	used = _REGISTRY.variables(template_dir, job.template)
+	ignore = () if used is None else [k for k in job.data if k not in used]
+	return cache, cache_key(job.template, _REGISTRY.version(template_dir, job.template), job.data, PDF_OPTIONS, ignore)
+
+
+# Fragmentos do documento multi: cada cotação e o resumo viram PDFs próprios, depois concatenados
+MULTI_TEMPLATE = "multi_quote.html"
+MULTI_PAGE_TEMPLATE = "multi_quote_page.html"
+MULTI_SUMMARY_TEMPLATE = "multi_summary.html"
+
+
+async def _render_fragment(job: RenderJob, template_dir: str, slots: asyncio.Semaphore) -> None:
+	cache, key = _cache_entry(job, template_dir)
+	if cache is not None and cache.copy_to(key, job.out_pdf):
+		return
+	# HTML só é montado quando há página livre: memória limitada mesmo com 100 cotações
+	async with slots:
+		html, template_root = _render_html(job, template_dir)
+		await _print_html(html, template_root, job.out_pdf)
+	if cache is not None:
+		cache.put_file(key, job.out_pdf)
+
+
+async def _render_multi_incremental(job: RenderJob, template_dir: str) -> None:
+	"""Render each quote page and the summary as separate (cached) PDFs and merge them.
+
+	Used only with the PDF cache enabled, so quotes whose payload did not change
+	are copied from the cache instead of printed again. Raises ``UnsupportedPdf`` if a fragment is not in the format the merger handles.
+	"""
+	data = _with_itineraries(job.data)
+	slots = asyncio.Semaphore(get_renderer().pool_size)
+	with tempfile.TemporaryDirectory(prefix="setemares-pdf-") as tmp:
+		fragments = [RenderJob({"q": q}, str(Path(tmp) / f"q{i:04d}.pdf"), MULTI_PAGE_TEMPLATE) for i, q in enumerate(data["quotes"])]
+		fragments.append(RenderJob({"summary": data.get("summary") or {}}, str(Path(tmp) / "summary.pdf"), MULTI_SUMMARY_TEMPLATE))
+		# espera todos antes de propagar a falha: a pasta temporária some ao sair do bloco
+		results = await asyncio.gather(*(_render_fragment(f, template_dir, slots) for f in fragments), return_exceptions=True)
+		for r in results:
+			if isinstance(r, BaseException):
+				raise r
+		merged = Path(tmp) / "merged.pdf"
+		with tracing.span("render.merge", fragments=len(fragments)):
+			merge_pdfs([f.out_pdf for f in fragments], merged)
+		shutil.move(str(merged), job.out_pdf)
+
+
+# Chromium gerou PDF que o merger não aceita: não tenta mais fragmentos neste processo
+_MERGE_UNSUPPORTED = False
+
+
+def _use_fragments(job: RenderJob) -> bool:
+	# sem cache não há fragmento para reaproveitar: N+1 impressões custariam mais que uma
+	return (
+		job.template == MULTI_TEMPLATE
+		and isinstance(job.data.get("quotes"), list)
+		and not _MERGE_UNSUPPORTED
+		and get_pdf_cache() is not None
+	)
+
+
+async def render_job(job: RenderJob, template_dir: str = "templates") -> None:
+	global _MERGE_UNSUPPORTED
+	with tracing.quote():
+		if _use_fragments(job):
+			try:
+				await _render_multi_incremental(job, template_dir)
+				return
+			except UnsupportedPdf:
+				_MERGE_UNSUPPORTED = True  # documento inteiro de uma vez, agora e nos próximos
+		cache, key = _cache_entry(job, template_dir)
+		if cache is not None:
+			with tracing.span("render.cache"):
+				if cache.copy_to(key, job.out_pdf):
+					return
+		html, template_root = _render_html(job, template_dir)
+		await _print_html(html, template_root, job.out_pdf)
+		if cache is not None:
+			cache.put_file(key, job.out_pdf)
+
+
+async def render_job_bytes(job: RenderJob, template_dir: str = "templates") -> bytes:
+	"""Render ``job`` to PDF bytes in memory (``job.out_pdf`` is ignored)."""
+	with tracing.quote():
+		cache, key = _cache_entry(job, template_dir)
+		if cache is not None:
+			with tracing.span("render.cache"):
+				data = cache.get_bytes(key)
+			if data is not None:
+				return data
+		html, template_root = _render_html(job, template_dir)
+		renderer = get_renderer()
+		with tracing.span("render.inline_assets"):
+			html = _inline_assets(html, template_root)
+		data = await renderer.run(renderer.pdf_bytes(html, inject=render_mode() == "inject"))
+		if cache is not None:
+			cache.put_bytes(key, data)
+		return data
+
+
+async def render_pdf(data: dict, template_dir: str, out_pdf: str) -> None:
+	await render_job(RenderJob(data, out_pdf), template_dir)
 
 
 async def render_multi_pdf(quotes: list[dict], summary: dict, template_dir: str, out_pdf: str) -> None:
-	_ensure_pw_env()
-	from playwright.async_api import async_playwright
-	template_root = _find_template_root(template_dir)
-	env = Environment(loader=FileSystemLoader(str(template_root)), autoescape=True)
-	def _airport_name(value: str) -> str:
+	await render_job(RenderJob({"quotes": quotes, "summary": summary}, out_pdf, "multi_quote.html"), template_dir)
+
+
+@dataclass
+class RenderResult:
+	index: int
+	out_pdf: str
+	ok: bool
+	error: str = ""
+	elapsed: float = 0.0
+
+
+async def _render_result(index: int, job: RenderJob, template_dir: str) -> RenderResult:
+	"""Render one batch item; errors become ``ok=False`` results instead of exceptions."""
+	t0 = time.perf_counter()
+	try:
+		with tracing.quote(Path(job.out_pdf).stem):
+			await render_job(job, template_dir)
+		return RenderResult(index, job.out_pdf, True, elapsed=time.perf_counter() - t0)
+	except Exception as e:
+		return RenderResult(index, job.out_pdf, False, error=str(e) or type(e).__name__, elapsed=time.perf_counter() - t0)
+
+
+async def render_batch(
+	jobs: Iterable[RenderJob],
+	template_dir: str = "templates",
+	concurrency: int = 4,
+) -> AsyncIterator[RenderResult]:
+	"""Render many PDFs concurrently on the shared browser, yielding results as they finish.
+
+	At most ``concurrency`` pages print at once. Failures are reported per item
+	(``ok=False`` with the error message) and never abort the rest of the batch.
+	Results arrive in completion order; ``RenderResult.index`` is the job position.
+	"""
+	concurrency = max(1, int(concurrency))
+	renderer = get_renderer()
+	async with renderer.capacity(concurrency):
+		pending = enumerate(jobs)
+		results: asyncio.Queue = asyncio.Queue()
+
+		async def _worker() -> None:
+			# cada worker puxa o próximo job do iterador compartilhado (entrada pode ser lazy)
+			for index, job in pending:
+				await results.put(await _render_result(index, job, template_dir))
+
+		workers = [asyncio.create_task(_worker()) for _ in range(concurrency)]
+		done = asyncio.gather(*workers)
 		try:
-			from core.data.airports import get_airport_description
-			return get_airport_description(value)
-		except Exception:
-			return value
-	env.filters["airport_name"] = _airport_name
-	html = env.get_template("multi_quote.html").render(quotes=quotes, summary=summary)
-	html_path = template_root / "_tmp_quote.html"
-	html_path.write_text(html, encoding="utf-8")
-	async with async_playwright() as p:
-		browser = await p.chromium.launch(headless=True)
-		page = await browser.new_page()
-		await page.goto(html_path.as_uri(), wait_until="load")
-		await page.wait_for_load_state("load")
-		await page.pdf(
-			path=str(Path(out_pdf).resolve()),
-			format="A4",
-			margin={"top": "18mm", "right": "18mm", "bottom": "18mm", "left": "18mm"},
-			print_background=True,
-		)
-		await browser.close()
+			while not (done.done() and results.empty()):
+				getter = asyncio.ensure_future(results.get())
+				await asyncio.wait({getter, done}, return_when=asyncio.FIRST_COMPLETED)
+				if getter.done():
+					yield getter.result()
+				else:
+					getter.cancel()
+			await done
+		finally:
+			for w in workers:
+				w.cancel()
 
 
-if __name__ == "__main__":
+def _load_batch_jobs(path: str, out_dir: Path) -> Iterator[RenderJob]:
+	"""Lê um JSONL de jobs: {"data", "out_pdf"?, "template"?} ou o payload do template puro."""
+	# stdin não é fechado ao fim do lote (o processo pode voltar a lê-lo)
+	with open(path, encoding="utf-8") if path != "-" else nullcontext(sys.stdin) as fh:
+		for i, line in enumerate(fh):
+			if not line.strip():
+				continue
+			obj = json.loads(line)
+			if "data" in obj and isinstance(obj["data"], dict):
+				out = obj.get("out_pdf") or str(out_dir / f"cotacao_{i:04d}.pdf")
+				yield RenderJob(obj["data"], out, obj.get("template", "quote.html"))
+			else:
+				yield RenderJob(obj, str(out_dir / f"cotacao_{i:04d}.pdf"))
+
+
+async def _run_batch_cli(args: argparse.Namespace) -> int:
+	out_dir = Path(args.out_dir)
+	out_dir.mkdir(parents=True, exist_ok=True)
+	failed = 0
+	async for r in render_batch(_load_batch_jobs(args.batch, out_dir), args.template_dir, args.concurrency):
+		failed += 0 if r.ok else 1
+		print(json.dumps(asdict(r), ensure_ascii=False), flush=True)
+	return 1 if failed else 0
+
+
+def _run_farm_cli(args: argparse.Namespace) -> int:
+	from pdf.farm import FarmStats, render_farm
+
+	out_dir = Path(args.out_dir)
+	out_dir.mkdir(parents=True, exist_ok=True)
+	stats = FarmStats()
+	jobs = _load_batch_jobs(args.batch, out_dir)
+	for r in render_farm(jobs, args.template_dir, args.workers, args.concurrency, args.recycle, stats):
+		print(json.dumps(asdict(r), ensure_ascii=False), flush=True)
+	print(json.dumps(stats.as_dict(), ensure_ascii=False), file=sys.stderr)
+	return 1 if stats.failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+	ap = argparse.ArgumentParser(description="Gera PDFs de cotação (payload JSON -> PDF).")
+	ap.add_argument("--batch", help="JSONL com um job por linha ('-' para stdin); gera vários PDFs em paralelo")
+	ap.add_argument("--out-dir", default="out", help="pasta de saída do modo --batch")
+	ap.add_argument("--concurrency", type=int, default=4, help="páginas imprimindo ao mesmo tempo no modo --batch (por processo com --workers)")
+	ap.add_argument("--workers", type=int, default=1, help="processos do modo --batch, cada um com o próprio navegador (0 = núcleos da máquina)")
+	ap.add_argument("--recycle", type=int, default=200, help="jobs por processo antes de reiniciá-lo (com --workers; 0 = nunca)")
+	ap.add_argument("--mode", choices=RENDER_MODES, help="carga das páginas: documento inteiro ou só o <body> injetado (padrão: SETEMARES_PDF_MODE ou navigate)")
+	ap.add_argument("--template-dir", default="templates")
+	ap.add_argument("--out", default="out.pdf", help="saída do modo simples (payload único no stdin)")
+	args = ap.parse_args(argv)
+	if args.mode:
+		set_render_mode(args.mode)
+	if args.batch:
+		if args.workers != 1:
+			return _run_farm_cli(args)
+		return asyncio.run(_run_batch_cli(args))
 	# Uso mínimo: passar JSON no stdin com os campos esperados pelo template
-	import json, sys
 	_payload = json.loads(sys.stdin.read() or "{}")
-	asyncio.run(render_pdf(_payload, template_dir="templates", out_pdf="out.pdf"))
+	asyncio.run(render_pdf(_payload, template_dir=args.template_dir, out_pdf=args.out))
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,361 @@
+"""Serviço HTTP local (asyncio) que gera o PDF da cotação: PNR em texto ou JSON -> PDF.
+
+Roda só em localhost (terminais de atendimento), com o mesmo pipeline do app
+desktop: ``cli.main.parse`` -> ``core.rules.pricing`` -> decoder de itinerário ->
+templates de ``pdf.generator``, impressos no Chromium persistente do renderer.
+
+Rotas:
+
+- ``POST /pdf``: corpo ``text/plain`` com o PNR, ou JSON ``{"pnr": "...", "options": {...}}``
+  ou ``{"data": {...}, "template": "quote.html"}`` (payload do template pronto);
+  responde ``application/pdf``.
+- ``GET /health``: estado do serviço (JSON).
+
+No máximo ``concurrency`` PDFs imprimem ao mesmo tempo e até ``queue_size``
+aguardam; além disso a requisição é recusada com 429 (``Retry-After``). O PDF
+vem do navegador em memória e é escrito direto na resposta, sem arquivo temporário.
+Requisições de páginas web (``Origin``) só são aceitas da origem de ``--allow-origin``.
+
+Uso: ``python -m pdf.http_service [--port 8765] [--concurrency 2] [--queue 8]``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import sys
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from cli.main import parse
+from core import tracing
+from pdf.cache import configure_pdf_cache, get_pdf_cache
+from pdf.generator import RENDER_MODES, RenderJob, render_job_bytes, set_render_mode
+from pdf.payload import FARE_LABELS, QuoteOptions, logo_src, multi_payload, quote_payload
+from pdf.renderer import get_renderer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+TEMPLATES = ("quote.html", "multi_quote.html")
+
+_REASONS = {
+	200: "OK", 204: "No Content", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+	413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error",
+}
+
+
+class RequestError(Exception):
+	"""Erro do cliente: vira uma resposta JSON ``{"error": true, "message": ...}`` com ``status``."""
+
+	def __init__(self, status: int, message: str) -> None:
+		super().__init__(message)
+		self.status = status
+
+
+# ---------------------------------------------------------------------- payload
+def job_from_pnr(text: str, opts: QuoteOptions) -> RenderJob:
+	"""PNR em texto -> RenderJob (cotação única ou várias, como o botão "Gerar PDF")."""
+	parsed = parse(text)
+	if parsed.get("is_multi") and parsed.get("quotations"):
+		return RenderJob(multi_payload(parsed["quotations"], opts, parsed.get("currency", "USD")), "", "multi_quote.html")
+	if not parsed.get("trechos") and not parsed.get("fares") and Decimal(parsed.get("tarifa", "0")) <= 0:
+		raise RequestError(400, "nenhuma cotação encontrada no PNR.")
+	return RenderJob(quote_payload(parsed, opts, FARE_LABELS), "", "quote.html")
+
+
+def _reject_file_refs(value: Any) -> None:
+	# O gerador embute no PDF os arquivos apontados por file:// no HTML: nada vindo do
+	# cliente (PNR, opções, payload) pode conter essas referências
+	if isinstance(value, str):
+		if "file:" in value.lower():
+			raise RequestError(400, "referências file:// não são aceitas.")
+	elif isinstance(value, dict):
+		for v in value.values():
+			_reject_file_refs(v)
+	elif isinstance(value, list):
+		for v in value:
+			_reject_file_refs(v)
+
+
+def _with_server_logo(data: Dict[str, Any]) -> Dict[str, Any]:
+	# logo_src vai para src/url() no HTML: URL do cliente faria o Chromium buscar qualquer endereço
+	logo = logo_src()
+	data = {**data, "logo_src": logo}
+	if isinstance(data.get("quotes"), list):
+		data["quotes"] = [{**q, "logo_src": logo} if isinstance(q, dict) else q for q in data["quotes"]]
+	return data
+
+
+def job_from_request(content_type: str, body: bytes) -> RenderJob:
+	try:
+		text = body.decode("utf-8")
+	except UnicodeDecodeError:
+		raise RequestError(400, "corpo precisa estar em UTF-8.")
+	if not content_type.startswith("application/json"):
+		if not text.strip():
+			raise RequestError(400, "PNR vazio.")
+		_reject_file_refs(text)
+		return job_from_pnr(text, QuoteOptions())
+	try:
+		obj = json.loads(text)
+	except ValueError as e:
+		raise RequestError(400, f"JSON inválido: {e}")
+	if not isinstance(obj, dict):
+		raise RequestError(400, "esperado um objeto JSON.")
+	_reject_file_refs(obj)
+	if isinstance(obj.get("pnr"), str) and obj["pnr"].strip():
+		try:
+			opts = QuoteOptions.from_json(obj.get("options") or {})
+		except ValueError as e:
+			raise RequestError(400, f"opções inválidas: {e}")
+		return job_from_pnr(obj["pnr"], opts)
+	if isinstance(obj.get("data"), dict):
+		template = obj.get("template", "quote.html")
+		if template not in TEMPLATES:
+			raise RequestError(400, f"template desconhecido: {template}")
+		return RenderJob(_with_server_logo(obj["data"]), "", template)
+	raise RequestError(400, "informe 'pnr' (texto) ou 'data' (payload do template).")
+
+
+# ---------------------------------------------------------------------- HTTP
+@dataclass
+class Request:
+	method: str
+	path: str
+	headers: Dict[str, str] = field(default_factory=dict)
+	body: bytes = b""
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+	try:
+		head = await reader.readuntil(b"\r\n\r\n")
+	except asyncio.IncompleteReadError:
+		return None  # conexão fechada sem requisição
+	except asyncio.LimitOverrunError:
+		raise RequestError(413, "cabeçalhos grandes demais.")
+	lines = head.decode("latin-1").split("\r\n")
+	try:
+		method, target, _ = lines[0].split(" ", 2)
+	except ValueError:
+		raise RequestError(400, "linha de requisição inválida.")
+	headers = {}
+	for line in lines[1:]:
+		name, sep, value = line.partition(":")
+		if sep:
+			headers[name.strip().lower()] = value.strip()
+	try:
+		length = int(headers.get("content-length") or 0)
+	except ValueError:
+		raise RequestError(400, "Content-Length inválido.")
+	if length > MAX_BODY_BYTES:
+		raise RequestError(413, f"corpo maior que {MAX_BODY_BYTES // 1024} KiB.")
+	body = await reader.readexactly(length) if length > 0 else b""
+	return Request(method.upper(), target.split("?", 1)[0], headers, body)
+
+
+class QuoteService:
+	"""Servidor HTTP com navegador quente e fila limitada (ver docstring do módulo)."""
+
+	def __init__(
+		self,
+		concurrency: int = 2,
+		queue_size: int = 8,
+		template_dir: str = "templates",
+		allow_origin: Optional[str] = None,
+	) -> None:
+		self.concurrency = max(1, int(concurrency))
+		self.queue_size = max(0, int(queue_size))
+		self.template_dir = template_dir
+		# única origem web (front end do terminal) que pode chamar o serviço pelo navegador
+		self.allow_origin = allow_origin.rstrip("/") if allow_origin else None
+		self.in_flight = 0
+		self.rejected = 0
+		self._slots: Optional[asyncio.Semaphore] = None
+		self._server: Optional[asyncio.AbstractServer] = None
+		# páginas do pool reservadas enquanto o serviço estiver no ar
+		self._capacity = AsyncExitStack()
+
+	async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, warm_up: bool = True) -> asyncio.AbstractServer:
+		self._slots = asyncio.Semaphore(self.concurrency)
+		renderer = get_renderer()
+		await self._capacity.enter_async_context(renderer.capacity(self.concurrency))
+		if warm_up:
+			try:
+				# navegador quente antes da primeira requisição
+				await asyncio.wrap_future(renderer.warm_up())
+			except Exception as e:
+				print(f"Aviso: Chromium não iniciou ({e}); nova tentativa no primeiro PDF.", file=sys.stderr)
+		self._server = await asyncio.start_server(self._handle, host, port, limit=MAX_HEADER_BYTES)
+		return self._server
+
+	@property
+	def port(self) -> int:
+		assert self._server is not None
+		return self._server.sockets[0].getsockname()[1]
+
+	async def close(self) -> None:
+		if self._server is not None:
+			self._server.close()
+			await self._server.wait_closed()
+		await self._capacity.aclose()
+
+	def health(self) -> Dict[str, Any]:
+		renderer = get_renderer()
+		cache = get_pdf_cache()
+		return {
+			"ok": True,
+			"in_flight": self.in_flight,
+			"concurrency": self.concurrency,
+			"queue_size": self.queue_size,
+			"rejected": self.rejected,
+			"renders": renderer.renders,
+			"browser_launches": renderer.launches,
+			"pdf_cache": cache.stats() if cache is not None else None,
+		}
+
+	async def render(self, job: RenderJob) -> bytes:
+		"""Gera o PDF respeitando o limite da fila; RequestError(429) se ela estiver cheia."""
+		assert self._slots is not None
+		if self.in_flight >= self.concurrency + self.queue_size:
+			self.rejected += 1
+			raise RequestError(429, "fila de PDFs cheia; tente novamente em instantes.")
+		self.in_flight += 1
+		try:
+			async with self._slots:
+				return await render_job_bytes(job, self.template_dir)
+		finally:
+			self.in_flight -= 1
+
+	def _cors_headers(self, request: Request) -> Dict[str, str]:
+		"""Cabeçalhos CORS só para a origem configurada; outras origens web são recusadas (403)."""
+		origin = request.headers.get("origin")
+		if not origin:
+			return {}  # cliente fora do navegador (proxy api/generate-pdf.js, curl)
+		if origin != self.allow_origin:
+			raise RequestError(403, f"origem não permitida: {origin}")
+		return {
+			"Access-Control-Allow-Origin": origin,
+			"Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+			"Access-Control-Allow-Headers": "Content-Type",
+			"Vary": "Origin",
+		}
+
+	async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		cors: Dict[str, str] = {}
+		try:
+			try:
+				request = await read_request(reader)
+				if request is None:
+					return
+				cors = self._cors_headers(request)
+				await self._dispatch(request, writer, cors)
+			except RequestError as e:
+				await _send_json(writer, e.status, {"error": True, "message": str(e)}, cors)
+			except Exception as e:
+				await _send_json(writer, 500, {"error": True, "message": str(e) or type(e).__name__}, cors)
+		except (ConnectionError, asyncio.IncompleteReadError):
+			pass  # cliente desistiu
+		finally:
+			writer.close()
+			try:
+				await writer.wait_closed()
+			except Exception:
+				pass
+
+	async def _dispatch(self, request: Request, writer: asyncio.StreamWriter, cors: Dict[str, str]) -> None:
+		if request.method == "OPTIONS":
+			await _send(writer, 204, headers=cors)
+		elif request.path == "/health":
+			if request.method != "GET":
+				raise RequestError(405, "use GET.")
+			await _send_json(writer, 200, self.health(), cors)
+		elif request.path == "/pdf":
+			if request.method != "POST":
+				raise RequestError(405, "use POST.")
+			with tracing.quote():
+				# parse/decode podem esperar o pnrsh (subprocesso): fora do loop, que segue
+				# atendendo /health e recusando com 429
+				job = await asyncio.to_thread(job_from_request, request.headers.get("content-type", "").lower(), request.body)
+				pdf = await self.render(job)
+			filename = f"cotacao_{datetime.now():%Y%m%d_%H%M%S}.pdf"
+			await _send(writer, 200, pdf, "application/pdf", {**cors, "Content-Disposition": f'inline; filename="{filename}"'})
+		else:
+			raise RequestError(404, f"rota desconhecida: {request.path}")
+
+
+async def _send(
+	writer: asyncio.StreamWriter,
+	status: int,
+	body: bytes = b"",
+	content_type: str = "",
+	headers: Optional[Dict[str, str]] = None,
+) -> None:
+	head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", f"Content-Length: {len(body)}", "Connection: close"]
+	if content_type:
+		head.append(f"Content-Type: {content_type}")
+	if status == 429:
+		head.append("Retry-After: 1")
+	head += [f"{k}: {v}" for k, v in (headers or {}).items()]
+	writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+	view = memoryview(body)
+	for start in range(0, len(body), CHUNK_SIZE):
+		writer.write(view[start:start + CHUNK_SIZE])
+		await writer.drain()
+	await writer.drain()
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, obj: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+	await _send(writer, status, json.dumps(obj, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8", headers)
+
+
+def _is_loopback(host: str) -> bool:
+	if host == "localhost":
+		return True
+	try:
+		return ipaddress.ip_address(host).is_loopback
+	except ValueError:
+		return False
+
+
+async def serve(host: str, port: int, concurrency: int, queue_size: int, template_dir: str, allow_origin: Optional[str] = None) -> None:
+	service = QuoteService(concurrency, queue_size, template_dir, allow_origin)
+	server = await service.start(host, port)
+	print(f"Serviço de PDF em http://{host}:{service.port} (concorrência {service.concurrency}, fila {service.queue_size})", flush=True)
+	async with server:
+		await server.serve_forever()
+
+
+def main(argv: List[str] | None = None) -> int:
+	ap = argparse.ArgumentParser(description="Serviço HTTP local de PDFs de cotação (PNR/JSON -> PDF).")
+	ap.add_argument("--host", default=DEFAULT_HOST)
+	ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+	ap.add_argument("--concurrency", type=int, default=2, help="PDFs imprimindo ao mesmo tempo")
+	ap.add_argument("--queue", type=int, default=8, help="requisições aguardando além das em impressão (acima disso: 429)")
+	ap.add_argument("--template-dir", default="templates")
+	ap.add_argument("--allow-remote", action="store_true", help="permite escutar fora de localhost")
+	ap.add_argument("--allow-origin", help="origem web (ex.: http://localhost:3000) autorizada via CORS; outras origens recebem 403")
+	ap.add_argument("--cache-dir", help="cache em disco de PDFs já gerados (padrão: SETEMARES_PDF_CACHE)")
+	ap.add_argument("--mode", choices=RENDER_MODES, help="carga das páginas (padrão: SETEMARES_PDF_MODE ou navigate)")
+	args = ap.parse_args(argv)
+	if args.cache_dir:
+		configure_pdf_cache(args.cache_dir)
+	if args.mode:
+		set_render_mode(args.mode)
+	if not _is_loopback(args.host) and not args.allow_remote:
+		ap.error(f"{args.host} não é localhost; use --allow-remote para expor o serviço na rede.")
+	try:
+		asyncio.run(serve(args.host, args.port, args.concurrency, args.queue, args.template_dir, args.allow_origin))
+	except KeyboardInterrupt:
+		pass
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,190 @@
+"""Concatenação de PDFs em streaming (fragmentos do documento multi -> PDF final).
+
+Cada fragmento é lido inteiro (um por vez), seus objetos são renumerados e
+copiados direto para o arquivo de saída; da saída só ficam em memória os
+deslocamentos dos objetos. As árvores de páginas dos fragmentos viram filhas de
+uma raiz ``/Pages`` nova, então cada fragmento pode ter quantas páginas quiser.
+
+Suporta o que o Chromium (Skia) gera: tabela xref clássica, sem atualização
+incremental. Outros formatos (xref em stream, ``/Prev``) levantam
+``UnsupportedPdf`` e o chamador volta a renderizar o documento inteiro.
+"""
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+
+class UnsupportedPdf(ValueError):
+	pass
+
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)")
+_XREF_SECTION_RE = re.compile(rb"(\d+)\s+(\d+)\s*[\r\n]+")
+_XREF_ENTRY_RE = re.compile(rb"(\d{10}) (\d{5}) ([nf])")
+_OBJ_HEADER_RE = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\b")
+_STREAM_RE = re.compile(rb">>\s*stream\r?\n")
+_REF_RE = re.compile(rb"(\d+)\s+(\d+)\s+R\b")
+_VERSION_RE = re.compile(rb"%PDF-(\d)\.(\d)")
+
+
+def _split_strings(data: bytes) -> List[Tuple[bool, bytes]]:
+	"""Separa literais ``(...)`` (com escapes e parênteses aninhados) do restante do objeto."""
+	parts: List[Tuple[bool, bytes]] = []
+	i = start = 0
+	n = len(data)
+	while i < n:
+		if data[i:i + 1] != b"(":
+			i += 1
+			continue
+		parts.append((False, data[start:i]))
+		depth, j = 0, i
+		while j < n:
+			c = data[j:j + 1]
+			if c == b"\\":
+				j += 2
+				continue
+			if c == b"(":
+				depth += 1
+			elif c == b")":
+				depth -= 1
+				if depth == 0:
+					break
+			j += 1
+		parts.append((True, data[i:j + 1]))
+		i = start = j + 1
+	parts.append((False, data[start:]))
+	return parts
+
+
+def _renumber(data: bytes, base: int) -> bytes:
+	"""Soma ``base`` às referências ``N G R`` fora de literais de texto."""
+	def ref(m: re.Match) -> bytes:
+		return b"%d %s R" % (int(m.group(1)) + base, m.group(2))
+	return b"".join(chunk if is_str else _REF_RE.sub(ref, chunk) for is_str, chunk in _split_strings(data))
+
+
+def _dict_value(obj: bytes, key: bytes) -> Optional[bytes]:
+	m = re.search(rb"/" + key + rb"\s+(\d+\s+\d+\s+R|\d+)", obj)
+	return m.group(1) if m else None
+
+
+def _ref_num(value: Optional[bytes]) -> int:
+	if value is None:
+		raise UnsupportedPdf("referência ausente.")
+	return int(value.split()[0])
+
+
+class _Fragment:
+	"""Um PDF de entrada: tabela xref clássica e os trechos de bytes de cada objeto."""
+
+	def __init__(self, data: bytes, name: str = "") -> None:
+		self.data = data
+		self.name = name
+		matches = list(_STARTXREF_RE.finditer(data[-2048:]))
+		if not matches:
+			raise UnsupportedPdf(f"{name}: startxref não encontrado.")
+		xref_at = int(matches[-1].group(1))
+		if not data.startswith(b"xref", xref_at):
+			raise UnsupportedPdf(f"{name}: xref em stream não suportado.")
+		self.offsets: Dict[int, int] = {}
+		pos = xref_at + 4
+		while True:
+			while data[pos:pos + 1] in (b" ", b"\r", b"\n"):
+				pos += 1
+			if data.startswith(b"trailer", pos):
+				break
+			m = _XREF_SECTION_RE.match(data, pos)
+			if not m:
+				raise UnsupportedPdf(f"{name}: tabela xref inválida.")
+			first, count = int(m.group(1)), int(m.group(2))
+			pos = m.end()
+			for k in range(count):
+				e = _XREF_ENTRY_RE.match(data, pos)
+				if not e:
+					raise UnsupportedPdf(f"{name}: entrada xref inválida.")
+				if e.group(3) == b"n":
+					if int(e.group(2)) != 0:
+						raise UnsupportedPdf(f"{name}: geração de objeto diferente de 0.")
+					self.offsets[first + k] = int(e.group(1))
+				pos = e.end()
+				while data[pos:pos + 1] in (b" ", b"\r", b"\n"):
+					pos += 1
+		trailer = data[pos:data.find(b"startxref", pos)]
+		if _dict_value(trailer, b"Prev") is not None:
+			raise UnsupportedPdf(f"{name}: atualização incremental não suportada.")
+		self.size = int(_dict_value(trailer, b"Size") or 0)
+		self.root = _ref_num(_dict_value(trailer, b"Root"))
+		# cada objeto vai até o início do seguinte (ou até a xref): streams binários não são varridos
+		starts = sorted(self.offsets.values()) + [xref_at]
+		self._ends = {starts[i]: starts[i + 1] for i in range(len(starts) - 1)}
+		self.pages = _ref_num(_dict_value(self.object(self.root), b"Pages"))
+		self.page_count = int(_dict_value(self.object(self.pages), b"Count") or 0)
+
+	def object(self, num: int) -> bytes:
+		start = self.offsets[num]
+		return self.data[start:self._ends[start]]
+
+
+def merge_pdfs(sources: Iterable[str | Path], out: str | Path | BinaryIO) -> int:
+	"""Concatena ``sources`` (na ordem) em ``out``; retorna o total de páginas."""
+	if isinstance(out, (str, Path)):
+		with open(out, "wb") as fh:
+			return merge_pdfs(sources, fh)
+	paths = [Path(p) for p in sources]
+	version = (1, 4)
+	for p in paths:
+		with open(p, "rb") as fh:
+			m = _VERSION_RE.match(fh.read(16))
+		if m:
+			version = max(version, (int(m.group(1)), int(m.group(2))))
+
+	written = 0
+
+	def write(chunk: bytes) -> None:
+		nonlocal written
+		out.write(chunk)
+		written += len(chunk)
+
+	# 1 = catálogo e 2 = raiz das páginas, escritos no fim; fragmentos a partir do 3
+	offsets: Dict[int, int] = {}
+	kids: List[int] = []
+	total_pages = 0
+	base = 2
+	write(b"%%PDF-%d.%d\n%%\xe2\xe3\xcf\xd3\n" % version)
+	for p in paths:
+		frag = _Fragment(p.read_bytes(), p.name)
+		for num in sorted(frag.offsets):
+			if num == frag.root:
+				continue  # catálogo do fragmento é substituído pelo do documento
+			raw = frag.object(num)
+			header = _OBJ_HEADER_RE.match(raw)
+			if not header or int(header.group(1)) != num:
+				raise UnsupportedPdf(f"{p.name}: objeto {num} fora da posição indicada na xref.")
+			stream = _STREAM_RE.search(raw, header.end())
+			head, tail = (raw[header.end():stream.end()], raw[stream.end():]) if stream else (raw[header.end():], b"")
+			head = _renumber(head, base)
+			if num == frag.pages:
+				head = head.replace(b"<<", b"<< /Parent 2 0 R", 1)
+			offsets[num + base] = written
+			write(b"%d 0 obj" % (num + base))
+			write(head)
+			write(tail)
+		kids.append(frag.pages + base)
+		total_pages += frag.page_count
+		base += max(frag.size, max(frag.offsets) + 1)
+
+	offsets[1] = written
+	write(b"1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
+	offsets[2] = written
+	write(b"2 0 obj\n<< /Type /Pages /Kids [%s] /Count %d >>\nendobj\n" % (b" ".join(b"%d 0 R" % k for k in kids), total_pages))
+
+	size = base
+	xref_at = written
+	write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+	for num in range(1, size):
+		at = offsets.get(num)
+		write(b"%010d 00000 n \n" % at if at is not None else b"0000000000 65535 f \n")
+	write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_at))
+	return total_pages
@@ -0,0 +1,140 @@
+"""Contexto dos templates de cotação a partir do PNR parseado.
+
+Compartilhado pelo app desktop (``ui.app``) e pelo serviço HTTP
+(``pdf.http_service``), para que os dois gerem o mesmo PDF para o mesmo PNR.
+Sem Qt: os valores da janela chegam em ``QuoteOptions``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.data.airlines import get_airline_name
+from core.parser.decode_cache import decode_itinerary
+from core.rules.pricing import price
+
+LOGO_PATH = Path(__file__).resolve().parents[1] / "Arquivos" / "Modelos" / "Logo.png"
+FARE_LABELS = {"ADT": "Adulto", "CHD": "Infantil", "INF": "Bebê"}
+
+
+@dataclass
+class QuoteOptions:
+	"""Parâmetros que no app desktop vêm dos campos da janela (mesmos padrões)."""
+	rav_percent: float = 10.0
+	fee: Optional[Decimal] = None  # None: usa o fee do PNR
+	classe: str = "Executiva"
+	bagagem: str = "2 peças de até 23kg por bilhete"
+	parcelas: int = 4
+	pagamento: Optional[str] = None  # None: "Em até <parcelas>x no cartão..."
+	multa_base: Optional[Decimal] = None  # None: multa do PNR ou USD 100,00
+	reembolsavel: bool = False
+	family_name: str = ""
+
+	@classmethod
+	def from_json(cls, obj: Dict[str, Any]) -> "QuoteOptions":
+		"""Opções vindas de JSON; valores inválidos levantam ``ValueError``."""
+		try:
+			opts = cls()
+			for key in ("classe", "bagagem", "pagamento", "family_name"):
+				if obj.get(key) is not None:
+					setattr(opts, key, str(obj[key]).strip())
+			if obj.get("rav_percent") is not None:
+				opts.rav_percent = float(obj["rav_percent"])
+			if obj.get("parcelas") is not None:
+				opts.parcelas = int(obj["parcelas"])
+			for key in ("fee", "multa_base"):
+				if obj.get(key) is not None:
+					setattr(opts, key, Decimal(str(obj[key])))
+			opts.reembolsavel = bool(obj.get("reembolsavel", False))
+			return opts
+		except (TypeError, ValueError, ArithmeticError) as e:
+			raise ValueError(str(e)) from e
+
+
+def format_saida(d: date) -> str:
+	"""Data por extenso em pt_BR ("5 de maio"); Babel é importado no primeiro uso."""
+	from babel.dates import format_date
+	return format_date(d, format="d 'de' MMMM", locale="pt_BR")
+
+
+def saida_label_full(d: date) -> str:
+	"""Como ``format_saida``, com o mês capitalizado ("5 de Maio")."""
+	saida = format_saida(d)
+	if " de " in saida:
+		dia, mes = saida.split(" de ", 1)
+		return f"{dia} de {mes.capitalize()}"
+	return saida
+
+
+def saida_labels(decoded) -> Tuple[str, str]:
+	"""("dd/mm", "5 de Maio") da partida do primeiro trecho; vazios sem itinerário."""
+	if not decoded or not decoded.first.departure:
+		return "", ""
+	dt = decoded.first.departure
+	try:
+		full = saida_label_full(dt.date())
+	except Exception:
+		full = ""
+	return dt.strftime("%d/%m"), full
+
+
+def cia_principal(trechos: List[str]) -> str:
+	"""Código da companhia do primeiro trecho ("AF"), ou "CIA" sem trechos."""
+	first = trechos[0].strip().split() if trechos else []
+	return "".join(ch for ch in first[0] if ch.isalpha()).upper() if first else "CIA"
+
+
+def logo_src() -> str:
+	return LOGO_PATH.as_uri() if LOGO_PATH.exists() else ""
+
+
+def quote_payload(q: Dict[str, Any], opts: QuoteOptions, labels: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+	"""Contexto do template para uma cotação parseada (``quote.html`` ou página do multi)."""
+	fee = Decimal(q.get("fee", "0")) if opts.fee is None else opts.fee
+	fare_details = []
+	for f in q.get("fares", []):
+		total_cat = price(Decimal(f["tarifa"]), Decimal(f["taxas"]), opts.rav_percent, fee).total
+		fare_details.append({"label": (labels or {}).get(f["category"], f["category"]), "total": total_cat})
+	grand_total = sum((f["total"] for f in fare_details), Decimal("0"))
+	total = grand_total if fare_details else price(Decimal(q.get("tarifa", "0")), Decimal(q.get("taxas_base", "0")), opts.rav_percent, fee).total
+	multa = opts.multa_base
+	if multa is None:
+		multa = Decimal(q.get("multa", "0")) or Decimal("100")
+	trechos = q.get("trechos", [])
+	decoded = decode_itinerary(trechos)
+	saida_label, saida_full = saida_labels(decoded)
+	return {
+		"cia": get_airline_name(cia_principal(trechos)),
+		"trechos": trechos,
+		"decoded": decoded,
+		"currency": q.get("currency", "USD"),
+		"classe": opts.classe,
+		"classe_label": opts.classe,
+		"bagagem": q.get("bagagem_hint") or opts.bagagem,
+		"pagamento": q.get("pagamento_hint") or opts.pagamento or f"Em até {opts.parcelas}x no cartão de crédito, taxas à vista",
+		"multa_text": f"USD {multa:.2f} + diferença tarifária, caso houver.",
+		"reembolso_text": "Bilhete reembolsável." if opts.reembolsavel else "Bilhete não reembolsável.",
+		"family_name": opts.family_name,
+		"logo_src": logo_src(),
+		"fare_details": fare_details,
+		"grand_total": grand_total,
+		"total": total,
+		"destino": decoded.first.destination.place if decoded else "",
+		"rota_label": decoded.route if decoded else "",
+		"saida_label": saida_label,
+		"saida_label_full": saida_full,
+	}
+
+
+def multi_payload(quotations: List[Dict[str, Any]], opts: QuoteOptions, currency: str = "USD") -> Dict[str, Any]:
+	"""Contexto de ``multi_quote.html``: uma página por cotação e o resumo."""
+	quotes = [quote_payload(q, opts) for q in quotations]
+	rows = [
+		{"id": f"Q{i:02d}", "rota": q["rota_label"], "saida": q["saida_label"], "classe": q["classe_label"], "total": q["total"]}
+		for i, q in enumerate(quotes, start=1)
+	]
+	summary = {"rows": rows, "soma": sum((q["total"] for q in quotes), Decimal("0")), "currency": currency}
+	return {"quotes": quotes, "summary": summary}
@@ -0,0 +1,401 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import os
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, List, Optional, Tuple
+
+from core import tracing
+
+# Opções de impressão compartilhadas por todos os PDFs (A4, margens de 18mm)
+PDF_OPTIONS = {
+	"format": "A4",
+	"margin": {"top": "18mm", "right": "18mm", "bottom": "18mm", "left": "18mm"},
+	"print_background": True,
+}
+
+
+_BODY_RE = re.compile(r"<body\b", re.I)
+_SCRIPT_RE = re.compile(r"<script\b", re.I)
+
+# Troca o <body> da página já carregada pelo do documento recebido e espera imagens e fontes
+_INJECT_BODY_JS = """async (body) => {
+	const parsed = new DOMParser().parseFromString(body, "text/html");
+	document.body.replaceWith(document.adoptNode(parsed.body));
+	await Promise.all([...document.images].map((img) => img.complete ? null : img.decode().catch(() => null)));
+	await document.fonts.ready;
+}"""
+
+
+def split_document(html: str) -> Optional[Tuple[str, str]]:
+	"""Separa ``html`` em casca (doctype + ``<head>``) e ``<body>`` para o modo de injeção.
+
+	``casca + body == html``. Retorna None quando o documento não tem ``<body>`` ou o
+	corpo traz ``<script>`` (scripts não rodam ao trocar o corpo via DOM).
+	"""
+	m = _BODY_RE.search(html)
+	if m is None or _SCRIPT_RE.search(html, m.start()):
+		return None
+	return html[:m.start()], html[m.start():]
+
+
+class RendererClosed(Exception):
+	pass
+
+
+# Avisado (no loop do renderer) cada vez que o job corrente obtém uma página do pool.
+# submit() agenda a corrotina com uma cópia do contexto de quem chama, então o valor
+# definido antes de render_job chega até aqui.
+page_acquired: ContextVar[Optional[Callable[[], None]]] = ContextVar("page_acquired", default=None)
+
+
+class PdfRenderer:
+	"""Long-lived Chromium owner shared by every PDF render in the process.
+
+	The browser lives on a private event loop running in a daemon thread, so callers
+	that wrap each job in ``asyncio.run()`` (the Qt UI) still reuse the same browser.
+	A small pool of pages is kept warm; the browser is relaunched when it crashes or
+	disconnects and shut down after ``idle_timeout`` seconds without work.
+
+	With ``inject=True`` a page keeps the document head (inlined CSS, logo) loaded
+	between renders and only the ``<body>`` is swapped through ``page.evaluate``;
+	the head is reloaded only when it differs from the one already on the page.
+	"""
+
+	def __init__(self, pool_size: int = 2, idle_timeout: float = 300.0) -> None:
+		self.pool_size = max(1, int(pool_size))
+		self._base_size = self.pool_size
+		# páginas pedidas por capacity() em andamento; vagas a recolher quando voltarem
+		self._demands: List[int] = []
+		self._excess = 0
+		self.idle_timeout = float(idle_timeout)
+		self.launches = 0
+		self.renders = 0
+		self.shell_loads = 0
+		self._thread: Optional[threading.Thread] = None
+		self._loop: Optional[asyncio.AbstractEventLoop] = None
+		self._ready = threading.Event()
+		self._lock = threading.Lock()
+		self._closed = False
+		# Estado abaixo só é acessado de dentro do loop do renderer
+		self._pw = None
+		self._browser = None
+		self._idle_pages: List[Any] = []
+		# página -> casca (head) carregada nela pelo modo de injeção
+		self._shells: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+		self._slots: Optional[asyncio.Semaphore] = None
+		self._launch_lock: Optional[asyncio.Lock] = None
+		self._busy = 0
+		self._last_used = time.monotonic()
+
+	# ------------------------------------------------------------------ ciclo de vida
+	def start(self) -> "PdfRenderer":
+		with self._lock:
+			if self._closed:
+				raise RendererClosed("renderer já foi encerrado.")
+			if self._thread is not None and self._thread.is_alive():
+				return self
+			self._ready.clear()
+			self._thread = threading.Thread(target=self._run_loop, name="pdf-renderer", daemon=True)
+			self._thread.start()
+		self._ready.wait()
+		return self
+
+	def _run_loop(self) -> None:
+		loop = asyncio.new_event_loop()
+		asyncio.set_event_loop(loop)
+		self._loop = loop
+		self._slots = asyncio.Semaphore(self.pool_size)
+		self._launch_lock = asyncio.Lock()
+		watchdog = loop.create_task(self._idle_watchdog())
+		self._ready.set()
+		try:
+			loop.run_forever()
+		finally:
+			watchdog.cancel()
+			try:
+				loop.run_until_complete(asyncio.gather(watchdog, return_exceptions=True))
+			finally:
+				loop.close()
+
+	def close(self, timeout: float = 10.0) -> None:
+		"""Fecha o navegador e encerra o loop do renderer (idempotente)."""
+		with self._lock:
+			if self._closed:
+				return
+			self._closed = True
+			thread, loop = self._thread, self._loop
+		if thread is None or loop is None or not thread.is_alive():
+			return
+		try:
+			asyncio.run_coroutine_threadsafe(self._teardown(), loop).result(timeout)
+		except Exception:
+			pass
+		loop.call_soon_threadsafe(loop.stop)
+		thread.join(timeout)
+
+	# ------------------------------------------------------------------ API pública
+	def submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+		"""Agenda uma corrotina no loop do renderer; retorna um Future thread-safe."""
+		self.start()
+		assert self._loop is not None
+		return asyncio.run_coroutine_threadsafe(tracing.bind(coro), self._loop)
+
+	async def run(self, coro: Coroutine[Any, Any, Any]) -> Any:
+		"""Aguarda ``coro`` executada no loop do renderer a partir de qualquer outro loop."""
+		return await asyncio.wrap_future(self.submit(coro))
+
+	@asynccontextmanager
+	async def capacity(self, pages: int) -> AsyncIterator[None]:
+		"""Ao menos ``pages`` páginas simultâneas enquanto o bloco roda (em qualquer loop).
+
+		Pedidos sobrepostos valem pelo maior; ao fim do último o pool volta ao tamanho
+		original.
+		"""
+		await self.run(self._reserve(pages))
+		try:
+			yield
+		finally:
+			await self.run(self._unreserve(pages))
+
+	async def _reserve(self, pages: int) -> None:
+		self._demands.append(max(1, int(pages)))
+		await self._resize()
+
+	async def _unreserve(self, pages: int) -> None:
+		self._demands.remove(max(1, int(pages)))
+		await self._resize()
+
+	async def _resize(self) -> None:
+		assert self._slots is not None
+		target = max([self._base_size, *self._demands])
+		while self.pool_size < target:
+			self.pool_size += 1
+			if self._excess:
+				self._excess -= 1  # vaga ainda não devolvida: basta mantê-la
+			else:
+				self._slots.release()
+		while self.pool_size > target:
+			self.pool_size -= 1
+			if self._slots.locked():
+				self._excess += 1  # página em uso: a vaga some quando ela voltar
+			else:
+				await self._slots.acquire()
+		while len(self._idle_pages) > self.pool_size:
+			try:
+				await self._idle_pages.pop(0).close()
+			except Exception:
+				pass
+
+	def warm_up(self) -> Future:
+		"""Lança o navegador em segundo plano (sem bloquear o chamador)."""
+		return self.submit(self._ensure_browser())
+
+	def is_healthy(self, timeout: float = 10.0) -> bool:
+		try:
+			return bool(self.submit(self.health_check()).result(timeout))
+		except Exception:
+			return False
+
+	async def health_check(self) -> bool:
+		"""Verifica se o navegador responde (avalia uma expressão numa página do pool)."""
+		async def _ping(page) -> bool:
+			return await page.evaluate("1 + 1") == 2
+		return await self._with_page(_ping)
+
+	async def print_html(self, html: str, out_pdf: str, inject: bool = False) -> None:
+		"""Injeta ``html`` direto na página (sem arquivo temporário) e imprime o PDF.
+
+		Recursos locais precisam vir embutidos (ver ``pdf.generator._inline_assets``):
+		a página fica em about:blank e não carrega ``file://``. Com ``inject=True`` só
+		o ``<body>`` é trocado se a página já tiver a mesma casca carregada.
+		"""
+		async def _print(page) -> None:
+			await self._load(page, html, inject)
+			with tracing.span("page.pdf"):
+				await page.pdf(path=out_pdf, **PDF_OPTIONS)
+		await self._with_page(_print)
+		self.renders += 1
+
+	async def pdf_bytes(self, html: str, inject: bool = False) -> bytes:
+		"""Como ``print_html``, mas devolve o PDF em memória (nada é gravado em disco)."""
+		async def _print(page) -> bytes:
+			await self._load(page, html, inject)
+			with tracing.span("page.pdf"):
+				return await page.pdf(**PDF_OPTIONS)
+		data = await self._with_page(_print)
+		self.renders += 1
+		return data
+
+	# ------------------------------------------------------------------ internos
+	async def _load(self, page, html: str, inject: bool) -> None:
+		parts = split_document(html) if inject else None
+		if parts is None:
+			self._shells.pop(page, None)
+			with tracing.span("page.load"):
+				await page.set_content(html, wait_until="load")
+			return
+		shell, body = parts
+		if self._shells.get(page) != shell:
+			self._shells.pop(page, None)
+			with tracing.span("page.load"):
+				await page.set_content(shell, wait_until="load")
+			self._shells[page] = shell
+			self.shell_loads += 1
+		with tracing.span("page.inject"):
+			await page.evaluate(_INJECT_BODY_JS, body)
+
+	def _browser_alive(self) -> bool:
+		return self._browser is not None and self._browser.is_connected()
+
+	def _on_disconnected(self, browser) -> None:
+		# Crash/fechamento externo: descarta estado para relançar no próximo job
+		if browser is self._browser:
+			self._browser = None
+			self._idle_pages.clear()
+
+	async def _ensure_browser(self):
+		assert self._launch_lock is not None
+		async with self._launch_lock:
+			if self._browser_alive():
+				return self._browser
+			await self._teardown()
+			# Import tardio: PLAYWRIGHT_BROWSERS_PATH precisa estar definido antes
+			from pdf.generator import _ensure_pw_env
+			_ensure_pw_env()
+			from playwright.async_api import async_playwright
+			with tracing.span("browser.launch"):
+				self._pw = await async_playwright().start()
+				try:
+					browser = await self._pw.chromium.launch(headless=True)
+				except Exception:
+					await self._teardown()
+					raise
+			browser.on("disconnected", self._on_disconnected)
+			self._browser = browser
+			self.launches += 1
+			self._last_used = time.monotonic()
+			return browser
+
+	async def _teardown(self) -> None:
+		browser, pw = self._browser, self._pw
+		self._browser = None
+		self._pw = None
+		self._idle_pages.clear()
+		if browser is not None:
+			try:
+				await browser.close()
+			except Exception:
+				pass
+		if pw is not None:
+			try:
+				await pw.stop()
+			except Exception:
+				pass
+
+	async def _acquire_page(self):
+		assert self._slots is not None
+		await self._slots.acquire()
+		self._busy += 1
+		try:
+			browser = await self._ensure_browser()
+			while self._idle_pages:
+				page = self._idle_pages.pop()
+				if not page.is_closed():
+					return page
+			return await browser.new_page()
+		except BaseException:
+			self._busy -= 1
+			self._return_slot()
+			raise
+
+	def _return_slot(self) -> None:
+		assert self._slots is not None
+		if self._excess:
+			self._excess -= 1  # pool reduzido enquanto a página estava em uso
+		else:
+			self._slots.release()
+
+	async def _release_page(self, page, healthy: bool) -> None:
+		assert self._slots is not None
+		try:
+			if healthy and len(self._idle_pages) < self.pool_size and not page.is_closed() and self._browser_alive() and page.context.browser is self._browser:
+				self._idle_pages.append(page)
+			else:
+				try:
+					await page.close()
+				except Exception:
+					pass
+		finally:
+			self._busy -= 1
+			self._last_used = time.monotonic()
+			self._return_slot()
+
+	async def _with_page(self, action: Callable[[Any], Awaitable[Any]]) -> Any:
+		# Uma nova tentativa se o navegador caiu durante o job (relança automaticamente)
+		for attempt in (1, 2):
+			with tracing.span("page.acquire"):
+				page = await self._acquire_page()
+			listener = page_acquired.get()
+			if listener is not None:
+				listener()
+			ok = False
+			try:
+				result = await action(page)
+				ok = True
+				return result
+			except Exception:
+				if attempt == 1 and not self._browser_alive():
+					continue
+				raise
+			finally:
+				await self._release_page(page, healthy=ok)
+
+	async def _idle_watchdog(self) -> None:
+		interval = max(1.0, min(30.0, self.idle_timeout / 4))
+		while True:
+			await asyncio.sleep(interval)
+			if self._browser is None or self._busy:
+				continue
+			if time.monotonic() - self._last_used >= self.idle_timeout:
+				assert self._launch_lock is not None
+				async with self._launch_lock:
+					if self._busy == 0:
+						await self._teardown()
+
+
+_RENDERER: Optional[PdfRenderer] = None
+_RENDERER_LOCK = threading.Lock()
+
+
+def get_renderer() -> PdfRenderer:
+	"""Retorna o renderer do processo (criado e iniciado sob demanda).
+
+	Tamanho do pool e timeout de ociosidade podem ser ajustados por
+	``SETEMARES_PDF_POOL`` e ``SETEMARES_PDF_IDLE_TIMEOUT`` (segundos).
+	"""
+	global _RENDERER
+	with _RENDERER_LOCK:
+		if _RENDERER is None or _RENDERER._closed:
+			_RENDERER = PdfRenderer(
+				pool_size=int(os.environ.get("SETEMARES_PDF_POOL", "2") or 2),
+				idle_timeout=float(os.environ.get("SETEMARES_PDF_IDLE_TIMEOUT", "300") or 300),
+			)
+			atexit.register(_RENDERER.close)
+		renderer = _RENDERER
+	return renderer.start()
+
+
+def shutdown_renderer() -> None:
+	global _RENDERER
+	with _RENDERER_LOCK:
+		renderer, _RENDERER = _RENDERER, None
+	if renderer is not None:
+		renderer.close()
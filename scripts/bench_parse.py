@@ -0,0 +1,68 @@
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+	sys.path.insert(0, str(ROOT))
+
+from cli.main import _parse_single, money
+
+
+def _legacy_parse_single(text: str) -> dict:
+	"""Parser anterior (várias varreduras do texto inteiro), mantido só como referência."""
+	currency = "USD"
+	if re.search(r"\bEUR\b|€", text, flags=re.I):
+		currency = "EUR"
+	elif re.search(r"\bBRL\b|R\$", text, flags=re.I):
+		currency = "BRL"
+	ccy_opt = r"(?:usd|eur|brl|US\$|R\$|€)?"
+	fares = []
+	fare_pattern = re.compile(
+		rf"tarifa\s*{ccy_opt}\s*([\d.,]+)\s*\+\s*(?:txs?|taxas?)\s*{ccy_opt}\s*([\d.,]+)\s*(\*.*)?$",
+		flags=re.I | re.M,
+	)
+	for match in fare_pattern.finditer(text):
+		tarifa, taxas, suffix = match.groups()
+		fares.append({"category": (suffix or "ADT"), "tarifa": str(money(tarifa)), "taxas": str(money(taxas))})
+	fee = re.search(rf"(?:fee|du|taxa de serviço)\s*{ccy_opt}\s*([\d.,]+)", text, flags=re.I)
+	multa = re.search(rf"troca\s*{ccy_opt}\s*([\d.,]+)", text, flags=re.I)
+	trechos = re.findall(r"^\s*[A-Z0-9]{2}\s*\d{2,4}.*$", text, flags=re.I | re.M)
+	pagto = re.search(r"pagto\s*([^\n\r]+)", text, flags=re.I)
+	bag_lines = re.findall(r"^\s*\d+pc\s*[^\r\n]*$", text, flags=re.I | re.M)
+	return {"fares": fares, "fee": fee, "multa": multa, "trechos": trechos, "pagto": pagto, "bag": bag_lines, "currency": currency}
+
+
+def _email_thread(copies: int) -> str:
+	# Simula um e-mail longo: PNRs de exemplo intercalados com texto corrido de resposta
+	sample = "\n".join(p.read_text(encoding="utf-8") for p in sorted((ROOT / "data").glob("pnr_*.txt")))
+	filler = "\n".join(
+		f"> Em resposta ao pedido {i}: segue a cotação conforme conversamos, valores sujeitos a alteração."
+		for i in range(20)
+	)
+	return "\n".join(f"{sample}\n{filler}" for _ in range(copies))
+
+
+def _bench(fn, text: str, rounds: int) -> float:
+	best = float("inf")
+	for _ in range(rounds):
+		t0 = time.perf_counter()
+		fn(text)
+		best = min(best, time.perf_counter() - t0)
+	return best
+
+
+def main() -> None:
+	copies = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+	text = _email_thread(copies)
+	legacy = _bench(_legacy_parse_single, text, 5)
+	current = _bench(_parse_single, text, 5)
+	print(f"texto: {len(text.splitlines())} linhas, {len(text) / 1024:.0f} KiB")
+	print(f"legado (multi-varredura): {legacy * 1000:.1f} ms")
+	print(f"tokenizer (uma passada):  {current * 1000:.1f} ms")
+	print(f"speedup: {legacy / current:.2f}x")
+
+
+if __name__ == "__main__":
+	main()
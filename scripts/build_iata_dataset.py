@@ -0,0 +1,108 @@
+"""Gera core/data/iata.bin a partir dos CSVs do OpenFlights (airports.dat / airlines.dat).
+
+Uso:
+  python scripts/build_iata_dataset.py [--airports CSV] [--airlines CSV] [--version TAG] [--out ARQ]
+
+Por padrão lê as cópias em desktop/_archive/cleanup-20251121 (Aeroportos.txt e
+Companhias.txt). O layout do arquivo está descrito em core/data/iata.py.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+	sys.path.insert(0, str(ROOT))
+
+from core.data.iata import (  # noqa: E402
+	AIRLINE_SLOTS, AIRPORT_SLOTS, DEFAULT_PATH, FORMAT_VERSION, HEADER, MAGIC, REC_LEN, SEP, SLOT,
+	airline_slot, airport_slot,
+)
+
+SOURCE_DIR = ROOT / "desktop" / "_archive" / "cleanup-20251121"
+
+
+def _clean(value: str) -> str:
+	value = (value or "").strip()
+	return "" if value == "\\N" else value.replace(SEP, " ")
+
+
+def load_airports(path: Path) -> Dict[str, List[str]]:
+	# id, nome, cidade, país, IATA, ICAO, lat, lon, altitude, fuso (h), DST, tz, tipo, fonte
+	airports: Dict[str, List[str]] = {}
+	with open(path, encoding="utf-8", newline="") as fh:
+		for row in csv.reader(fh):
+			if len(row) < 12:
+				continue
+			code = _clean(row[4]).upper()
+			if airport_slot(code) < 0 or code in airports:
+				continue
+			airports[code] = [_clean(row[1]), _clean(row[2]), _clean(row[3]), _clean(row[11]), _clean(row[9]), _clean(row[5])]
+	return airports
+
+
+def load_airlines(path: Path) -> Dict[str, List[str]]:
+	# id, nome, alias, IATA, ICAO, callsign, país, ativa (Y/N)
+	best: Dict[str, Tuple[Tuple[int, int, int], List[str]]] = {}
+	with open(path, encoding="utf-8", newline="") as fh:
+		for row in csv.reader(fh):
+			if len(row) < 8:
+				continue
+			code = _clean(row[3]).upper()
+			if airline_slot(code) < 0:
+				continue
+			icao = _clean(row[4])
+			# códigos IATA são reaproveitados: prefere a companhia ativa, depois a com ICAO, depois a mais recente
+			rank = (row[7] == "Y", bool(icao) and icao != "N/A", int(row[0]) if row[0].lstrip("-").isdigit() else 0)
+			if code not in best or rank > best[code][0]:
+				best[code] = (rank, [_clean(row[1]), _clean(row[6]), icao])
+	return {code: fields for code, (_, fields) in best.items()}
+
+
+def build(airports: Dict[str, List[str]], airlines: Dict[str, List[str]], version: str) -> bytes:
+	blob = bytearray(b"\0")  # deslocamento 0 significa "ausente"
+	airport_table = [0] * AIRPORT_SLOTS
+	airline_table = [0] * AIRLINE_SLOTS
+
+	def add(fields: List[str]) -> int:
+		data = SEP.join(fields).encode("utf-8")
+		offset = len(blob)
+		blob.extend(REC_LEN.pack(len(data)))
+		blob.extend(data)
+		return offset
+
+	for code in sorted(airports):
+		airport_table[airport_slot(code)] = add(airports[code])
+	for code in sorted(airlines):
+		airline_table[airline_slot(code)] = add(airlines[code])
+
+	out = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, 0, version.encode("ascii")[:16], len(airports), len(airlines)))
+	for table in (airport_table, airline_table):
+		for offset in table:
+			out.extend(SLOT.pack(offset))
+	out.extend(blob)
+	return bytes(out)
+
+
+def main(argv: List[str] | None = None) -> int:
+	ap = argparse.ArgumentParser(description="Gera a base IATA binária (core/data/iata.bin).")
+	ap.add_argument("--airports", default=str(SOURCE_DIR / "Aeroportos.txt"), help="CSV de aeroportos (formato OpenFlights)")
+	ap.add_argument("--airlines", default=str(SOURCE_DIR / "Companhias.txt"), help="CSV de companhias (formato OpenFlights)")
+	ap.add_argument("--version", default="openflights-2025", help="rótulo da versão dos dados (até 16 caracteres ASCII)")
+	ap.add_argument("--out", default=str(DEFAULT_PATH))
+	args = ap.parse_args(argv)
+
+	airports = load_airports(Path(args.airports))
+	airlines = load_airlines(Path(args.airlines))
+	data = build(airports, airlines, args.version)
+	Path(args.out).write_bytes(data)
+	print(f"{args.out}: {len(airports)} aeroportos, {len(airlines)} companhias, {len(data) / 1024:.0f} KiB")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+	sys.path.insert(0, str(ROOT))
+
+from pdf.generator import precompile_templates
+
+
+def main() -> None:
+	# Executar antes do PyInstaller: gera templates/_compiled (carregado no executável)
+	target = sys.argv[1] if len(sys.argv) > 1 else None
+	out = precompile_templates("templates", target)
+	print(f"templates compilados em: {out}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,44 @@
+"""Stand-in do binário pnrsh para testes (modo único e modo --serve).
+
+Linhas especiais: "CRASH" encerra o processo; "SLEEP" demora 5s para responder.
+FAKE_PNRSH_NO_SERVE recusa --serve; FAKE_PNRSH_IGNORE_SERVE ignora a opção e fica
+lendo o stdin até o EOF, como um binário antigo.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from core.parser.itinerary_decoder import decode_lines
+
+
+def _decode(lines):
+	if "CRASH" in lines:
+		sys.exit(3)
+	if "SLEEP" in lines:
+		time.sleep(5)
+	data = decode_lines(lines) or {}
+	data["source"] = "fake-pnrsh"
+	data["pid"] = os.getpid()
+	return data
+
+
+def main() -> None:
+	if "--serve" in sys.argv[1:] and not os.environ.get("FAKE_PNRSH_IGNORE_SERVE"):
+		if os.environ.get("FAKE_PNRSH_NO_SERVE"):
+			print("usage: pnrsh [file]")
+			sys.exit(2)
+		for raw in sys.stdin:
+			req = json.loads(raw)
+			if req.get("hello"):
+				print(json.dumps({"id": req["id"], "serve": 1}), flush=True)
+				continue
+			print(json.dumps({"id": req["id"], "result": _decode(req["lines"])}), flush=True)
+		return
+	print(json.dumps(_decode(sys.stdin.read().splitlines())))
+
+
+if __name__ == "__main__":
+	main()
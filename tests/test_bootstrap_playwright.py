@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+
+from ui import bootstrap_playwright as bp
+
+
+@pytest.fixture
+def browsers(tmp_path, monkeypatch):
+	base = tmp_path / "pw"
+	rel = bp._EXECUTABLES.get(sys.platform, bp._EXECUTABLES_DEFAULT)[0]
+	for rev in ("1134", "1169"):
+		exe = base / f"chromium-{rev}" / rel
+		exe.parent.mkdir(parents=True)
+		exe.write_bytes(b"")
+	monkeypatch.setattr(bp, "_configure_playwright_browsers_path", lambda: None)
+	monkeypatch.setenv("PLAYWRIGHT_BROWSERS_PATH", str(base))
+	monkeypatch.setenv("SETEMARES_PW_STAMP", str(tmp_path / "stamp.json"))
+	return base / "chromium-1169" / rel
+
+
+def test_probe_finds_newest_revision_without_stamp(browsers):
+	probe = bp.probe_chromium()
+	assert probe.executable == browsers
+	assert probe.version.endswith("/chromium-1169")
+	assert not probe.stamped
+
+
+def test_stamp_is_invalidated_when_executable_changes(browsers):
+	bp.write_stamp(bp.probe_chromium())
+	assert bp.probe_chromium().stamped
+	st = browsers.stat()
+	os.utime(browsers, (st.st_atime, st.st_mtime + 10))
+	assert not bp.probe_chromium().stamped
+
+
+def test_stamped_probe_skips_synchronous_launch(browsers, monkeypatch):
+	bp.write_stamp(bp.probe_chromium())
+	launched, confirmed = [], []
+	monkeypatch.setattr(bp, "_launch_with_renderer", lambda timeout: launched.append(1) or True)
+	monkeypatch.setattr(bp, "_confirm_in_background", lambda: confirmed.append(1))
+	assert bp.ensure_playwright_chromium(allow_install=False)
+	assert launched == [] and confirmed == [1]
+
+
+def test_successful_launch_writes_stamp_and_failure_clears_it(browsers, monkeypatch):
+	monkeypatch.setattr(bp, "_launch_with_renderer", lambda timeout: True)
+	assert bp.ensure_playwright_chromium(allow_install=False)
+	assert bp.probe_chromium().stamped
+	monkeypatch.setattr(bp, "_launch_with_renderer", lambda timeout: False)
+	browsers.unlink()  # carimbo sem executável não vale
+	assert not bp.ensure_playwright_chromium(allow_install=False)
+	assert not os.path.exists(os.environ["SETEMARES_PW_STAMP"])
+
+
+def test_missing_executable_installs_before_launching(tmp_path, monkeypatch):
+	monkeypatch.setattr(bp, "_configure_playwright_browsers_path", lambda: None)
+	monkeypatch.setenv("PLAYWRIGHT_BROWSERS_PATH", str(tmp_path / "vazio"))
+	monkeypatch.setenv("SETEMARES_PW_STAMP", str(tmp_path / "stamp.json"))
+	calls = []
+	monkeypatch.setattr(bp, "_launch_with_renderer", lambda timeout: calls.append("launch") or True)
+	monkeypatch.setattr(bp, "_run", lambda cmd: calls.append("install") or 0)
+	assert bp.ensure_playwright_chromium(verbose=False, allow_install=True)
+	assert calls == ["install", "launch"]
+
+
+def test_stamp_lives_in_app_dir_not_cwd(tmp_path, monkeypatch):
+	monkeypatch.delenv("SETEMARES_PW_STAMP", raising=False)
+	monkeypatch.chdir(tmp_path)
+	root = bp._stamp_path().parents[1]
+	assert root == bp._app_dir() == bp.Path(bp.__file__).resolve().parents[1]
+	monkeypatch.setattr(sys, "frozen", True, raising=False)
+	monkeypatch.setattr(sys, "executable", str(tmp_path / "app" / "Setemares.exe"))
+	assert bp._stamp_path() == (tmp_path / "app" / "logs" / "playwright_ok.json").resolve()
@@ -0,0 +1,28 @@
+import io
+import json
+
+from cli.bulk import expand_inputs, iter_records, write_records
+
+
+def test_bulk_parses_data_dir_in_process_pool():
+	files = expand_inputs(["data"])
+	assert len(files) >= 9
+	serial = list(iter_records(files, workers=1))
+	pooled = list(iter_records(files, workers=2, chunksize=3))
+	assert pooled == serial
+	rec = next(r for r in serial if r["file"].endswith("pnr_multitrecho_overnight_01.txt"))
+	assert rec["fee"] == "50.00"
+	assert len(rec["flights"]) == 4
+
+
+def test_bulk_writes_jsonl_and_csv():
+	records = list(iter_records(expand_inputs(["data/pnr_A_fee.txt", "data/pnr_A_fee.txt"]), workers=1))
+	assert len(records) == 1
+	out = io.StringIO()
+	assert write_records(records, out, "jsonl") == 1
+	assert json.loads(out.getvalue())["tarifa"] == "22286.00"
+	out = io.StringIO()
+	write_records(records, out, "csv")
+	header, row = out.getvalue().splitlines()[:2]
+	assert header.startswith("file,block,currency")
+	assert "ADT:22286.00+594.00" in row
@@ -0,0 +1,33 @@
+from datetime import date, datetime
+
+from core.parser.date_resolver import DateResolver, month_length
+from core.parser.itinerary_decoder import parse_segments
+
+
+def test_segments_before_issue_date_roll_into_next_year():
+	segs = parse_segments([
+		"AF 459 20DEC GRUCDG HS2 1915 #1115",
+		"AF 454 05JAN CDGGRU HS2 2330 #0615",
+	], ref=date(2026, 12, 1))
+	assert segs[0].departure == datetime(2026, 12, 20, 19, 15)
+	assert segs[1].departure == datetime(2027, 1, 5, 23, 30)
+	assert segs[1].landing == datetime(2027, 1, 6, 6, 15)
+
+
+def test_segment_earlier_than_previous_rolls_forward():
+	r = DateResolver(date(2027, 1, 1))
+	first = r.resolve(12, 28)
+	assert first == date(2027, 12, 28)
+	assert r.resolve(1, 3, after=first) == date(2028, 1, 3)
+	# o cache por (mês, dia) não é afetado pelo ``after``
+	assert r.resolve(1, 3) == date(2027, 1, 3)
+
+
+def test_month_lengths_and_leap_days():
+	r = DateResolver(date(2026, 3, 1))
+	assert r.resolve(4, 31) is None and r.resolve(2, 30) is None
+	assert r.resolve(2, 29) == date(2028, 2, 29)
+	assert month_length(2100, 2) == 28 and month_length(2000, 2) == 29
+	# dia inexistente no trecho: fallback no dia 1 do mês
+	seg = parse_segments(["AF 459 31APR GRUCDG HS2 1915 1115"], ref=date(2026, 3, 1))[0]
+	assert seg.departure == datetime(2026, 4, 1, 0, 0)
@@ -0,0 +1,88 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from core.parser import decode_cache, pnrsh_adapter
+from core.parser.decode_cache import DecodeCache, decode_itinerary, normalize_key
+from core.parser.itinerary_decoder import decode
+from core.parser.pnrsh_adapter import PnrshPool
+
+LINES = ["AF 459 14APR GRUCDG HS2 1915 #1115"]
+FAKE_PNRSH = [sys.executable, str(Path(__file__).parent / "fakes" / "fake_pnrsh.py")]
+
+
+def _counting(decoder):
+	calls = []
+
+	def wrapped(lines):
+		calls.append(list(lines))
+		return decoder(lines)
+
+	return wrapped, calls
+
+
+def test_normalized_lines_share_one_entry():
+	cache = DecodeCache()
+	decoder, calls = _counting(decode)
+	a = cache.get_or_decode(LINES, decoder)
+	b = cache.get_or_decode(["  af  459 14apr   GRUCDG HS2 1915 #1115 ", ""], decoder)
+	assert a is b and len(calls) == 1
+	assert a.first.carrier.iata == "AF" and a.route == "GRU–CDG"
+	assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+	assert normalize_key(["x  y", " "]) == ("X Y",)
+
+
+def test_lru_eviction_and_negative_results():
+	cache = DecodeCache(maxsize=2)
+	decoder, calls = _counting(lambda lines: None)
+	for key in (["A"], ["B"], ["A"], ["C"], ["B"]):
+		cache.get_or_decode(key, decoder)
+	# "B" foi o menos usado quando "C" entrou, então é decodificado de novo
+	assert [c[0] for c in calls] == ["A", "B", "C", "B"]
+	assert len(cache) == 2
+
+
+def test_persistence_roundtrip(tmp_path):
+	path = tmp_path / "decode_cache.json"
+	cache = DecodeCache(path=str(path))
+	cache.get_or_decode(LINES, decode)
+	cache.save()
+	again = DecodeCache(path=str(path))
+	decoder, calls = _counting(decode)
+	assert again.get_or_decode(LINES, decoder) == cache.get_or_decode(LINES, decode)
+	assert calls == []
+
+
+def test_failed_decode_is_retried_and_not_persisted(tmp_path):
+	path = tmp_path / "decode_cache.json"
+	cache = DecodeCache(path=str(path))
+	attempts = []
+
+	def flaky(lines):
+		attempts.append(1)
+		if len(attempts) == 1:
+			raise TimeoutError("pnrsh não respondeu")
+		return decode(lines)
+
+	with pytest.raises(TimeoutError):
+		cache.get_or_decode(LINES, flaky)
+	cache.save()
+	assert len(cache) == 0 and not path.exists()
+	assert cache.get_or_decode(LINES, flaky).route == "GRU–CDG"
+	assert len(attempts) == 2
+
+
+def test_pnrsh_timeout_is_not_cached(monkeypatch):
+	cache = DecodeCache()
+	pool = PnrshPool(FAKE_PNRSH, size=1, timeout=0.5)
+	monkeypatch.setattr(decode_cache, "_CACHE", cache)
+	monkeypatch.setattr(pnrsh_adapter, "_POOL", pool)
+	try:
+		# o decoder interno não reconhece a linha; o pnrsh falso demora 5s (timeout)
+		assert decode_itinerary(["SLEEP"]) is None
+		assert len(cache) == 0
+		assert decode_itinerary(["SLEEP"]) is None
+		assert cache.stats()["misses"] == 2
+	finally:
+		pool.close()
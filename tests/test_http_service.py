@@ -0,0 +1,180 @@
+import asyncio
+import json
+import threading
+from decimal import Decimal
+
+import pytest
+
+from pdf import http_service
+from pdf.http_service import QuoteOptions, QuoteService, job_from_pnr
+from pdf.payload import LOGO_PATH
+
+PNR = """AF 459 14APR GRUCDG HS2 1915 #1115
+AF 454 07MAY CDGGRU HS2 2330 #615
+Tarifa USD 1000,00 + Txs USD 250,00
+"""
+
+
+async def _request(port: int, method: str, path: str, body: bytes = b"", content_type: str = "text/plain", origin: str = ""):
+	reader, writer = await asyncio.open_connection("127.0.0.1", port)
+	extra = f"Origin: {origin}\r\n" if origin else ""
+	head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n{extra}Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n"
+	writer.write(head.encode("latin-1") + body)
+	await writer.drain()
+	raw = await reader.read()
+	writer.close()
+	head, _, payload = raw.partition(b"\r\n\r\n")
+	lines = head.decode("latin-1").split("\r\n")
+	headers = dict(line.split(": ", 1) for line in lines[1:])
+	return int(lines[0].split()[1]), headers, payload
+
+
+def _serve(concurrency=2, queue_size=8, allow_origin=None):
+	async def _run(scenario):
+		service = QuoteService(concurrency, queue_size, allow_origin=allow_origin)
+		await service.start(port=0, warm_up=False)
+		try:
+			return await scenario(service)
+		finally:
+			await service.close()
+	return _run
+
+
+@pytest.fixture
+def fake_pdf(monkeypatch):
+	jobs = []
+
+	async def _fake(job, template_dir="templates"):
+		jobs.append(job)
+		return b"%PDF-1.4 fake"
+
+	monkeypatch.setattr(http_service, "render_job_bytes", _fake)
+	return jobs
+
+
+def test_pnr_builds_same_payload_fields_as_desktop():
+	job = job_from_pnr(PNR, QuoteOptions(rav_percent=10, family_name="Silva"))
+	assert job.template == "quote.html"
+	data = job.data
+	# 1000 + 250 + RAV 10% (100)
+	assert data["total"] == Decimal("1350.00")
+	assert data["fare_details"] == [{"label": "Adulto", "total": Decimal("1350.00")}]
+	assert data["decoded"].route == "GRU–CDG–GRU"
+	assert data["multa_text"].startswith("USD 100.00")
+	assert data["family_name"] == "Silva" and data["saida_label"] == "14/04"
+
+
+def test_post_pnr_returns_pdf_bytes(fake_pdf):
+	async def scenario(service):
+		status, headers, body = await _request(service.port, "POST", "/pdf", PNR.encode("utf-8"))
+		health = await _request(service.port, "GET", "/health")
+		return status, headers, body, json.loads(health[2])
+
+	status, headers, body, health = asyncio.run(_serve()(scenario))
+	assert status == 200 and body == b"%PDF-1.4 fake"
+	assert headers["Content-Type"] == "application/pdf"
+	assert headers["Content-Length"] == str(len(body))
+	assert health["ok"] and health["in_flight"] == 0
+	assert fake_pdf[0].data["cia"]
+
+
+def test_post_json_payload_and_errors(fake_pdf):
+	async def scenario(service):
+		ok = await _request(service.port, "POST", "/pdf", json.dumps({"data": {"cia": "Air France"}}).encode(), "application/json")
+		bad_json = await _request(service.port, "POST", "/pdf", b"{", "application/json")
+		file_ref = await _request(service.port, "POST", "/pdf", json.dumps({"pnr": PNR, "options": {"family_name": "file:///etc/passwd"}}).encode(), "application/json")
+		bad_template = await _request(service.port, "POST", "/pdf", json.dumps({"data": {}, "template": "../x.html"}).encode(), "application/json")
+		missing = await _request(service.port, "GET", "/nada")
+		return ok, bad_json, file_ref, bad_template, missing
+
+	ok, bad_json, file_ref, bad_template, missing = asyncio.run(_serve()(scenario))
+	assert ok[0] == 200 and fake_pdf[0].data["cia"] == "Air France"
+	assert [r[0] for r in (bad_json, file_ref, bad_template, missing)] == [400, 400, 400, 404]
+	assert json.loads(file_ref[2])["error"] is True
+
+
+def test_full_queue_sheds_load_with_429(monkeypatch):
+	release = None
+
+	async def _slow(job, template_dir="templates"):
+		await release.wait()
+		return b"%PDF"
+
+	monkeypatch.setattr(http_service, "render_job_bytes", _slow)
+
+	async def scenario(service):
+		nonlocal release
+		release = asyncio.Event()
+		first = asyncio.create_task(_request(service.port, "POST", "/pdf", PNR.encode()))
+		second = asyncio.create_task(_request(service.port, "POST", "/pdf", PNR.encode()))
+		while service.in_flight < 2:
+			await asyncio.sleep(0.01)
+		third = await _request(service.port, "POST", "/pdf", PNR.encode())
+		release.set()
+		return [(await first)[0], (await second)[0]], third, service.rejected
+
+	done, third, rejected = asyncio.run(_serve(concurrency=1, queue_size=1)(scenario))
+	assert done == [200, 200]
+	assert third[0] == 429 and third[1]["Retry-After"] == "1"
+	assert rejected == 1
+
+
+def test_slow_pnr_parsing_does_not_block_the_loop(monkeypatch, fake_pdf):
+	parsing, release, parsed = threading.Event(), threading.Event(), threading.Event()
+	build = http_service.job_from_request
+
+	def _slow(content_type, body):
+		# como um pnrsh lento: bloqueia a thread que monta o job
+		parsing.set()
+		release.wait(10)
+		parsed.set()
+		return build(content_type, body)
+
+	monkeypatch.setattr(http_service, "job_from_request", _slow)
+
+	async def scenario(service):
+		pdf = asyncio.create_task(_request(service.port, "POST", "/pdf", PNR.encode()))
+		while not parsing.is_set():
+			await asyncio.sleep(0.01)
+		health = await asyncio.wait_for(_request(service.port, "GET", "/health"), 5)
+		answered_while_parsing = not parsed.is_set()
+		release.set()
+		return health[0], answered_while_parsing, (await pdf)[0]
+
+	try:
+		assert asyncio.run(_serve()(scenario)) == (200, True, 200)
+	finally:
+		release.set()
+
+
+def test_only_configured_origin_gets_cors(fake_pdf):
+	async def scenario(service):
+		plain = await _request(service.port, "GET", "/health")
+		allowed = await _request(service.port, "GET", "/health", origin="http://localhost:3000")
+		foreign = await _request(service.port, "POST", "/pdf", PNR.encode(), origin="https://evil.example")
+		preflight = await _request(service.port, "OPTIONS", "/pdf", origin="https://evil.example")
+		return plain, allowed, foreign, preflight
+
+	plain, allowed, foreign, preflight = asyncio.run(_serve(allow_origin="http://localhost:3000")(scenario))
+	assert plain[0] == 200 and "Access-Control-Allow-Origin" not in plain[1]
+	assert allowed[0] == 200 and allowed[1]["Access-Control-Allow-Origin"] == "http://localhost:3000"
+	assert foreign[0] == 403 and preflight[0] == 403
+	assert "Access-Control-Allow-Origin" not in foreign[1]
+	# a requisição recusada não chegou a renderizar
+	assert fake_pdf == []
+
+
+def test_client_logo_is_replaced_by_server_logo(fake_pdf):
+	payload = {
+		"data": {"logo_src": "http://169.254.169.254/latest", "quotes": [{"logo_src": "https://x.example/a.png"}]},
+		"template": "multi_quote.html",
+	}
+
+	async def scenario(service):
+		return await _request(service.port, "POST", "/pdf", json.dumps(payload).encode(), "application/json")
+
+	assert asyncio.run(_serve()(scenario))[0] == 200
+	data = fake_pdf[0].data
+	logos = {data["logo_src"], data["quotes"][0]["logo_src"]}
+	assert len(logos) == 1 and not any("http" in logo for logo in logos)
+	assert logos <= {"", LOGO_PATH.as_uri()}
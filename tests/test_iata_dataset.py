@@ -0,0 +1,46 @@
+from core.data.airlines import get_airline_name
+from core.data.airports import get_airport, get_airport_description, get_timezone
+from core.data.iata import IataDataset, airline_slot, airport_slot
+
+
+def test_bundled_dataset_covers_codes_outside_curated_tables():
+	assert get_airport_description("NRT") == "Narita International Airport (NRT), Tokyo, Japan"
+	assert get_timezone("nrt") == "Asia/Tokyo"
+	assert get_airline_name("EK") == "Emirates"
+	# revisados à mão continuam valendo (inclusive códigos IATA reaproveitados)
+	assert get_airport_description("GRU").startswith("Guarulhos International Airport")
+	assert get_airport("GRU").tz == "America/Sao_Paulo"
+	assert get_airline_name("G3") == "Gol Linhas Aéreas"
+	assert get_airport_description("ZZZ") == "ZZZ" and get_airline_name("??") == "??"
+
+
+def test_build_and_lookup_roundtrip(tmp_path):
+	from scripts.build_iata_dataset import build, load_airlines, load_airports
+	airports = tmp_path / "airports.dat"
+	airports.write_text(
+		'1,"Alpha Field","Alphaville","Brazil","AAA","SAAA",0,0,0,-3,"S","America/Sao_Paulo","airport","X"\n'
+		'2,"No Code","Nowhere","Brazil",\\N,"SNNN",0,0,0,-3,"S",\\N,"airport","X"\n',
+		encoding="utf-8",
+	)
+	airlines = tmp_path / "airlines.dat"
+	airlines.write_text(
+		'10,"Old Air",\\N,"Z9","OLD","",Brazil,"N"\n'
+		'11,"New Air",\\N,"Z9","NEW","",Brazil,"Y"\n',
+		encoding="utf-8",
+	)
+	out = tmp_path / "iata.bin"
+	out.write_bytes(build(load_airports(airports), load_airlines(airlines), "test-1"))
+	ds = IataDataset(out)
+	try:
+		assert ds.version == "test-1" and ds.airport_count == 1 and ds.airline_count == 1
+		assert ds.airport("aaa").city == "Alphaville" and ds.airport("AAA").utc_offset == "-3"
+		assert ds.airline("Z9").name == "New Air"
+		assert ds.airport("AAB") is None and ds.airport("A1") is None
+	finally:
+		ds.close()
+
+
+def test_slots_are_direct_addressed():
+	assert airport_slot("AAA") == 0 and airport_slot("ZZZ") == 26 ** 3 - 1
+	assert airline_slot("00") == 0 and airline_slot("ZZ") == 36 ** 2 - 1
+	assert airport_slot("GR1") == -1 and airline_slot("G") == -1
@@ -0,0 +1,63 @@
+import time
+from datetime import date, datetime
+
+from core.parser import date_resolver
+from core.parser.date_resolver import DateResolver
+from core.parser.itinerary_decoder import decode_lines, parse_segments
+
+LINES = [
+	"AF 459 14APR GRUCDG HS2 1915 #1115",
+	"AF 274 18APR CDGHND HS2 2200 1830",
+	"AF 293 05MAY HNDCDG HS2 0005 0800",
+	"AF 454 07MAY CDGGRU HS2 2330 #615",
+]
+N = 10_000
+
+
+def _best_of(fn, repeat=3):
+	best = float("inf")
+	for _ in range(repeat):
+		t0 = time.perf_counter()
+		fn()
+		best = min(best, time.perf_counter() - t0)
+	return best
+
+
+def test_segments_carry_datetimes_and_lazy_strings():
+	segs = parse_segments(LINES, ref=datetime(2027, 1, 10))
+	assert segs[0].departure == datetime(2027, 4, 14, 19, 15)
+	assert segs[0].landing == datetime(2027, 4, 15, 11, 15) and segs[0].overnight
+	# sem '#', mas chegada antes da partida: dia seguinte
+	assert segs[1].landing == datetime(2027, 4, 19, 18, 30) and not segs[1].overnight
+	assert segs[3].landing_time == "2027-05-08 06:15"
+	assert segs[0].to_dict()["departureTime"] == "2027-04-14 19:15"
+
+
+def test_reference_date_read_once_per_call(monkeypatch):
+	calls = []
+
+	class _Today(date):
+		@classmethod
+		def today(cls):
+			calls.append(1)
+			return date(2027, 1, 10)
+
+	monkeypatch.setattr(date_resolver, "date", _Today)
+	decode_lines(LINES * 50)
+	assert len(calls) == 1
+
+
+def test_throughput_10k_segments():
+	# 2500 itinerários de 4 trechos, com o mesmo DateResolver para o lote inteiro
+	batch = [LINES] * (N // len(LINES))
+	resolver = DateResolver(date(2027, 1, 10))
+	segs_s = _best_of(lambda: [parse_segments(lines, resolver=resolver) for lines in batch])
+	dicts_s = _best_of(lambda: [decode_lines(lines, resolver=resolver) for lines in batch])
+	segs = [s for lines in batch for s in parse_segments(lines, resolver=resolver)]
+	assert len(segs) == N and {s.departure.year for s in segs} == {2027}
+	print(f"\n{N} trechos: parse_segments {N / segs_s:,.0f}/s, decode_lines {N / dicts_s:,.0f}/s")
+	# limite folgado (máquinas de CI lentas); localmente ~0.03s e ~0.07s
+	assert segs_s < 1.0
+	assert dicts_s < 2.0
+	# a formatação (dicts) é o custo extra: objetos estruturados não devem ser mais lentos
+	assert segs_s < dicts_s
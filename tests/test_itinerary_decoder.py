@@ -16,3 +16,18 @@ def test_decode_overnights_count():
 	assert f0["company"]["iataCode"] == "AF"
 	assert f0["departureAirport"]["iataCode"] == "GRU"
 	assert f0["landingAirport"]["iataCode"] == "CDG"
+
+
+def test_itinerary_model_shares_airports_and_roundtrips():
+	from core.parser.itinerary_decoder import decode
+	from core.parser.itinerary_model import Itinerary
+	itin = decode([
+		"AF 459 14APR GRUCDG HS2 1915 #1115",
+		"AF 454 07MAY CDGGRU HS2 2330 #0615",
+	])
+	assert itin.route == "GRU–CDG–GRU" and itin.overnights == 2
+	assert itin.segments[0].origin is itin.segments[1].destination
+	assert itin.segments[0].carrier is itin.segments[1].carrier
+	assert itin.segments[0].destination.place == "Paris, France"
+	assert Itinerary.from_dict(itin.to_dict()) == itin
+	assert Itinerary.from_dict({"flightInfo": {"flights": []}}) is None
@@ -0,0 +1,42 @@
+from datetime import date, datetime, timedelta
+
+from core.parser.itinerary_decoder import decode
+from pdf.generator import _duration
+
+REF = date(2027, 1, 10)
+
+
+def test_block_connection_and_journey_times():
+	itin = decode([
+		"AF 459 14APR GRUCDG HS2 1915 #1115",
+		"AF 274 15APR CDGHND HS2 1330 #0900",
+		"AF 293 05MAY HNDCDG HS2 0005 0800",
+		"AF 454 05MAY CDGGRU HS2 2330 #0615",
+	], ref=REF)
+	jt = itin.journey_times()
+	# GRU (UTC-3) -> CDG (UTC+2 em abril): 19:15 -> 11:15 do dia seguinte = 11h
+	assert jt.block_times[0] == timedelta(hours=11)
+	assert jt.block_times[1] == timedelta(hours=12, minutes=30)
+	assert jt.connections[0] == timedelta(hours=2, minutes=15)
+	assert jt.connections[1] > timedelta(days=18)
+	# ida GRU->HND e volta HND->GRU, separadas pela parada em Tóquio
+	assert len(jt.journeys) == 2
+	assert jt.journeys[0] == jt.block_times[0] + jt.connections[0] + jt.block_times[1]
+	assert itin.travel_time == sum(jt.journeys, timedelta())
+	assert jt.total == jt.journeys[0] + jt.connections[1] + jt.journeys[1]
+
+
+def test_arrival_day_uses_timezones_across_the_date_line():
+	seg = decode(["JL 784 10MAR NRTHNL Y 2100 0900"], ref=REF).first
+	# 21:00 em Tóquio é 02:00 de Honolulu no mesmo dia: chega no mesmo dia local
+	assert seg.landing == datetime(2027, 3, 10, 9, 0)
+	assert seg.block_time == timedelta(hours=7)
+	# sem '#', chegada antes da partida em UTC: dia seguinte
+	seg = decode(["LA 8084 10MAR GRULHR Y 2230 1350"], ref=REF).first
+	assert seg.landing == datetime(2027, 3, 11, 13, 50)
+
+
+def test_unknown_timezone_leaves_durations_empty():
+	itin = decode(["XX 100 10MAR GRUQQQ Y 1000 1200"], ref=REF)
+	assert itin.first.block_time is None and itin.travel_time is None
+	assert _duration(None) == "" and _duration(timedelta(hours=25, minutes=5)) == "25h05"
@@ -7,4 +7,47 @@ def test_parse_basic():
 	assert data["tarifa"] == "22286.00"
 	assert data["taxas_base"] == "594.00"
 	assert data["fee"] == "50.00"
-	assert any(t.startswith("AF 459") for t in data["trechos"])
\ No newline at end of file
+	assert any(t.startswith("AF 459") for t in data["trechos"])
+
+def test_tokenize_classifies_lines_once():
+	from cli.main import BAGGAGE, FARE, FEE, PAYMENT, PENALTY, SEGMENT, SEPARATOR, tokenize
+	text = "\n".join([
+		"tarifa usd 100.00 + txs usd 10.00 *CHD",
+		"Fee usd 5.00",
+		"  AF 459 14APR GRUCDG HS2 1915 #1115\r",
+		"Troca usd 40.00",
+		"pagto 4x",
+		"2pc 32kg",
+		"==",
+	])
+	kinds = [k for k, _ in tokenize(text)]
+	assert kinds == [FARE, FEE, SEGMENT, PENALTY, PAYMENT, BAGGAGE, SEPARATOR]
+	data = parse(text)
+	assert data["trechos"] == ["AF 459 14APR GRUCDG HS2 1915 #1115"]
+	assert data["fares"][0]["category"] == "CHD"
+	assert data["pagamento_hint"] == "4x"
+	assert data["bagagem_hint"] == "2pc 32kg"
+
+
+def test_iter_quotations_yields_each_block_as_soon_as_it_ends():
+	from cli.main import iter_quotations
+	read = []
+
+	def lines():
+		for line in [
+			"AF 459 14APR GRUCDG HS2 1915 #1115\n",
+			"tarifa usd 100.00 + txs usd 10.00\n",
+			"==\n",
+			"texto sem cotação\n",
+			"==\n",
+			"LA 3333 01JAN GRUSCL HK1 0800 1200\n",
+		]:
+			read.append(line)
+			yield line
+
+	it = iter_quotations(lines())
+	first = next(it)
+	assert first["tarifa"] == "100.00"
+	assert len(read) == 3  # só leu até o primeiro separador
+	rest = list(it)
+	assert [q["trechos"][0][:7] for q in rest] == ["LA 3333"]
@@ -0,0 +1,113 @@
+import asyncio
+import os
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from core.parser.itinerary_decoder import decode
+from pdf import generator
+from pdf.cache import PdfCache, cache_key, configure_pdf_cache
+from pdf.generator import RenderJob, TemplateRegistry, render_job
+
+LINES = ["AF 459 14APR GRUCDG HS2 1915 #1115"]
+
+
+def test_key_is_canonical_and_skips_ignored_top_level_fields():
+	itinerary = decode(LINES)
+	a = {"total": Decimal("1350.00"), "cia": "Air France", "decoded": itinerary, "pedido": "A"}
+	b = {"decoded": itinerary.to_dict(), "cia": "Air France", "total": Decimal("1350.00"), "pedido": "B"}
+	assert cache_key("quote.html", "v1", a, ignore=["pedido"]) == cache_key("quote.html", "v1", b, ignore=["pedido"])
+	assert cache_key("quote.html", "v1", a) != cache_key("quote.html", "v1", b)
+	assert cache_key("quote.html", "v1", a) != cache_key("quote.html", "v2", a)
+	assert cache_key("quote.html", "v1", a) != cache_key("quote.html", "v1", {**a, "total": Decimal("1350.01")})
+	# mesmo texto, tipo diferente: não colide
+	assert cache_key("quote.html", "v1", {"total": "1350.00"}) != cache_key("quote.html", "v1", {"total": Decimal("1350.00")})
+
+
+def test_real_quote_payload_key_ignores_only_unread_top_level_fields(tmp_path):
+	from pdf.payload import QuoteOptions, multi_payload, quote_payload
+
+	quote = {"trechos": LINES, "tarifa": "1000.00", "taxas_base": "250.00", "currency": "USD"}
+	data = quote_payload(quote, QuoteOptions(family_name="Silva"))
+	key = lambda payload, template="quote.html": generator._cache_entry(RenderJob(payload, "x.pdf", template), "templates")[1]
+	configure_pdf_cache(tmp_path)
+	try:
+		base = key(data)
+		# rota_label/classe_label só existem para o documento multi: quote.html não os lê
+		assert "rota_label" in data and key({**data, "rota_label": "outra", "classe_label": "outra"}) == base
+		# o que o template lê continua na chave
+		assert key({**data, "family_name": "Souza"}) != base
+		assert key({**data, "saida_label_full": "15 de Abril"}) != base
+		# no multi, cada cotação é lida inteira: campos aninhados nunca são descartados
+		multi = multi_payload([quote], QuoteOptions())
+		changed = {**multi, "quotes": [{**multi["quotes"][0], "classe_label": "outra"}]}
+		assert key(changed, "multi_quote.html") != key(multi, "multi_quote.html")
+	finally:
+		configure_pdf_cache(None)
+
+
+def test_file_references_follow_file_content(tmp_path):
+	logo = tmp_path / "logo.png"
+	logo.write_bytes(b"a")
+	payload = {"logo_src": logo.as_uri()}
+	before = cache_key("quote.html", "v1", payload)
+	logo.write_bytes(b"ab")
+	assert cache_key("quote.html", "v1", payload) != before
+
+
+def test_lru_eviction_and_stats(tmp_path):
+	cache = PdfCache(tmp_path, max_bytes=250)
+	for i, key in enumerate(("a", "b", "c")):
+		cache.put_bytes(key, b"x" * 100)
+		os.utime(tmp_path / f"{key}.pdf", (1000 + i, 1000 + i))
+	# "a" foi removido ao entrar "c" (300 > 250); ler "b" o torna o mais recente
+	assert cache.get_bytes("a") is None
+	assert cache.get_bytes("b") == b"x" * 100
+	cache.put_bytes("d", b"y" * 100)
+	assert sorted(p.stem for p in tmp_path.glob("*.pdf")) == ["b", "d"]
+	stats = cache.stats()
+	assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (1, 1, 2, 2)
+	assert stats["hit_rate"] == 0.5
+	# entradas existentes são encontradas por um novo processo
+	assert PdfCache(tmp_path).get_bytes("d") == b"y" * 100
+
+
+def test_template_version_tracks_template_and_stylesheet(tmp_path):
+	(tmp_path / "quote.html").write_text('<link rel="stylesheet" href="style.css">{% include "_part.html" %}', encoding="utf-8")
+	(tmp_path / "_part.html").write_text("parte", encoding="utf-8")
+	css = tmp_path / "style.css"
+	css.write_text("body{}", encoding="utf-8")
+	registry = TemplateRegistry(auto_reload=True)
+	v1 = registry.version(str(tmp_path), "quote.html")
+	assert registry.version(str(tmp_path), "quote.html") == v1
+	css.write_text("body{color:red}", encoding="utf-8")
+	v2 = registry.version(str(tmp_path), "quote.html")
+	(tmp_path / "_part.html").write_text("parte nova", encoding="utf-8")
+	assert len({v1, v2, registry.version(str(tmp_path), "quote.html")}) == 3
+
+
+@pytest.fixture
+def fake_print(monkeypatch):
+	printed = []
+
+	async def _fake(html, template_root, out_pdf):
+		printed.append(out_pdf)
+		Path(out_pdf).write_bytes(b"%PDF " + str(len(printed)).encode())
+
+	monkeypatch.setattr(generator, "_print_html", _fake)
+	return printed
+
+
+def test_render_job_reuses_cached_pdf(tmp_path, fake_print):
+	cache = configure_pdf_cache(tmp_path / "cache")
+	try:
+		data = {"cia": "Air France", "decoded": decode(LINES), "total": Decimal("10.00")}
+		asyncio.run(render_job(RenderJob(data, str(tmp_path / "a.pdf"))))
+		asyncio.run(render_job(RenderJob(dict(data), str(tmp_path / "b.pdf"))))
+		asyncio.run(render_job(RenderJob({**data, "total": Decimal("11.00")}, str(tmp_path / "c.pdf"))))
+	finally:
+		configure_pdf_cache(None)
+	assert fake_print == [str(tmp_path / "a.pdf"), str(tmp_path / "c.pdf")]
+	assert (tmp_path / "b.pdf").read_bytes() == (tmp_path / "a.pdf").read_bytes()
+	assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
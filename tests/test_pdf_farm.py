@@ -0,0 +1,50 @@
+import os
+
+from pdf.farm import FarmStats, render_farm
+from pdf.generator import RenderJob
+
+
+def test_farm_recycles_workers_and_streams_results(tmp_path):
+	consumed = []
+
+	def jobs():
+		# template inexistente: falha no Jinja, antes de abrir o navegador
+		for i in range(9):
+			consumed.append(i)
+			yield RenderJob({"cia": "AF"}, str(tmp_path / f"{i}.pdf"), template="inexistente.html")
+
+	stats = FarmStats()
+	results = []
+	for r in render_farm(jobs(), workers=2, concurrency=2, max_jobs_per_worker=2, stats=stats):
+		if not results:
+			# entrada lida sob demanda: no máximo uma página de cada worker à frente
+			assert len(consumed) <= 4
+		results.append(r)
+
+	assert sorted(r.index for r in results) == list(range(9))
+	assert all(not r.ok and "inexistente.html" in r.error for r in results)
+	# 2 jobs por processo: 9 jobs precisam de ao menos 5 processos
+	assert sum(w.generation for w in stats.per_worker.values()) >= 5
+	assert stats.recycled >= 3 and stats.crashed == 0
+	assert stats.jobs == stats.failed == 9
+	assert sum(w.jobs for w in stats.per_worker.values()) == 9
+	report = stats.as_dict()
+	assert report["throughput"] > 0 and set(report["per_worker"]) == {0, 1}
+
+
+class _KillsWorker:
+	"""Ao ser desserializado no worker, encerra o processo (simula crash do Chromium/Python)."""
+
+	def __reduce__(self):
+		return os._exit, (3,)
+
+
+def test_crashed_worker_fails_only_its_job(tmp_path):
+	jobs = [RenderJob({"cia": "AF"}, str(tmp_path / f"{i}.pdf"), template="inexistente.html") for i in range(4)]
+	jobs[1] = RenderJob({"bomba": _KillsWorker()}, str(tmp_path / "1.pdf"))
+	stats = FarmStats()
+	results = {r.index: r for r in render_farm(jobs, workers=1, concurrency=1, max_jobs_per_worker=0, stats=stats)}
+	assert sorted(results) == [0, 1, 2, 3]
+	assert "encerrou inesperadamente (código 3)" in results[1].error
+	assert all("inexistente.html" in results[i].error for i in (0, 2, 3))
+	assert stats.crashed == 1 and stats.per_worker[0].generation == 2
@@ -0,0 +1,97 @@
+from pdf.generator import _inline_assets
+
+
+def test_inline_assets_embeds_css_and_logo(tmp_path):
+	root = tmp_path / "templates"
+	root.mkdir()
+	(tmp_path / "assets").mkdir()
+	(tmp_path / "assets" / "styles.css").write_text("body{color:red}", encoding="utf-8")
+	logo = tmp_path / "Logo.png"
+	logo.write_bytes(b"\x89PNG\r\n")
+	html = (
+		'<link rel="stylesheet" href="../assets/styles.css">'
+		f'<img src="{logo.as_uri()}"/>'
+		'<link rel="stylesheet" href="missing.css">'
+	)
+	out = _inline_assets(html, root)
+	assert "<style>body{color:red}</style>" in out
+	assert 'src="data:image/png;base64,' in out
+	assert "file://" not in out
+	# referência inexistente fica intacta
+	assert 'href="missing.css"' in out
+
+
+def test_template_registry_compiles_once():
+	from pdf.generator import TemplateRegistry
+	reg = TemplateRegistry()
+	t1, root1 = reg.get_template("templates", "quote.html")
+	t2, root2 = reg.get_template("templates", "quote.html")
+	assert t1 is t2 and root1 == root2
+	assert "airport_name" in reg.environment(root1).filters
+
+
+def test_precompiled_templates_render_same_html(tmp_path):
+	from pdf.generator import COMPILED_DIRNAME, TemplateRegistry, precompile_templates
+	root = tmp_path / "templates"
+	root.mkdir()
+	(root / "quote.html").write_text("<h1>{{ cia }}</h1>{{ 'GRU' | airport_name }}", encoding="utf-8")
+	precompile_templates(str(root))
+	assert any((root / COMPILED_DIRNAME).glob("*.py"))
+	dev = TemplateRegistry(auto_reload=True)
+	frozen = TemplateRegistry(auto_reload=False)
+	data = {"cia": "Air France"}
+	html_dev = dev.get_template(str(root), "quote.html")[0].render(**data)
+	tpl_frozen = frozen.get_template(str(root), "quote.html")[0]
+	assert COMPILED_DIRNAME in tpl_frozen.filename
+	assert tpl_frozen.render(**data) == html_dev
+
+
+def test_render_batch_reports_errors_per_item(tmp_path):
+	import asyncio
+	from pdf.generator import RenderJob, render_batch
+
+	jobs = [RenderJob({"cia": "AF"}, str(tmp_path / f"{i}.pdf"), template="inexistente.html") for i in range(5)]
+
+	async def _collect():
+		return [r async for r in render_batch(jobs, concurrency=2)]
+
+	results = asyncio.run(_collect())
+	assert sorted(r.index for r in results) == list(range(5))
+	assert all(not r.ok and r.error for r in results)
+
+
+def test_quote_template_formats_decimal_totals():
+	from decimal import Decimal
+	from core.rules.pricing import price
+	from pdf.generator import TemplateRegistry
+	totals = price("22286.00", "594.00", 10, "50.00")
+	tpl, _ = TemplateRegistry().get_template("templates", "quote.html")
+	html = tpl.render(fare_details=[{"label": "Adulto", "total": totals.total}, {"label": "Infantil", "total": Decimal("10")}], grand_total=totals.total + 10, currency="USD")
+	assert "USD 25158.60" in html and "USD 10.00" in html and "TOTAL USD 25168.60" in html
+	assert "TOTAL USD " in TemplateRegistry().get_template("templates", "quote.html")[0].render()
+
+
+def test_templates_render_itinerary_model_and_legacy_dicts():
+	from datetime import datetime
+	from core.parser.itinerary_decoder import decode
+	from pdf.generator import TemplateRegistry, _with_itineraries
+	itin = decode(["AF 459 14APR GRUCDG HS2 1915 #1115"], ref=datetime(2027, 1, 10))
+	tpl, _ = TemplateRegistry().get_template("templates", "quote.html")
+	html = tpl.render(**_with_itineraries({"decoded": itin}))
+	assert "AF-459" in html and "2027-04-14 19:15" in html and "2027-04-15 11:15" in html
+	assert tpl.render(**_with_itineraries({"decoded": itin.to_dict()})) == html
+	multi, _ = TemplateRegistry().get_template("templates", "multi_quote.html")
+	data = _with_itineraries({"quotes": [{"decoded": itin.to_dict()}], "summary": {}})
+	assert "AF-459" in multi.render(**data)
+
+
+def test_batch_from_stdin_leaves_stdin_open(monkeypatch, tmp_path):
+	import io
+	import sys
+	from pdf.generator import _load_batch_jobs
+
+	stdin = io.StringIO('{"cia": "AF"}\n\n{"data": {"cia": "LA"}, "template": "quote.html"}\n')
+	monkeypatch.setattr(sys, "stdin", stdin)
+	jobs = list(_load_batch_jobs("-", tmp_path))
+	assert [j.data["cia"] for j in jobs] == ["AF", "LA"]
+	assert not stdin.closed
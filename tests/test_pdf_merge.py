@@ -0,0 +1,182 @@
+import asyncio
+import re
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from pdf import generator
+from pdf.cache import configure_pdf_cache
+from pdf.generator import RenderJob, render_job
+from pdf.merge import UnsupportedPdf, merge_pdfs
+
+# bytes que não podem ser reescritos dentro de um stream
+BINARY = b"\x00\xff(7 0 R) endobj \x80"
+
+
+def tiny_pdf(marker: str, pages: int = 1) -> bytes:
+	"""PDF mínimo no formato do Chromium: xref clássica, /Length indireto, stream binário."""
+	objs = {
+		1: b"<< /Type /Catalog /Pages 2 0 R >>",
+		2: b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % (10 + i) for i in range(pages)), pages),
+		3: b"<< /Producer (Skia/PDF 2 0 R) >>",
+	}
+	for i in range(pages):
+		content = b"BT (%s:%d) Tj ET %% " % (marker.encode(), i) + BINARY
+		objs[10 + i] = b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R >>" % (20 + i)
+		objs[20 + i] = b"<< /Length %d 0 R >>\nstream\n%s\nendstream" % (30 + i, content)
+		objs[30 + i] = b"%d" % len(content)
+	out = bytearray(b"%PDF-1.4\n")
+	offsets = {}
+	for num in sorted(objs):
+		offsets[num] = len(out)
+		out += b"%d 0 obj\n%s\nendobj\n" % (num, objs[num])
+	size = max(objs) + 1
+	xref = len(out)
+	out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+	for num in range(1, size):
+		out += b"%010d 00000 n \n" % offsets[num] if num in offsets else b"0000000000 65535 f \n"
+	out += b"trailer\n<< /Size %d /Root 1 0 R /Info 3 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+	return bytes(out)
+
+
+def page_markers(pdf: bytes) -> list:
+	return re.findall(rb"BT \(([^)]*)\) Tj", pdf)
+
+
+def test_merge_keeps_page_order_and_stream_bytes(tmp_path):
+	paths = []
+	for name, pages in (("a", 1), ("b", 2), ("c", 1)):
+		paths.append(tmp_path / f"{name}.pdf")
+		paths[-1].write_bytes(tiny_pdf(name, pages))
+	out = tmp_path / "out.pdf"
+	assert merge_pdfs(paths, out) == 4
+	data = out.read_bytes()
+	assert page_markers(data) == [b"a:0", b"b:0", b"b:1", b"c:0"]
+	# streams copiados intactos; referências do dicionário renumeradas; literais preservados
+	assert data.count(BINARY) == 4
+	assert b"(Skia/PDF 2 0 R)" in data
+	assert data.count(b"/Type /Catalog") == 1
+	assert re.search(rb"2 0 obj\n<< /Type /Pages /Kids \[(\d+ 0 R ?){3}\] /Count 4 >>", data)
+
+
+def test_merged_xref_points_at_every_object(tmp_path):
+	(tmp_path / "a.pdf").write_bytes(tiny_pdf("a", 2))
+	out = tmp_path / "out.pdf"
+	merge_pdfs([tmp_path / "a.pdf", tmp_path / "a.pdf"], out)
+	data = out.read_bytes()
+	xref_at = int(re.search(rb"startxref\n(\d+)", data).group(1))
+	entries = re.findall(rb"(\d{10}) 00000 n", data[xref_at:])
+	assert entries
+	for offset in entries:
+		assert re.match(rb"\d+ 0 obj", data[int(offset):int(offset) + 12])
+	# /Length indireto acompanha a renumeração
+	for m in re.finditer(rb"/Length (\d+) 0 R", data):
+		assert re.search(rb"\n%s 0 obj\n\d+\nendobj" % m.group(1), data)
+
+
+def test_xref_stream_is_rejected(tmp_path):
+	bad = tmp_path / "bad.pdf"
+	bad.write_bytes(b"%PDF-1.5\n1 0 obj\n<< /Type /XRef >>\nendobj\nstartxref\n9\n%%EOF\n")
+	with pytest.raises(UnsupportedPdf):
+		merge_pdfs([bad], tmp_path / "out.pdf")
+
+
+@pytest.fixture
+def fake_print(monkeypatch):
+	printed = []
+
+	async def _fake(html, template_root, out_pdf):
+		title = re.search(r"<h1>(.*?)</h1>", html)
+		marker = title.group(1).strip() if title else "RESUMO"
+		printed.append(marker)
+		Path(out_pdf).write_bytes(tiny_pdf(marker))
+
+	monkeypatch.setattr(generator, "_print_html", _fake)
+	monkeypatch.setattr(generator, "_MERGE_UNSUPPORTED", False)
+	return printed
+
+
+def _multi(bagagem_q2: str) -> dict:
+	quotes = [
+		{"rota_label": f"ROTA{i}", "cia": "Air France", "total": Decimal("100.00"), "bagagem": bagagem_q2 if i == 2 else "1 peça"}
+		for i in (1, 2, 3)
+	]
+	summary = {"rows": [{"id": f"Q0{i}", "rota": f"ROTA{i}", "total": Decimal("100.00")} for i in (1, 2, 3)], "soma": Decimal("300.00")}
+	return {"quotes": quotes, "summary": summary}
+
+
+def test_only_changed_quote_is_rendered_again(tmp_path, fake_print):
+	configure_pdf_cache(tmp_path / "cache")
+	try:
+		first, second = tmp_path / "v1.pdf", tmp_path / "v2.pdf"
+		asyncio.run(render_job(RenderJob(_multi("1 peça"), str(first), "multi_quote.html")))
+		assert sorted(fake_print) == ["COTAÇÃO ROTA1", "COTAÇÃO ROTA2", "COTAÇÃO ROTA3", "RESUMO"]
+		fake_print.clear()
+		asyncio.run(render_job(RenderJob(_multi("2 peças"), str(second), "multi_quote.html")))
+	finally:
+		configure_pdf_cache(None)
+	assert fake_print == ["COTAÇÃO ROTA2"]
+	expected = [b"COTA\xc3\x87\xc3\x83O ROTA%d:0" % i for i in (1, 2, 3)] + [b"RESUMO:0"]
+	assert page_markers(first.read_bytes()) == expected
+	assert page_markers(second.read_bytes()) == expected
+
+
+def test_without_cache_multi_is_printed_once(tmp_path, fake_print):
+	out = tmp_path / "multi.pdf"
+	asyncio.run(render_job(RenderJob(_multi("1 peça"), str(out), "multi_quote.html")))
+	assert len(fake_print) == 1
+
+
+def test_unsupported_fragments_fall_back_once_per_process(tmp_path, monkeypatch):
+	printed = []
+
+	async def _fake(html, template_root, out_pdf):
+		printed.append(out_pdf)
+		Path(out_pdf).write_bytes(b"%PDF-1.5 xref em stream")
+
+	monkeypatch.setattr(generator, "_print_html", _fake)
+	monkeypatch.setattr(generator, "_MERGE_UNSUPPORTED", False)
+	configure_pdf_cache(tmp_path / "cache")
+	try:
+		first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+		asyncio.run(render_job(RenderJob(_multi("1 peça"), str(first), "multi_quote.html")))
+		# 4 fragmentos recusados pelo merger, depois o documento inteiro de uma vez
+		assert len(printed) == 5 and printed[-1] == str(first)
+		printed.clear()
+		asyncio.run(render_job(RenderJob(_multi("2 peças"), str(second), "multi_quote.html")))
+	finally:
+		configure_pdf_cache(None)
+	# recusa lembrada: o próximo documento vai direto para a impressão única
+	assert printed == [str(second)]
+	assert second.read_bytes().startswith(b"%PDF-1.5")
+
+
+def test_merges_real_chromium_output(tmp_path):
+	pytest.importorskip("playwright")
+	from pdf.merge import _Fragment
+	from pdf.renderer import PdfRenderer
+
+	r = PdfRenderer(pool_size=1)
+	try:
+		try:
+			r.warm_up().result(60)
+		except Exception as e:
+			pytest.skip(f"Chromium indisponível: {e}")
+		paths = []
+		for name, pages in (("a", 1), ("b", 3), ("c", 2)):
+			body = "".join(f'<h1 style="page-break-after: always">{name}{i}</h1>' for i in range(pages))
+			paths.append(tmp_path / f"{name}.pdf")
+			r.submit(r.print_html(f"<html><body>{body}</body></html>", str(paths[-1]))).result(60)
+	finally:
+		r.close()
+	counts = [_Fragment(p.read_bytes(), p.name).page_count for p in paths]
+	out = tmp_path / "out.pdf"
+	assert merge_pdfs(paths, out) == sum(counts) >= 6
+	# a saída é lida de volta pelo mesmo parser (xref aponta para cada objeto)
+	merged = _Fragment(out.read_bytes(), out.name)
+	assert merged.page_count == sum(counts)
+	for num in merged.offsets:
+		assert re.match(rb"\s*%d 0 obj" % num, merged.object(num))
+	pypdf = pytest.importorskip("pypdf")
+	assert len(pypdf.PdfReader(str(out), strict=True).pages) == sum(counts)
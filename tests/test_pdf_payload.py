@@ -0,0 +1,37 @@
+from decimal import Decimal
+
+import pytest
+
+from core.parser.itinerary_decoder import decode
+from pdf.payload import QuoteOptions, cia_principal, multi_payload, quote_payload, saida_labels
+
+LINES = ["AF 459 14APR GRUCDG HS2 1915 #1115", "AF 454 07MAY CDGGRU HS2 2330 #615"]
+
+
+def test_saida_labels_filled_from_first_segment():
+	pytest.importorskip("babel")
+	short, full = saida_labels(decode(LINES[:1]))
+	assert short == "14/04"
+	assert full == "14 de Abril"
+	assert saida_labels(None) == ("", "")
+
+
+def test_cia_principal_from_first_segment():
+	assert cia_principal(LINES) == "AF"
+	assert cia_principal([]) == "CIA"
+
+
+def test_multi_payload_summary_follows_quotes():
+	quotations = [
+		{"trechos": LINES, "tarifa": "1000.00", "taxas_base": "250.00", "currency": "USD"},
+		{"trechos": LINES[:1], "fares": [{"category": "ADT", "tarifa": "500.00", "taxas": "100.00"}], "multa": "200.00"},
+	]
+	data = multi_payload(quotations, QuoteOptions(rav_percent=10), "USD")
+	first, second = data["quotes"]
+	assert first["total"] == Decimal("1350.00") and first["multa_text"].startswith("USD 100.00")
+	# categoria sem rótulo no multi (como no app desktop); multa do PNR quando a janela não informa
+	assert second["fare_details"] == [{"label": "ADT", "total": Decimal("650.00")}]
+	assert second["multa_text"].startswith("USD 200.00")
+	assert [r["id"] for r in data["summary"]["rows"]] == ["Q01", "Q02"]
+	assert data["summary"]["rows"][0]["rota"] == first["rota_label"] == "GRU–CDG–GRU"
+	assert data["summary"]["soma"] == Decimal("2000.00")
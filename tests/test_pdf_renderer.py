@@ -0,0 +1,233 @@
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from core.parser.itinerary_decoder import decode
+from pdf.generator import RenderJob, _inline_assets, _render_html
+from pdf.renderer import PdfRenderer, RendererClosed, page_acquired, split_document
+
+LINES = ["AF 459 14APR GRUCDG HS2 1915 #1115", "AF 454 07MAY CDGGRU HS2 2330 #615"]
+
+
+def _quote_html(**fields) -> str:
+	"""Saída do Jinja (referência) com CSS embutido, como chega ao renderer."""
+	data = {"destino": "PARIS", "cia": "Air France", "decoded": decode(LINES), "total": Decimal("1350.00"), **fields}
+	html, root = _render_html(RenderJob(data, "unused.pdf"), "templates")
+	return _inline_assets(html, root)
+
+
+def _renderer_or_skip(**kw) -> PdfRenderer:
+	pytest.importorskip("playwright")
+	r = PdfRenderer(**kw)
+	try:
+		r.warm_up().result(60)
+	except Exception as e:
+		r.close()
+		pytest.skip(f"Chromium indisponível: {e}")
+	return r
+
+
+def test_submit_runs_on_renderer_loop_across_asyncio_run():
+	r = PdfRenderer()
+	try:
+		async def _loop_id():
+			return id(asyncio.get_running_loop())
+		# cada asyncio.run cria um loop novo, mas o trabalho roda sempre no loop do renderer
+		a = asyncio.run(r.run(_loop_id()))
+		b = asyncio.run(r.run(_loop_id()))
+		assert a == b
+	finally:
+		r.close()
+	with pytest.raises(RendererClosed):
+		r.start()
+
+
+def test_browser_reused_between_renders(tmp_path):
+	r = _renderer_or_skip(pool_size=2)
+	try:
+		html = tmp_path / "q.html"
+		html.write_text("<html><body><h1>teste</h1></body></html>", encoding="utf-8")
+		for i in range(3):
+			out = tmp_path / f"q{i}.pdf"
+			r.submit(r.print_html(html.read_text(encoding="utf-8"), str(out))).result(60)
+			assert out.read_bytes().startswith(b"%PDF")
+		assert r.launches == 1
+		assert r.renders == 3
+		assert r.is_healthy()
+	finally:
+		r.close()
+
+
+def test_split_document_rebuilds_jinja_output():
+	a = _quote_html(family_name="Silva")
+	b = _quote_html(destino="LISBOA", total=Decimal("990.00"), decoded=None, trechos=["GRU-LIS"])
+	shell_a, body_a = split_document(a)
+	shell_b, body_b = split_document(b)
+	assert shell_a + body_a == a and shell_b + body_b == b
+	# tudo o que varia por cotação fica no <body>: a casca é reaproveitada
+	assert shell_a == shell_b and "<style>" in shell_a
+	assert "Família Silva" in body_a and "LISBOA" in body_b
+	assert split_document("<html><body><script>1</script></body></html>") is None
+	assert split_document("<p>sem body</p>") is None
+
+
+class _FakePage:
+	def __init__(self, browser) -> None:
+		self.context = SimpleNamespace(browser=browser)
+		self.calls = []
+		self.closed = False
+
+	def is_closed(self) -> bool:
+		return self.closed
+
+	async def close(self) -> None:
+		self.closed = True
+
+	async def set_content(self, html, wait_until=None) -> None:
+		self.calls.append(("load", html))
+
+	async def evaluate(self, script, arg=None):
+		self.calls.append(("inject", arg))
+
+	async def pdf(self, path=None, **options) -> bytes:
+		self.calls.append(("pdf", None))
+		return b"%PDF-1.4"
+
+
+def _fake_browser_renderer(monkeypatch) -> tuple:
+	r = PdfRenderer(pool_size=1)
+	browser = SimpleNamespace(pages=[], is_connected=lambda: True)
+
+	async def _new_page():
+		browser.pages.append(_FakePage(browser))
+		return browser.pages[-1]
+
+	async def _ensure_browser():
+		r._browser = browser
+		return browser
+
+	browser.new_page = _new_page
+	monkeypatch.setattr(r, "_ensure_browser", _ensure_browser)
+	return r, browser
+
+
+def test_inject_mode_loads_shell_once_per_page(monkeypatch):
+	r, browser = _fake_browser_renderer(monkeypatch)
+	quotes = [_quote_html(destino=d) for d in ("PARIS", "ROMA", "LISBOA")]
+	try:
+		for html in quotes:
+			assert r.submit(r.pdf_bytes(html, inject=True)).result(10) == b"%PDF-1.4"
+		# documento inteiro (modo navigate) invalida a casca da página
+		r.submit(r.pdf_bytes(quotes[0])).result(10)
+		r.submit(r.pdf_bytes(quotes[1], inject=True)).result(10)
+	finally:
+		r.close()
+	(page,) = browser.pages
+	kinds = [kind for kind, _ in page.calls if kind != "pdf"]
+	assert kinds == ["load", "inject", "inject", "inject", "load", "load", "inject"]
+	assert page.calls[0][1] == split_document(quotes[0])[0]
+	assert [arg for kind, arg in page.calls if kind == "inject"][:3] == [split_document(q)[1] for q in quotes]
+	assert r.shell_loads == 2 and r.renders == 5
+
+
+def test_injected_dom_matches_full_document():
+	r = _renderer_or_skip(pool_size=1)
+	script = "document.documentElement.outerHTML"
+
+	async def _dom(html: str, inject: bool) -> str:
+		async def _read(page) -> str:
+			await r._load(page, html, inject)
+			return await page.evaluate(script)
+		return await r._with_page(_read)
+
+	try:
+		for html in (_quote_html(), _quote_html(destino="ROMA", family_name="Souza")):
+			reference = r.submit(_dom(html, inject=False)).result(60)
+			r.submit(_dom(_quote_html(destino="X"), inject=True)).result(60)  # casca já carregada
+			assert r.submit(_dom(html, inject=True)).result(60) == reference
+		assert r.shell_loads == 2
+	finally:
+		r.close()
+
+
+def test_page_acquired_listener_waits_for_a_free_page(monkeypatch):
+	r, browser = _fake_browser_renderer(monkeypatch)  # pool de 1 página
+	events = []
+
+	async def scenario():
+		release = asyncio.Event()
+
+		async def job(name, action):
+			page_acquired.set(lambda: events.append(f"{name}:started"))
+			await r._with_page(action)
+
+		async def hold(page):
+			events.append("a:page")
+			await release.wait()
+
+		async def quick(page):
+			events.append("b:page")
+
+		a = asyncio.ensure_future(job("a", hold))
+		await asyncio.sleep(0.05)
+		b = asyncio.ensure_future(job("b", quick))
+		await asyncio.sleep(0.05)
+		waiting = list(events)
+		release.set()
+		await asyncio.gather(a, b)
+		return waiting
+
+	try:
+		# "b" aguardando página ainda não conta como iniciado
+		assert r.submit(scenario()).result(10) == ["a:started", "a:page"]
+		assert events == ["a:started", "a:page", "b:started", "b:page"]
+		# valor definido por quem chama submit() chega ao loop do renderer
+		calls = []
+		token = page_acquired.set(lambda: calls.append(1))
+		try:
+			r.submit(r.pdf_bytes("<html><body>x</body></html>")).result(10)
+		finally:
+			page_acquired.reset(token)
+		assert calls == [1]
+	finally:
+		r.close()
+
+
+def test_capacity_is_returned_when_the_block_ends(monkeypatch):
+	r, browser = _fake_browser_renderer(monkeypatch)  # pool de 1 página
+	peak = busy = 0
+
+	async def hold(page):
+		nonlocal peak, busy
+		busy += 1
+		peak = max(peak, busy)
+		await asyncio.sleep(0.05)
+		busy -= 1
+
+	async def jobs(n):
+		await asyncio.gather(*(r._with_page(hold) for _ in range(n)))
+
+	async def scenario():
+		async with r.capacity(3):
+			await r.run(jobs(3))
+			assert r.pool_size == 3
+			# pedido menor sobreposto não reduz o pool do maior
+			async with r.capacity(2):
+				assert r.pool_size == 3
+			# bloco termina com as páginas ainda em uso
+			late = asyncio.ensure_future(r.run(jobs(3)))
+			await asyncio.sleep(0.01)
+		assert r.pool_size == 1
+		await late
+
+	try:
+		asyncio.run(scenario())
+		assert peak == 3
+		assert sum(not p.closed for p in browser.pages) == 1
+		peak = 0
+		r.submit(jobs(3)).result(10)
+		assert peak == 1 and r._excess == 0
+	finally:
+		r.close()
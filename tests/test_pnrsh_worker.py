@@ -0,0 +1,73 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from core.parser.pnrsh_adapter import PnrshError, PnrshPool
+
+FAKE = [sys.executable, str(Path(__file__).parent / "fakes" / "fake_pnrsh.py")]
+LINES = ["AF 459 14APR GRUCDG HS2 1915 #1115"]
+
+
+def test_persistent_worker_is_reused():
+	pool = PnrshPool(FAKE, size=1, timeout=10)
+	try:
+		a = pool.decode(LINES)
+		b = pool.decode(LINES)
+		assert a["source"] == "fake-pnrsh" and len(a["flightInfo"]["flights"]) == 1
+		assert a["pid"] == b["pid"]
+		assert pool.serve_supported is True
+	finally:
+		pool.close()
+
+
+def test_worker_restarts_after_crash_and_times_out():
+	pool = PnrshPool(FAKE, size=1, timeout=10)
+	try:
+		first = pool.decode(LINES)
+		with pytest.raises(PnrshError):
+			pool.decode(["CRASH"])
+		assert pool.decode(LINES)["pid"] != first["pid"]
+		with pytest.raises(PnrshError):
+			pool.decode(["SLEEP"], timeout=0.5)
+		assert pool.decode(LINES)["flightInfo"]["flights"]
+		assert pool.restarts >= 2
+	finally:
+		pool.close()
+
+
+def test_falls_back_to_one_shot_without_serve_mode(monkeypatch):
+	monkeypatch.setenv("FAKE_PNRSH_NO_SERVE", "1")
+	pool = PnrshPool(FAKE, size=1, timeout=10)
+	try:
+		assert pool.decode(LINES)["source"] == "fake-pnrsh"
+		assert pool.serve_supported is False
+		assert pool.decode(LINES)["source"] == "fake-pnrsh"
+	finally:
+		pool.close()
+
+
+def test_binary_ignoring_serve_is_detected_by_short_probe(monkeypatch):
+	monkeypatch.setenv("FAKE_PNRSH_IGNORE_SERVE", "1")
+	pool = PnrshPool(FAKE, size=1, timeout=10, probe_timeout=1)
+	try:
+		t0 = time.perf_counter()
+		assert pool.decode(LINES)["source"] == "fake-pnrsh"
+		# handshake expira em 1s, não no timeout de decodificação (10s)
+		assert time.perf_counter() - t0 < 5
+		assert pool.serve_supported is False
+	finally:
+		pool.close()
+
+
+def test_decode_failure_does_not_disable_serve_mode():
+	pool = PnrshPool(FAKE, size=1, timeout=10)
+	try:
+		# primeira decodificação falha, mas o handshake já confirmou o modo --serve
+		with pytest.raises(PnrshError):
+			pool.decode(["CRASH"])
+		assert pool.serve_supported is True
+		assert pool.decode(LINES)["source"] == "fake-pnrsh"
+	finally:
+		pool.close()
@@ -7,3 +7,62 @@ def test_compute_totals_basic():
 	assert out["comissao"] == "2278.60"
 	assert out["taxas_exibidas"] == "2872.60"
 	assert out["total"] == "25158.60"
+
+
+def _random_rows(n: int, seed: int):
+	import random
+	rnd = random.Random(seed)
+	rows = []
+	for _ in range(n):
+		tarifa = rnd.randint(0, 10_000_000)
+		taxas = rnd.randint(0, 500_000)
+		fee = rnd.choice([0, 5000, rnd.randint(0, 100_000)])
+		pct = rnd.choice([10, 0, 12.5, round(rnd.uniform(0, 30), 2), rnd.randint(0, 100)])
+		rows.append((tarifa, taxas, pct, fee))
+	return rows
+
+
+def _expected(rows):
+	from decimal import Decimal
+	from core.rules.pricing import compute_totals
+	cols = {"rav": [], "comissao": [], "taxas_exibidas": [], "total": []}
+	for tarifa, taxas, pct, fee in rows:
+		out = compute_totals(Decimal(tarifa) / 100, Decimal(taxas) / 100, pct, Decimal(fee) / 100)
+		for k in cols:
+			cols[k].append(int(Decimal(out[k]) * 100))
+	return cols
+
+
+def test_compute_totals_batch_matches_compute_totals():
+	from core.rules.pricing import compute_totals_batch
+	rows = _random_rows(3000, seed=7)
+	tarifas, taxas, pcts, fees = (list(c) for c in zip(*rows))
+	assert compute_totals_batch(tarifas, taxas, pcts, fees) == _expected(rows)
+
+
+def test_compute_totals_batch_half_up_ties():
+	from core.rules.pricing import compute_totals_batch, to_cents
+	# 0.5% de 1,00 = 0,005 -> 0,01 ; -0,005 -> -0,01 (meio se afasta do zero)
+	out = compute_totals_batch([100, -100], [0, 0], 0.5, 0)
+	assert out["rav"] == [1, -1]
+	assert to_cents("22286.005") == 2228601
+
+
+def test_compute_totals_batch_numpy_scalar_percent():
+	import pytest
+	np = pytest.importorskip("numpy")
+	from core.rules.pricing import compute_totals_batch
+	for pct in (10, 12.5, 7.35):
+		rows = [(t, x, pct, f) for t, x, _, f in _random_rows(2000, seed=11)]
+		tarifas, taxas, _, fees = (np.array(c, dtype=np.int64) for c in zip(*rows))
+		out = compute_totals_batch(tarifas, taxas, pct, fees)
+		assert {k: [int(v) for v in col] for k, col in out.items()} == _expected(rows)
+
+
+def test_price_returns_typed_totals():
+	from decimal import Decimal
+	from core.rules.pricing import Totals, compute_totals, price
+	t = price(Decimal("22286.00"), "594.00", 10, 50)
+	assert isinstance(t, Totals) and t.total == Decimal("25158.60")
+	assert t.as_strings() == compute_totals("22286.00", "594.00", 10, "50")
+	assert Totals.from_cents(222860, 227860, 287260, 2515860) == t
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from cli.main import parse
+from core import tracing
+from core.parser.itinerary_decoder import decode
+from core.rules.pricing import price
+from pdf.renderer import PdfRenderer
+
+PNR = """AF 459 14APR GRUCDG HS2 1915 #1115
+Tarifa USD 1000,00 + Txs USD 250,00
+"""
+
+
+@pytest.fixture
+def trace(tmp_path):
+	tracing.configure(True)
+	tracing.clear()
+	yield
+	tracing.configure(False)
+	tracing.clear()
+
+
+def test_disabled_records_nothing():
+	tracing.configure(False)
+	tracing.clear()
+	with tracing.quote() as label:
+		parse(PNR)
+	assert label is None
+	assert tracing.records() == []
+
+
+def test_stages_are_grouped_by_quote(trace):
+	with tracing.quote("PNR-1"):
+		q = parse(PNR)
+		decode(q["trechos"])
+		price("1000.00", "250.00", 10, "0")
+	with tracing.quote():
+		parse(PNR)
+	recs = tracing.records()
+	assert [r["name"] for r in recs] == ["parse", "decode", "pricing", "parse"]
+	assert recs[0]["quote"] == "PNR-1" and recs[-1]["quote"].startswith("Q")
+	assert all(r["dur"] >= 0 and r["pid"] and r["tid"] for r in recs)
+	assert set(tracing.summary()["PNR-1"]) == {"parse", "decode", "pricing"}
+
+
+def test_failed_stage_is_recorded_with_error(trace):
+	with pytest.raises(ZeroDivisionError):
+		with tracing.span("pricing"):
+			1 / 0
+	assert tracing.records()[0]["args"] == {"error": "ZeroDivisionError"}
+
+
+def test_quote_follows_work_into_renderer_loop(trace):
+	r = PdfRenderer()
+	try:
+		async def _stage():
+			with tracing.span("page.pdf"):
+				return tracing.current_quote()
+
+		with tracing.quote("PNR-2"):
+			assert r.submit(_stage()).result(10) == "PNR-2"
+	finally:
+		r.close()
+	assert tracing.records()[0]["quote"] == "PNR-2"
+
+
+def test_file_sink_appends_jsonl_per_quote_and_exports_chrome(tmp_path):
+	path = tmp_path / "trace.jsonl"
+	tracing.configure(path=path)
+	tracing.clear()
+	try:
+		with tracing.quote("A"):
+			parse(PNR)
+		assert len(tracing.load_jsonl(path)) == 1
+		with tracing.quote("B"):
+			parse(PNR)
+	finally:
+		tracing.configure(False)
+		tracing.clear()
+	recs = tracing.load_jsonl(path)
+	assert [r["quote"] for r in recs] == ["A", "B"]
+
+	out = tmp_path / "trace.json"
+	assert tracing.main([str(path), "--chrome", str(out)]) == 0
+	events = json.loads(out.read_text(encoding="utf-8"))["traceEvents"]
+	assert {e["ph"] for e in events} == {"X"}
+	assert [e["args"]["quote"] for e in events] == ["A", "B"]
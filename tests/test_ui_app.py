@@ -0,0 +1,11 @@
+import pytest
+
+pytest.importorskip("PySide6")
+
+from ui import app  # noqa: E402
+
+
+def test_generate_does_not_shadow_module_helpers():
+	# nome local igual ao helper do módulo vira UnboundLocalError (engolido pelo try/except)
+	local_names = app.MainWindow._generate.__code__.co_varnames
+	assert not {"cia_principal", "format_saida", "logo_src", "quote_payload"} & set(local_names)
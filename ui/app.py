@@ -1,22 +1,63 @@
-from PySide6 import QtWidgets, QtCore, QtGui
-from decimal import Decimal
-import asyncio
-from datetime import datetime
-from typing import List
 import sys
 from pathlib import Path
-from string import Template
 
 # Garantir que a raiz do projeto esteja no sys.path quando executado como script
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
 	sys.path.insert(0, str(ROOT))
 
+from ui import startup  # primeiro: marca o início da inicialização
+
+from PySide6 import QtWidgets, QtCore, QtGui
+from decimal import Decimal
+from datetime import date, datetime
+import json
+from typing import Optional
+from string import Template
+
+# Só módulos leves aqui: Playwright, Jinja (pdf.generator) e Babel são carregados sob
+# demanda ou pela thread de aquecimento iniciada depois que a janela aparece.
+from core import tracing
 from cli.main import parse as parse_pnr
-from core.rules.pricing import compute_totals
-from pdf.generator import render_pdf
-from ui.bootstrap_playwright import ensure_playwright_chromium
+from core.rules.pricing import price
+from ui.render_queue import RenderQueue
 from core.data.airlines import get_airline_name
+from core.parser.decode_cache import configure_cache, decode_itinerary, get_cache
+from core.parser.itinerary_model import Itinerary
+from pdf.cache import configure_pdf_cache
+from pdf.payload import FARE_LABELS, QuoteOptions, cia_principal, format_saida, logo_src, multi_payload, quote_payload
+
+
+def _warm_up_tasks():
+	"""Carregamentos caros feitos em segundo plano, na ordem em que o primeiro PDF precisa deles."""
+	def playwright() -> None:
+		from ui.bootstrap_playwright import ensure_playwright_chromium
+		# Carimbo válido: não lança nada aqui. Em executável (sys.frozen), só verifica; não instala para evitar loops
+		ensure_playwright_chromium(allow_install=not bool(getattr(sys, "frozen", False)))
+
+	def renderer() -> None:
+		# Chromium persistente: o primeiro PDF não paga o cold start (reaproveita o lançamento da verificação)
+		from pdf.renderer import get_renderer
+		get_renderer().warm_up().result(timeout=60)
+
+	def templates() -> None:
+		from pdf.generator import _REGISTRY
+		for name in ("quote.html", "multi_quote.html"):
+			_REGISTRY.get_template("templates", name)
+
+	def babel() -> None:
+		format_saida(date.today())
+
+	def iata() -> None:
+		get_airline_name("AF")
+
+	return [("Playwright/Chromium", playwright), ("renderer", renderer), ("templates Jinja", templates), ("Babel pt_BR", babel), ("base IATA", iata)]
+
+
+def _shutdown_renderer() -> None:
+	# só encerra se o renderer chegou a ser carregado (não importa Playwright na saída)
+	if "pdf.renderer" in sys.modules:
+		sys.modules["pdf.renderer"].shutdown_renderer()
 
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -27,11 +68,16 @@ class MainWindow(QtWidgets.QMainWindow):
 
 		# Preparação Playwright/Chromium (v0.5)
 		if len(sys.argv) > 1 and sys.argv[1] == "--prepare":
+			from ui.bootstrap_playwright import ensure_playwright_chromium
 			ensure_playwright_chromium(allow_install=True)
 			QtWidgets.QApplication.quit()
 			return
-		# Em executável (sys.frozen), só verifica; não instala para evitar loops
-		ensure_playwright_chromium(allow_install=not bool(getattr(sys, "frozen", False)))
+		# Verificação do Playwright e aquecimento do Chromium ficam para _warm_up_tasks(),
+		# executadas em segundo plano depois que a janela aparece
+		# Itinerários já decodificados sobrevivem entre sessões (logs/decode_cache.json)
+		configure_cache(path=str(Path("logs") / "decode_cache.json"))
+		# PDFs já gerados (mesmo template e mesmos dados) são copiados do cache em disco
+		configure_pdf_cache(Path("logs") / "pdf_cache")
 
 		# Header moderno com logo, título e botão de tema
 		header_widget = QtWidgets.QWidget()
@@ -121,6 +167,18 @@ class MainWindow(QtWidgets.QMainWindow):
 		self.btn_add_quote = QtWidgets.QPushButton("Adicionar Cotação")
 		self.btn_add_quote.clicked.connect(self.on_add_quote)
 		self.btn_add_quote.setVisible(self.qtd_cotacao.value() > 1)
+		# v1.2 — PDFs são gerados em segundo plano; permite cancelar a fila
+		self.btn_cancel_render = QtWidgets.QPushButton("Cancelar PDFs")
+		self.btn_cancel_render.setVisible(False)
+		self.render_queue = RenderQueue(template_dir="templates", parent=self)
+		self._ask_open_pdf: set[str] = set()
+		self.render_queue.job_queued.connect(self.on_render_queued)
+		self.render_queue.job_started.connect(self.on_render_started)
+		self.render_queue.job_finished.connect(self.on_render_finished)
+		self.render_queue.job_failed.connect(self.on_render_failed)
+		self.render_queue.job_cancelled.connect(self.on_render_cancelled)
+		self.render_queue.pending_changed.connect(self.on_render_pending)
+		self.btn_cancel_render.clicked.connect(self.render_queue.cancel_all)
 		self.lista_cotacoes = QtWidgets.QListWidget()
 		self.lista_cotacoes.setMaximumHeight(140)
 		self.lista_cotacoes.itemDoubleClicked.connect(self.on_edit_quote)
@@ -137,6 +195,7 @@ class MainWindow(QtWidgets.QMainWindow):
 		layout.addWidget(form_card)
 		row_actions = QtWidgets.QHBoxLayout()
 		row_actions.addStretch(1)
+		row_actions.addWidget(self.btn_cancel_render)
 		row_actions.addWidget(self.btn_add_quote)
 		row_actions.addWidget(self.btn_generate)
 		layout.addLayout(row_actions)
@@ -273,11 +332,19 @@ class MainWindow(QtWidgets.QMainWindow):
 		except Exception:
 			pass
 
-	def _cia_principal(self, trechos: List[str]) -> str:
-		if not trechos:
-			return "CIA"
-		first = trechos[0].strip().split()
-		return ''.join([ch for ch in first[0] if ch.isalpha()]).upper() if first else "CIA"
+	def _quote_options(self) -> QuoteOptions:
+		"""Campos da janela no formato de ``pdf.payload`` (mesmo payload do serviço HTTP)."""
+		return QuoteOptions(
+			rav_percent=float(self.rav_pct.value()),
+			fee=Decimal(f"{self.fee.value():.2f}") if self.fee.value() != 0 else None,
+			classe=self.classe.currentText(),
+			bagagem=self.bagagem.currentText(),
+			parcelas=int(self.parcelas.value()),
+			pagamento=self.pagamento.currentText() if self.pagamento.currentIndex() != 0 else None,
+			multa_base=Decimal(f"{self.multa_base.value():.2f}"),
+			reembolsavel=self.reembolsavel.isChecked(),
+			family_name=self.family_name.text().strip(),
+		)
 
 	# v0.5 — helpers de sessão
 	def on_qtd_changed(self, val: int) -> None:
@@ -307,17 +374,8 @@ class MainWindow(QtWidgets.QMainWindow):
 			"ravPct": float(self.rav_pct.value()),
 		}
 
-	def _rota_from_decoded(self, decoded: dict) -> str:
-		try:
-			flights = (decoded or {}).get("flightInfo", {}).get("flights", [])
-			codes = []
-			for f in flights:
-				codes.append(f.get("departureAirport", {}).get("iataCode", ""))
-				if f is flights[-1]:
-					codes.append(f.get("landingAirport", {}).get("iataCode", ""))
-			return "–".join([c for c in codes if c])
-		except Exception:
-			return ""
+	def _rota_from_decoded(self, decoded: Optional[Itinerary]) -> str:
+		return decoded.route if decoded else ""
 
 	def on_add_quote(self) -> None:
 		text = self.input_pnr.toPlainText()
@@ -325,35 +383,16 @@ class MainWindow(QtWidgets.QMainWindow):
 			return
 		parsed = parse_pnr(text)
 		# calcula totais no snapshot (congelar)
-		from decimal import Decimal as _D
-		calcs = compute_totals(parsed.get("tarifa","0"), parsed.get("taxas_base","0"), float(self.rav_pct.value()), str(self.fee.value()))
+		calcs = price(parsed.get("tarifa","0"), parsed.get("taxas_base","0"), float(self.rav_pct.value()), str(self.fee.value()))
 		# decode rota/saida
-		decoded = None
-		try:
-			from core.parser.itinerary_decoder import decode_lines as decode_itin
-			decoded = decode_itin(parsed.get("trechos", []))
-		except Exception:
-			decoded = None
-		# fallback para pnrsh quando o parser interno não retornar voos
-		if not decoded or not (decoded.get("flightInfo", {}).get("flights") if isinstance(decoded, dict) else False):
-			try:
-				from core.parser.pnrsh_adapter import decode_segments as decode_pnrsh
-				decoded_alt = decode_pnrsh(parsed.get("trechos", []))
-				if decoded_alt and decoded_alt.get("flightInfo", {}).get("flights"):
-					decoded = decoded_alt
-			except Exception:
-				pass
+		# decoder interno com fallback pnrsh, memoizado por trechos normalizados
+		decoded = decode_itinerary(parsed.get("trechos", []))
 		rota = self._rota_from_decoded(decoded)
 		saida_short = ""
-		try:
-			fl = (decoded or {}).get("flightInfo", {}).get("flights", [])[0]
-			from datetime import datetime as _dt
-			saida_short = _dt.strptime(fl.get("departureTime",""), "%Y-%m-%d %H:%M").strftime("%d/%m")
-		except Exception:
-			pass
+		if decoded and decoded.first.departure:
+			saida_short = decoded.first.departure.strftime("%d/%m")
 		idx = len(self.sessao["cotacoes"]) + 1
-		from datetime import datetime as _dt2
-		key = _dt2.now().strftime("%Y%m%d-%H%M%S-") + f"{idx:02d}"
+		key = datetime.now().strftime("%Y%m%d-%H%M%S-") + f"{idx:02d}"
 		cot = {
 			"id": f"COT-{idx:02d}",
 			"key": key,
@@ -363,9 +402,9 @@ class MainWindow(QtWidgets.QMainWindow):
 			"totais": {
 				"tarifaUSD": float(parsed.get("tarifa","0")),
 				"taxasUSD": float(parsed.get("taxas_base","0")),
-				"totalPorBilheteUSD": float(calcs.get("total","0")),
-				"ravUSD": float(calcs.get("rav","0")),
-				"taxasExibidasUSD": float(calcs.get("taxas_exibidas","0")),
+				"totalPorBilheteUSD": float(calcs.total),
+				"ravUSD": float(calcs.rav),
+				"taxasExibidasUSD": float(calcs.taxas_exibidas),
 			},
 			"meta": {
 				"titulo": "",
@@ -413,6 +452,13 @@ class MainWindow(QtWidgets.QMainWindow):
 		self.update_add_button_state()
 
 	def on_generate(self):
+		# SETEMARES_TRACE: etapas desta cotação (parse, decode, preço, PDF) ficam agrupadas
+		with tracing.quote():
+			self._generate()
+
+	def _generate(self):
+		# normalmente já carregado pela thread de aquecimento
+		from pdf.generator import RenderJob
 		text = self.input_pnr.toPlainText()
 		if not text.strip():
 			# v0.5: permitir gerar quando já houver cotações capturadas
@@ -437,82 +483,7 @@ class MainWindow(QtWidgets.QMainWindow):
 			
 			# Se o parser detectar múltiplas cotações (email completo), gerar automaticamente multi-página
 			if parsed.get("is_multi") and parsed.get("quotations"):
-				quotes_payload = []
-				for q in parsed["quotations"]:
-					# Montar fare_details por cotação
-					fares = q.get("fares", [])
-					fare_details = []
-					grand_total = Decimal("0")
-					fee = Decimal(q.get("fee", "0")) if self.fee.value() == 0 else Decimal(f"{self.fee.value():.2f}")
-					for f in fares:
-						cat_tarifa = Decimal(f.get("tarifa","0"))
-						cat_taxas = Decimal(f.get("taxas","0"))
-						calcs = compute_totals(str(cat_tarifa), str(cat_taxas), float(self.rav_pct.value()), str(fee))
-						total_cat = Decimal(calcs["total"])
-						fare_details.append({"label": f.get("category",""), "total": f"{total_cat:.2f}"})
-						grand_total += total_cat
-					# Decodificar trechos de cada bloco
-					decoded = None
-					try:
-						from core.parser.itinerary_decoder import decode_lines as decode_itin
-						decoded = decode_itin(q.get("trechos", []))
-					except Exception:
-						decoded = None
-					if not decoded or not (decoded.get("flightInfo", {}).get("flights") if isinstance(decoded, dict) else False):
-						try:
-							from core.parser.pnrsh_adapter import decode_segments as decode_pnrsh
-							decoded_alt = decode_pnrsh(q.get("trechos", []))
-							if decoded_alt and decoded_alt.get("flightInfo", {}).get("flights"):
-								decoded = decoded_alt
-						except Exception:
-							pass
-					# labels de saída/destino e rota
-					destino_label = ""
-					saida_label = ""
-					saida_label_full = ""
-					rota_label = self._rota_from_decoded(decoded)
-					try:
-						flights = (decoded or {}).get("flightInfo", {}).get("flights", [])
-						first_f = flights[0] if flights else None
-						if first_f:
-							desc = first_f.get("landingAirport", {}).get("description", "")
-							if "), " in desc:
-								parts = desc.split("), ", 1)[-1]
-								_normalized = ", ".join([p.strip().title() for p in parts.split(",")])
-								destino_label = _normalized
-							dep = first_f.get("departureTime", "")
-							from datetime import datetime as _dt
-							dt = _dt.strptime(dep, "%Y-%m-%d %H:%M")
-							from babel.dates import format_date as _format_date
-							_saida = _format_date(dt.date(), format="d 'de' MMMM", locale="pt_BR")
-							if " de " in _saida:
-								_dia, _mes = _saida.split(" de ", 1)
-								saida_label_full = f"{_dia} de {_mes.capitalize()}"
-							else:
-								saida_label_full = _saida
-							saida_label = dt.strftime("%d/%m")
-					except Exception:
-						pass
-					quotes_payload.append({
-						"cia": get_airline_name(self._cia_principal(q.get("trechos", []))),
-						"decoded": decoded,
-						"classe": self.classe.currentText(),
-						"currency": q.get("currency","USD"),
-						"bagagem": (q.get("bagagem_hint") or self.bagagem.currentText()),
-						"pagamento": (q.get("pagamento_hint") or (f"Em até {self.parcelas.value()}x no cartão de crédito, taxas à vista" if self.pagamento.currentIndex()==0 else self.pagamento.currentText())),
-						"multa_text": f"USD {self.multa_base.value():.2f} + diferença tarifária, caso houver.",
-						"reembolso_text": ("Bilhete reembolsável." if self.reembolsavel.isChecked() else "Bilhete não reembolsável."),
-						"classe_label": self.classe.currentText(),
-						"family_name": self.family_name.text().strip(),
-						"logo_src": str(Path("Arquivos/Modelos/Logo.png").resolve().as_uri()),
-						"fare_details": fare_details,
-						"grand_total": f"{grand_total:.2f}",
-						"total": f"{grand_total:.2f}",
-						"destino": destino_label,
-						"rota_label": rota_label,
-						"saida_label": saida_label,
-						"saida_label_full": saida_label_full,
-					})
+				payload = multi_payload(parsed["quotations"], self._quote_options(), parsed.get("currency","USD"))
 				# salvar
 				now = datetime.now()
 				default_name = f"cotacoes_{now.strftime('%Y%m%d')}_{now.strftime('%H%M')}.pdf"
@@ -520,83 +491,17 @@ class MainWindow(QtWidgets.QMainWindow):
 				if not out_path:
 					return
 				self.sessao["arquivoSaida"] = out_path
-				# Render multi
-				self.btn_generate.setDisabled(True)
-				self.btn_generate.setText("Gerando PDF…")
-				QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
-				try:
-					from pdf.generator import render_multi_pdf as _render_multi
-					# montar summary simples
-					summary_rows = []
-					for i, qp in enumerate(quotes_payload, start=1):
-						summary_rows.append({
-							"id": f"Q{i:02d}",
-							"rota": qp.get("rota_label",""),
-							"saida": qp.get("saida_label",""),
-							"classe": qp.get("classe_label",""),
-							"total": qp.get("total","0.00"),
-						})
-					summary_payload = {
-						"rows": summary_rows,
-						"soma": f"{sum([Decimal(x.get('total','0') or '0') for x in quotes_payload]):.2f}",
-						"currency": parsed.get("currency","USD"),
-					}
-					asyncio.run(_render_multi(quotes_payload, summary_payload, template_dir="templates", out_pdf=out_path))
-					self.preview.setPlainText(f"PDF gerado em: {out_path}\n")
-					resp = QtWidgets.QMessageBox.question(self, "Abrir PDF", "Abrir o PDF gerado agora?", QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
-					if resp == QtWidgets.QMessageBox.Yes:
-						QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(out_path))
-				finally:
-					QtWidgets.QApplication.restoreOverrideCursor()
-					self.btn_generate.setDisabled(False)
-					self.btn_generate.setText("Gerar PDF")
+				# Render multi em segundo plano (janela segue livre para o próximo PNR)
+				job_id = self.render_queue.submit(RenderJob(payload, out_path, "multi_quote.html"))
+				self._ask_open_pdf.add(job_id)
 				return
 
 			# v1.1: Múltiplas tarifas (cotação única)
 			fares = parsed.get("fares", [])
-			fare_details = []
-			grand_total = Decimal("0")
-
-			# Usar a primeira tarifa como base para retrocompatibilidade
 			tarifa = Decimal(parsed.get("tarifa", "0"))
 			taxas_base = Decimal(parsed.get("taxas_base", "0"))
-			
-			fee = Decimal(parsed.get("fee", "0")) if self.fee.value() == 0 else Decimal(f"{self.fee.value():.2f}")
-
-			# Se houver múltiplas tarifas, calcula cada uma
-			if fares:
-				labels = {"ADT": "Adulto", "CHD": "Infantil", "INF": "Bebê"}
-				for f in fares:
-					cat_tarifa = Decimal(f["tarifa"])
-					cat_taxas = Decimal(f["taxas"])
-					
-					calcs = compute_totals(str(cat_tarifa), str(cat_taxas), float(self.rav_pct.value()), str(fee))
-					total_cat = Decimal(calcs["total"])
-					fare_details.append({
-						"label": labels.get(f["category"], f["category"]),
-						"total": f"{total_cat:.2f}",
-					})
-					grand_total += total_cat
-			
-			# payload para o template
-			data = {
-				"cia": get_airline_name(self._cia_principal(parsed.get("trechos", []))),
-				"trechos": parsed.get("trechos", []),
-				"currency": parsed.get("currency", "USD"),
-				"bagagem": self.bagagem.currentText(),
-				"pagamento": (f"Em até {self.parcelas.value()}x no cartão de crédito, taxas à vista" if self.pagamento.currentIndex()==0 else self.pagamento.currentText()),
-				"multa_text": f"USD {self.multa_base.value():.2f} + diferença tarifária, caso houver.",
-				"reembolso_text": ("Bilhete reembolsável." if self.reembolsavel.isChecked() else "Bilhete não reembolsável."),
-				"classe": self.classe.currentText(),
-				"family_name": self.family_name.text().strip(),
-				"logo_src": str(Path("Arquivos/Modelos/Logo.png").resolve().as_uri()),
-				"fare_details": fare_details,
-				"grand_total": f"{grand_total:.2f}",
-				# Dados legados para template de cotação única
-				"total": f"{grand_total:.2f}" if fare_details else compute_totals(str(tarifa), str(taxas_base), float(self.rav_pct.value()), str(fee))["total"],
-			}
 
-			# Ajuste de multa baseado no parser
+			# Ajuste de multa baseado no parser (antes de montar o payload)
 			try:
 				multa_parsed = Decimal(parsed.get("multa", "0"))
 				if multa_parsed > 0:
@@ -612,24 +517,10 @@ class MainWindow(QtWidgets.QMainWindow):
 				QtWidgets.QMessageBox.critical(self, "Dados insuficientes", "Uma ou mais tarifas não foram identificadas corretamente.")
 				return
 
-			cia = self._cia_principal(parsed.get("trechos", []))
-			
-			# Decodificação (continua como antes)
-			decoded = None
-			try:
-				from core.parser.itinerary_decoder import decode_lines as decode_itin
-				decoded = decode_itin(parsed.get("trechos", []))
-			except Exception:
-				decoded = None
-			# fallback pnrsh
-			if not decoded or not (decoded.get("flightInfo", {}).get("flights") if isinstance(decoded, dict) else False):
-				try:
-					from core.parser.pnrsh_adapter import decode_segments as decode_pnrsh
-					decoded_alt = decode_pnrsh(parsed.get("trechos", []))
-					if decoded_alt and decoded_alt.get("flightInfo", {}).get("flights"):
-						decoded = decoded_alt
-				except Exception:
-					pass
+			# payload para o template (mesmo do serviço HTTP; decodificação memoizada)
+			data = quote_payload(parsed, self._quote_options(), FARE_LABELS)
+			cia = cia_principal(parsed.get("trechos", []))
+			destino_label = data["destino"]
 			now = datetime.now()
 			default_name = f"cotacao_{cia}_{now.strftime('%Y%m%d')}_{now.strftime('%H%M%S')}.pdf"
 			out_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Salvar PDF", default_name, "PDF (*.pdf)")
@@ -637,55 +528,6 @@ class MainWindow(QtWidgets.QMainWindow):
 				return
 			self.sessao["arquivoSaida"] = out_path
 
-			pagto_text = (f"Em até {self.parcelas.value()}x no cartão de crédito, taxas à vista" if self.pagamento.currentIndex()==0 else self.pagamento.currentText())
-			multa_text = f"USD {self.multa_base.value():.2f} + diferença tarifária, caso houver."
-			reembolso_text = ("Bilhete reembolsável." if self.reembolsavel.isChecked() else "Bilhete não reembolsável.")
-			# destino cidade/país a partir do PRIMEIRO trecho (destino inicial da jornada)
-			destino_label = ""
-			try:
-				flights = (decoded or {}).get("flightInfo", {}).get("flights", [])
-				first_f = flights[0] if flights else None
-				if first_f:
-					desc = first_f.get("landingAirport", {}).get("description", "")
-					if "), " in desc:
-						parts = desc.split("), ", 1)[-1]
-						# normaliza capitalização e espaço após vírgula
-						_normalized = ", ".join([p.strip().title() for p in parts.split(",")])
-						destino_label = _normalized
-			except Exception:
-				pass
-
-			# saída label (DDMMM) do primeiro trecho + versão extensa
-			saida_label = ""
-			saida_label_full = ""
-			try:
-				first = (decoded or {}).get("flightInfo", {}).get("flights", [])[0]
-				dep = first.get("departureTime", "")  # 'YYYY-MM-DD HH:MM'
-				from datetime import datetime as _dt
-				dt = _dt.strptime(dep, "%Y-%m-%d %H:%M")
-				from babel.dates import format_date as _format_date
-				_saida = _format_date(dt.date(), format="d 'de' MMMM", locale="pt_BR")
-				if " de " in _saida:
-					_dia, _mes = _saida.split(" de ", 1)
-					saida_label_full = f"{_dia} de {_mes.capitalize()}"
-				else:
-					saida_label_full = _saida
-				# curto dd/mm (fallback se for necessário em templates futuros)
-				saida_label = dt.strftime("%d/%m")
-			except Exception:
-				pass
-
-			# Atualiza payload com dados decodificados
-			try:
-				data.update({
-					"decoded": decoded,
-					"destino": destino_label,
-					"saida_label": saida_label,
-					"saida_label_full": saida_label_full,
-				})
-			except Exception:
-				pass
-
 			# v0.5 — construir lista de páginas quando qtd>1
 			quotes_payload = []
 			if int(self.qtd_cotacao.value()) > 1:
@@ -693,31 +535,14 @@ class MainWindow(QtWidgets.QMainWindow):
 				for c in self.sessao["cotacoes"]:
 					# reparse PNR para decoded e cia
 					c_parsed = parse_pnr(c.get("pnrRaw",""))
-					c_decoded = None
-					try:
-						from core.parser.itinerary_decoder import decode_lines as decode_itin
-						c_decoded = decode_itin(c_parsed.get("trechos", []))
-					except Exception:
-						c_decoded = None
-					# fallback pnrsh
-					if not c_decoded or not (c_decoded.get("flightInfo", {}).get("flights") if isinstance(c_decoded, dict) else False):
-						try:
-							from core.parser.pnrsh_adapter import decode_segments as decode_pnrsh
-							c_alt = decode_pnrsh(c_parsed.get("trechos", []))
-							if c_alt and c_alt.get("flightInfo", {}).get("flights"):
-								c_decoded = c_alt
-						except Exception:
-							pass
-					cia_code = self._cia_principal(c_parsed.get("trechos", []))
+					# trechos já vistos em on_add_quote saem do cache (sem re-decodificar/pnrsh)
+					c_decoded = decode_itinerary(c_parsed.get("trechos", []))
+					cia_code = cia_principal(c_parsed.get("trechos", []))
 					cia_name = get_airline_name(cia_code)
 					# labels
-					_saida_label_full = ""
+					saida_full = ""
 					try:
-						first = (c_decoded or {}).get("flightInfo", {}).get("flights", [])[0]
-						from datetime import datetime as _dt
-						dt = _dt.strptime(first.get("departureTime",""), "%Y-%m-%d %H:%M")
-						from babel.dates import format_date as _format_date
-						_saida_label_full = _format_date(dt.date(), format="d 'de' MMMM", locale="pt_BR")
+						saida_full = format_saida(c_decoded.first.departure.date())
 					except Exception:
 						pass
 					quotes_payload.append({
@@ -725,7 +550,7 @@ class MainWindow(QtWidgets.QMainWindow):
 						"decoded": c_decoded,
 						"classe": c.get("parametros",{}).get("classe",""),
 						"currency": c_parsed.get("currency","USD"),
-						"total": f"{c.get('totais',{}).get('totalPorBilheteUSD',0):.2f}",
+						"total": c.get('totais',{}).get('totalPorBilheteUSD',0),
 						"bagagem": c.get("parametros",{}).get("bagagem",""),
 						"pagamento": c.get("parametros",{}).get("pagamento",""),
 						"multa_text": f"USD {c.get('parametros',{}).get('multaBaseUSD',0):.2f} + diferença tarifária, caso houver.",
@@ -733,8 +558,8 @@ class MainWindow(QtWidgets.QMainWindow):
 						"multa_base": f"{c.get('parametros',{}).get('multaBaseUSD',0):.2f}",
 						"family_name": self.family_name.text().strip(),
 						"destino": destino_label,
-						"saida_label_full": _saida_label_full,
-						"logo_src": str(Path("Arquivos/Modelos/Logo.png").resolve().as_uri()),
+						"saida_label_full": saida_full,
+						"logo_src": logo_src(),
 					})
 				# summary rows
 				summary_rows = []
@@ -744,59 +569,84 @@ class MainWindow(QtWidgets.QMainWindow):
 						"rota": c.get("meta",{}).get("rota",""),
 						"saida": c.get("meta",{}).get("saida",""),
 						"classe": c.get("parametros",{}).get("classe",""),
-						"total": f"{c.get('totais',{}).get('totalPorBilheteUSD',0):.2f}",
+						"total": c.get('totais',{}).get('totalPorBilheteUSD',0),
 					})
 				summary_payload = {
 					"rows": summary_rows,
-					"soma": f"{sum([c.get('totais',{}).get('totalPorBilheteUSD',0) for c in self.sessao['cotacoes']]):.2f}",
+					"soma": sum(c.get('totais',{}).get('totalPorBilheteUSD',0) for c in self.sessao['cotacoes']),
 					"currency": parsed.get("currency","USD"),
 				}
 
-			# Renderizar PDF (estado de loading)
-			self.btn_generate.setDisabled(True)
-			self.btn_generate.setText("Gerando PDF…")
-			QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
-			try:
-				if int(self.qtd_cotacao.value()) > 1:
-					from pdf.generator import render_multi_pdf as _render_multi
-					asyncio.run(_render_multi(quotes_payload, summary_payload, template_dir="templates", out_pdf=out_path))
-				else:
-					asyncio.run(render_pdf(data, template_dir="templates", out_pdf=out_path))
-				self.preview.setPlainText(f"PDF gerado em: {out_path}\n")
-				# PDF gerado com sucesso - não abre automaticamente
-				QtWidgets.QMessageBox.information(self, "PDF Gerado", f"PDF salvo com sucesso em:\n{out_path}")
-			finally:
-				QtWidgets.QApplication.restoreOverrideCursor()
-				self.btn_generate.setDisabled(False)
-				self.btn_generate.setText("Gerar PDF")
+			# Renderizar PDF em segundo plano (conclusão tratada em on_render_finished)
+			if int(self.qtd_cotacao.value()) > 1:
+				self.render_queue.submit(RenderJob({"quotes": quotes_payload, "summary": summary_payload}, out_path, "multi_quote.html"))
+			else:
+				self.render_queue.submit(RenderJob(data, out_path))
 
 			# v0.5 — salvar log da sessão
 			try:
-				from datetime import datetime as _ts
-				stamp = _ts.now()
+				stamp = datetime.now()
 				log_dir = Path("logs")/"cotacoes"/stamp.strftime("%Y")/stamp.strftime("%m")/stamp.strftime("%d")
 				log_dir.mkdir(parents=True, exist_ok=True)
 				out_json = log_dir/(stamp.strftime("%Y%m%d_%H%M%S")+f"_qtd{self.sessao['qtdSolicitada']}.json")
-				import json
 				json.dump(self.sessao, open(out_json, "w", encoding="utf-8"), ensure_ascii=False, indent=2)
 			except Exception:
 				pass
 		except Exception as e:
 			QtWidgets.QMessageBox.critical(self, "Erro", f"Falha ao gerar PDF: {e}")
 
+	# v1.2 — fila de renderização em segundo plano
+	def on_render_queued(self, job_id: str, out_path: str) -> None:
+		self.preview.append(f"{job_id}: na fila → {out_path}")
+
+	def on_render_started(self, job_id: str) -> None:
+		self.preview.append(f"{job_id}: gerando PDF…")
+
+	def on_render_finished(self, job_id: str, out_path: str) -> None:
+		self.preview.append(f"{job_id}: PDF gerado em: {out_path}")
+		if job_id in self._ask_open_pdf:
+			self._ask_open_pdf.discard(job_id)
+			resp = QtWidgets.QMessageBox.question(self, "Abrir PDF", "Abrir o PDF gerado agora?", QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
+			if resp == QtWidgets.QMessageBox.Yes:
+				QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(out_path))
+			return
+		# PDF gerado com sucesso - não abre automaticamente
+		QtWidgets.QMessageBox.information(self, "PDF Gerado", f"PDF salvo com sucesso em:\n{out_path}")
+
+	def on_render_failed(self, job_id: str, message: str) -> None:
+		self._ask_open_pdf.discard(job_id)
+		self.preview.append(f"{job_id}: falhou — {message}")
+		QtWidgets.QMessageBox.critical(self, "Erro", f"Falha ao gerar PDF: {message}")
+
+	def on_render_cancelled(self, job_id: str) -> None:
+		self._ask_open_pdf.discard(job_id)
+		self.preview.append(f"{job_id}: cancelado")
+
+	def on_render_pending(self, count: int) -> None:
+		self.btn_cancel_render.setVisible(count > 0)
+		self.btn_generate.setText(f"Gerar PDF ({count} na fila)" if count else "Gerar PDF")
+
 	def on_generate_docx(self):
 		# Removido da v1.0
 		QtWidgets.QMessageBox.information(self, "Indisponível", "Geração via DOCX foi descontinuada nesta versão. Use 'Gerar PDF'.")
 
 
 def main():
-	app = QtWidgets.QApplication([])
+	report = "--startup-report" in sys.argv
+	app = QtWidgets.QApplication([a for a in sys.argv if a != "--startup-report"])
 	try:
 		QtWidgets.QApplication.setStyle("Fusion")
 	except Exception:
 		pass
+	# encerra o navegador persistente junto com a aplicação
+	app.aboutToQuit.connect(_shutdown_renderer)
+	app.aboutToQuit.connect(lambda: get_cache().save())
 	w = MainWindow()
 	w.show()
+	startup.mark("janela exibida")
+	# aquecimento só depois do primeiro ciclo do event loop (janela já pintada)
+	on_done = (lambda: print(startup.startup_report(), flush=True)) if report else None
+	QtCore.QTimer.singleShot(0, lambda: startup.run_in_background(_warm_up_tasks(), on_done))
 	app.exec()
 
 
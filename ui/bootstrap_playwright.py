@@ -1,10 +1,35 @@
 from __future__ import annotations
 
+import json
 import subprocess
 import sys
 import os
 from pathlib import Path
-from typing import Optional
+from typing import NamedTuple, Optional
+
+# Carimbo "Chromium já lançou com sucesso" (caminho + versão + mtime do executável).
+# Enquanto ele bater com o executável atual, a inicialização não lança navegador para verificar.
+# Relativo à pasta do app (ver ``_app_dir``), não ao diretório de trabalho.
+STAMP_PATH = Path("logs") / "playwright_ok.json"
+
+# Executáveis dentro de <browsers>/chromium-<rev>/ (e chromium_headless_shell-<rev>/) por plataforma
+_EXECUTABLES = {
+	"win32": ("chrome-win/chrome.exe", "chrome-win/headless_shell.exe"),
+	"darwin": ("chrome-mac/Chromium.app/Contents/MacOS/Chromium", "chrome-mac/headless_shell"),
+}
+_EXECUTABLES_DEFAULT = ("chrome-linux/chrome", "chrome-linux/headless_shell")
+
+
+class ChromiumProbe(NamedTuple):
+	"""Resultado da verificação rápida (sem lançar o navegador)."""
+	executable: Optional[Path]  # None se não encontrado
+	version: str                # "<versão do playwright>/<pasta do chromium>"
+	mtime: float
+	stamped: bool               # carimbo válido para este executável
+
+	@property
+	def found(self) -> bool:
+		return self.executable is not None
 
 
 def _run(cmd: list[str]) -> int:
@@ -34,33 +59,153 @@ def _configure_playwright_browsers_path() -> None:
 		pass
 
 
-def ensure_playwright_chromium(verbose: bool = True, allow_install: bool = True) -> bool:
+def _app_dir() -> Path:
+	"""Pasta do executável no build empacotado; raiz do projeto (ui/..) em desenvolvimento."""
+	if getattr(sys, "frozen", False):
+		# não usa _MEIPASS: no modo onefile é uma pasta temporária apagada ao sair
+		return Path(sys.executable).resolve().parent
+	return Path(__file__).resolve().parents[1]
+
+
+def _stamp_path() -> Path:
+	return Path(os.environ.get("SETEMARES_PW_STAMP") or _app_dir() / STAMP_PATH)
+
+
+def _browsers_dir() -> Optional[Path]:
+	configured = os.environ.get("PLAYWRIGHT_BROWSERS_PATH")
+	if configured == "0":
+		return None  # navegadores dentro do pacote playwright: só a verificação completa resolve
+	if configured:
+		return Path(configured)
+	if sys.platform == "win32":
+		return Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local") / "ms-playwright"
+	if sys.platform == "darwin":
+		return Path.home() / "Library" / "Caches" / "ms-playwright"
+	return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "ms-playwright"
+
+
+def _playwright_version() -> str:
+	try:
+		from importlib.metadata import version
+		return version("playwright")
+	except Exception:
+		return ""
+
+
+def find_chromium_executable() -> Optional[Path]:
+	"""Executável do Chromium mais recente na pasta de navegadores do Playwright (sem importar o Playwright)."""
+	base = _browsers_dir()
+	if base is None or not base.is_dir():
+		return None
+	relatives = _EXECUTABLES.get(sys.platform, _EXECUTABLES_DEFAULT)
+
+	def _revision(d: Path) -> int:
+		rev = d.name.rsplit("-", 1)[-1]
+		return int(rev) if rev.isdigit() else -1
+
+	for folder in sorted(base.glob("chromium*-*"), key=_revision, reverse=True):
+		for rel in relatives:
+			exe = folder / rel
+			if exe.is_file():
+				return exe
+	return None
+
+
+def probe_chromium() -> ChromiumProbe:
+	"""Verificação rápida: localiza o executável e confere o carimbo, sem lançar o navegador."""
+	_configure_playwright_browsers_path()
+	exe = find_chromium_executable()
+	if exe is None:
+		return ChromiumProbe(None, "", 0.0, False)
+	version = f"{_playwright_version()}/{exe.relative_to(_browsers_dir()).parts[0]}"
+	try:
+		mtime = exe.stat().st_mtime
+	except OSError:
+		return ChromiumProbe(None, version, 0.0, False)
+	try:
+		stamp = json.loads(_stamp_path().read_text(encoding="utf-8"))
+		stamped = stamp == {"executable": str(exe), "version": version, "mtime": mtime}
+	except (OSError, ValueError):
+		stamped = False
+	return ChromiumProbe(exe, version, mtime, stamped)
+
+
+def write_stamp(probe: ChromiumProbe) -> None:
+	if probe.executable is None:
+		return
+	path = _stamp_path()
+	try:
+		path.parent.mkdir(parents=True, exist_ok=True)
+		tmp = path.with_suffix(path.suffix + ".tmp")
+		tmp.write_text(json.dumps({"executable": str(probe.executable), "version": probe.version, "mtime": probe.mtime}), encoding="utf-8")
+		os.replace(tmp, path)
+	except OSError:
+		pass
+
+
+def clear_stamp() -> None:
+	try:
+		_stamp_path().unlink()
+	except OSError:
+		pass
+
+
+def _launch_with_renderer(timeout: float) -> bool:
+	# O navegador lançado na verificação fica com o renderer persistente (nada é descartado)
+	try:
+		from pdf.renderer import get_renderer
+		get_renderer().warm_up().result(timeout)
+		return True
+	except Exception:
+		return False
+
+
+def _confirm_in_background() -> None:
+	"""Lança o navegador no renderer sem esperar; se falhar, invalida o carimbo para a próxima execução."""
+	try:
+		from pdf.renderer import get_renderer
+		future = get_renderer().warm_up()
+	except Exception:
+		clear_stamp()
+		return
+
+	def _done(f) -> None:
+		if f.cancelled() or f.exception() is not None:
+			clear_stamp()
+
+	future.add_done_callback(_done)
+
+
+def ensure_playwright_chromium(verbose: bool = True, allow_install: bool = True, timeout: float = 60.0) -> bool:
 	"""Garante que o Chromium do Playwright está disponível.
 
+	- Carimbo válido: retorna na hora; o navegador é lançado em segundo plano no renderer.
+	- Sem carimbo: lança o navegador no renderer (que o mantém aberto) e grava o carimbo.
+	- Se falhar e for ambiente dev (não frozen), instala e tenta de novo.
 	- Se estiver empacotado (sys.frozen), não tenta instalar (evita loop de processos).
-	- Tenta lançar um navegador headless; se falhar e for ambiente dev (não frozen), instala.
 	"""
 	frozen = bool(getattr(sys, "frozen", False))
 	if frozen:
 		allow_install = False
-	# configura diretório de browsers local, se existir
-	_configure_playwright_browsers_path()
-	try:
-		from playwright.sync_api import sync_playwright  # type: ignore
-		with sync_playwright() as p:
-			try:
-				browser = p.chromium.launch(headless=True)
-				browser.close()
-				return True
-			except Exception:
-				if allow_install:
-					if verbose:
-						print("Instalando Chromium para Playwright…")
-					code = _run([sys.executable, "-m", "playwright", "install", "chromium"])
-					return code == 0
-				return False
-	except Exception:
+	probe = probe_chromium()
+	if probe.stamped:
+		_confirm_in_background()
+		return True
+	# executável ausente: nem tenta lançar antes de instalar
+	if (probe.found or not allow_install) and _launch_with_renderer(timeout):
+		write_stamp(probe_chromium())
+		return True
+	clear_stamp()
+	if not allow_install:
+		return False
+	if verbose:
+		print("Instalando Chromium para Playwright…")
+	if _run([sys.executable, "-m", "playwright", "install", "chromium"]) != 0:
 		return False
+	if _launch_with_renderer(timeout):
+		write_stamp(probe_chromium())
+		return True
+	return False
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import itertools
+from concurrent.futures import CancelledError, Future
+from typing import TYPE_CHECKING, Dict
+
+from PySide6 import QtCore
+
+if TYPE_CHECKING:
+	from pdf.generator import RenderJob
+
+
+class RenderQueue(QtCore.QObject):
+	"""Fila de renderização de PDFs fora da thread da interface.
+
+	Os jobs rodam no loop do renderer persistente (thread própria), então a janela
+	continua respondendo enquanto o PDF é gerado. Vários jobs podem ser enfileirados;
+	até ``pool_size`` páginas imprimem ao mesmo tempo e o restante aguarda.
+	``job_started`` só sai quando o job obtém uma página do navegador. Os sinais são
+	emitidos na thread do renderer e entregues na thread da UI
+	(conexão enfileirada automática do Qt).
+	"""
+
+	job_queued = QtCore.Signal(str, str)     # job_id, out_pdf
+	job_started = QtCore.Signal(str)         # job_id (já com página do navegador)
+	job_finished = QtCore.Signal(str, str)   # job_id, out_pdf
+	job_failed = QtCore.Signal(str, str)     # job_id, mensagem
+	job_cancelled = QtCore.Signal(str)       # job_id
+	pending_changed = QtCore.Signal(int)     # jobs ainda não concluídos
+
+	def __init__(self, template_dir: str = "templates", parent: QtCore.QObject | None = None) -> None:
+		super().__init__(parent)
+		self.template_dir = template_dir
+		self._jobs: Dict[str, Future] = {}
+		self._seq = itertools.count(1)
+
+	def submit(self, job: "RenderJob") -> str:
+		# importados no primeiro job (Jinja/Playwright fora do caminho de abertura da janela)
+		from pdf.generator import render_job
+		from pdf.renderer import get_renderer, page_acquired
+
+		job_id = f"PDF-{next(self._seq):03d}"
+
+		async def _run() -> None:
+			started = False
+
+			def _started() -> None:
+				# documento multi usa várias páginas: avisa só a primeira
+				nonlocal started
+				if not started:
+					started = True
+					self.job_started.emit(job_id)
+
+			page_acquired.set(_started)
+			await render_job(job, self.template_dir)
+
+		fut = get_renderer().submit(_run())
+		self._jobs[job_id] = fut
+		fut.add_done_callback(lambda f, jid=job_id, out=job.out_pdf: self._on_done(jid, out, f))
+		self.job_queued.emit(job_id, job.out_pdf)
+		self.pending_changed.emit(self.pending())
+		return job_id
+
+	def cancel(self, job_id: str) -> bool:
+		fut = self._jobs.get(job_id)
+		return bool(fut and fut.cancel())
+
+	def cancel_all(self) -> int:
+		return sum(1 for jid in list(self._jobs) if self.cancel(jid))
+
+	def pending(self) -> int:
+		return sum(1 for f in self._jobs.values() if not f.done())
+
+	def _on_done(self, job_id: str, out_pdf: str, fut: Future) -> None:
+		self._jobs.pop(job_id, None)
+		try:
+			fut.result()
+		except CancelledError:
+			self.job_cancelled.emit(job_id)
+		except Exception as e:
+			self.job_failed.emit(job_id, str(e) or type(e).__name__)
+		else:
+			self.job_finished.emit(job_id, out_pdf)
+		self.pending_changed.emit(self.pending())
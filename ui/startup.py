@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# Instante de referência: o primeiro import deste módulo (feito logo no início de ui/app.py)
+T0 = time.perf_counter()
+
+_marks: List[Tuple[str, float]] = []
+_marks_lock = threading.Lock()
+
+
+def mark(label: str) -> float:
+	"""Registra um marco de inicialização; retorna os ms desde T0."""
+	elapsed = (time.perf_counter() - T0) * 1000
+	with _marks_lock:
+		_marks.append((label, elapsed))
+	return elapsed
+
+
+def marks() -> List[Tuple[str, float]]:
+	with _marks_lock:
+		return list(_marks)
+
+
+def format_marks() -> str:
+	return "\n".join(f"  {ms:8.1f} ms  {label}" for label, ms in marks())
+
+
+def run_in_background(tasks: Sequence[Tuple[str, Callable[[], object]]], on_done: Optional[Callable[[], None]] = None) -> threading.Thread:
+	"""Executa as tarefas de aquecimento em ordem numa thread daemon, marcando o fim de cada uma.
+
+	Falhas são registradas como marcos e não interrompem as tarefas seguintes.
+	"""
+	def _run() -> None:
+		for label, task in tasks:
+			try:
+				task()
+				mark(f"aquecimento: {label}")
+			except Exception as e:
+				mark(f"aquecimento: {label} (falhou: {e or type(e).__name__})")
+		if on_done is not None:
+			on_done()
+
+	thread = threading.Thread(target=_run, name="startup-warmup", daemon=True)
+	thread.start()
+	return thread
+
+
+def import_time_breakdown(module: str = "ui.app", top: int = 20) -> List[Tuple[int, int, str]]:
+	"""Roda ``python -X importtime -c "import <module>"`` num processo novo.
+
+	Retorna (cumulativo_us, próprio_us, módulo) dos ``top`` imports mais caros.
+	"""
+	import subprocess
+	proc = subprocess.run(
+		[sys.executable, "-X", "importtime", "-c", f"import {module}"],
+		stdout=subprocess.DEVNULL,
+		stderr=subprocess.PIPE,
+		text=True,
+		check=False,
+	)
+	rows: List[Tuple[int, int, str]] = []
+	for line in proc.stderr.splitlines():
+		if not line.startswith("import time:") or "|" not in line:
+			continue
+		parts = line[len("import time:"):].split("|")
+		try:
+			self_us, cumulative_us = int(parts[0]), int(parts[1])
+		except ValueError:
+			continue  # cabeçalho
+		rows.append((cumulative_us, self_us, parts[2].strip()))
+	rows.sort(reverse=True)
+	return rows[:top]
+
+
+def format_import_time(rows: Sequence[Tuple[int, int, str]]) -> str:
+	lines = ["  cumulativo   próprio  módulo"]
+	lines += [f"  {cum / 1000:8.1f} ms {own / 1000:7.1f} ms  {name}" for cum, own, name in rows]
+	return "\n".join(lines)
+
+
+def startup_report(module: str = "ui.app", top: int = 20) -> str:
+	"""Relatório de inicialização: marcos deste processo + imports mais caros (``-X importtime``)."""
+	report = ["Inicialização (ms desde o início):", format_marks()]
+	if getattr(sys, "frozen", False):
+		report.append("(-X importtime indisponível no executável empacotado)")
+	else:
+		report += [f"Imports mais caros de {module} (processo novo, -X importtime):", format_import_time(import_time_breakdown(module, top))]
+	return "\n".join(report)